@@ -5,7 +5,7 @@ from app.db import models, schemas
 from app.db.session import get_db
 from app.core import security
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import datetime
 import random
 
@@ -129,6 +129,55 @@ def api_health():
         })
     return {"apis": health_data}
 
+# --- Cache Metrics ---
+@router.get("/cache-stats", dependencies=[Depends(get_current_admin)])
+def cache_stats():
+    """Hit/miss counters for this worker's caches."""
+    from app.services.cache import cache_stats as collect_cache_stats
+    from app.services import user_cache
+    from app.recommendation.index import index_metrics
+    from app.services.attachments import attachment_metrics
+    from app.services.chat_cache import chat_cache
+    from app.services.resume_cache import resume_cache_metrics
+    stats = collect_cache_stats()
+    stats["user_profile"] = user_cache.stats()
+    stats["chat_responses"] = chat_cache.stats()
+    stats["chat_attachments"] = attachment_metrics()
+    stats["catalog_index"] = index_metrics()
+    stats["resume_pdfs"] = resume_cache_metrics()
+    return stats
+
+@router.get("/interaction-stats", dependencies=[Depends(get_current_admin)])
+def interaction_stats():
+    """Write-behind interaction buffer metrics (queued, flushed, dropped events)."""
+    from app.recommendation.logging import interaction_buffer
+    return interaction_buffer.metrics()
+
+@router.get("/outbox-stats", dependencies=[Depends(get_current_admin)])
+def outbox_stats(db: Session = Depends(get_db)):
+    """Email outbox throughput counters and queue depth per status."""
+    from app.services.outbox import outbox_metrics
+    return outbox_metrics(db)
+
+@router.get("/notification-stream-stats", dependencies=[Depends(get_current_admin)])
+def notification_stream_stats():
+    """Open SSE connections and push counters of this worker."""
+    from app.services.notification_stream import stream_metrics
+    return stream_metrics()
+
+@router.get("/job-runs", dependencies=[Depends(get_current_admin)])
+def job_runs(job_name: str | None = None, limit: int = 50, db: Session = Depends(get_db)):
+    """Scheduled job history (which worker ran which slot/shard, duration, result)."""
+    from app.services.jobs import recent_runs
+    return [
+        {
+            "id": r.id, "job_name": r.job_name, "shard": r.shard, "slot": r.slot, "owner": r.owner,
+            "status": r.status, "started_at": r.started_at, "finished_at": r.finished_at,
+            "duration_ms": r.duration_ms, "result": r.result, "error": r.error,
+        }
+        for r in recent_runs(db, job_name, min(limit, 500))
+    ]
+
 # --- Database Verify ---
 @router.get("/database", dependencies=[Depends(get_current_admin)])
 def database_stats(db: Session = Depends(get_db)):
@@ -167,6 +216,117 @@ def analytics(db: Session = Depends(get_db)):
 def fraud_manager(db: Session = Depends(get_db)):
     return db.query(models.Scholarship).filter(models.Scholarship.is_suspicious == True).all()
 
+@router.get("/fraud/scan-results", dependencies=[Depends(get_current_admin)])
+def fraud_scan_results(min_score: float = 0.01, limit: int = 100, db: Session = Depends(get_db)):
+    """Latest fraud scan per scholarship, riskiest first (scripts/scan_fraud.py, scheduled fraud_scan job)."""
+    import json
+    rows = db.query(models.FraudScanResult, models.Scholarship.title, models.Scholarship.is_suspicious).join(
+        models.Scholarship, models.Scholarship.id == models.FraudScanResult.scholarship_id
+    ).filter(models.FraudScanResult.score >= min_score).order_by(
+        models.FraudScanResult.score.desc()
+    ).limit(min(limit, 500)).all()
+    return [
+        {
+            "scholarship_id": r.scholarship_id, "title": title, "is_suspicious": is_suspicious,
+            "score": r.score, "risk_level": r.risk_level, "matches": json.loads(r.matches or "[]"),
+            "rules_version": r.rules_version, "scanned_at": r.scanned_at,
+        }
+        for r, title, is_suspicious in rows
+    ]
+
+
+# --- Duplicate Review (MinHash/LSH clusters, app/services/dedup.py) ---
+class DuplicateMerge(BaseModel):
+    canonical_id: int  # Member that is kept
+
+@router.get("/duplicates", dependencies=[Depends(get_current_admin)])
+def duplicate_clusters(status: str = "open", limit: int = 50, db: Session = Depends(get_db)):
+    """Near-duplicate clusters, newest first, with their members' titles and similarity."""
+    clusters = db.query(models.DuplicateCluster).filter(
+        models.DuplicateCluster.status == status
+    ).order_by(models.DuplicateCluster.id.desc()).limit(min(limit, 200)).all()
+    member_ids = {m.scholarship_id for c in clusters for m in c.members}
+    details = {
+        row.id: row for row in db.query(
+            models.Scholarship.id, models.Scholarship.title, models.Scholarship.degree_level,
+            models.Scholarship.deadline, models.Scholarship.created_at, models.University.name.label("university"),
+        ).outerjoin(models.University, models.University.id == models.Scholarship.university_id).filter(
+            models.Scholarship.id.in_(member_ids)
+        )
+    }
+    return [
+        {
+            "id": c.id, "status": c.status, "canonical_id": c.canonical_id,
+            "created_at": c.created_at, "resolved_at": c.resolved_at,
+            "members": [_cluster_member(m, details.get(m.scholarship_id)) for m in sorted(c.members, key=lambda m: m.scholarship_id)],
+        }
+        for c in clusters
+    ]
+
+def _cluster_member(member: models.DuplicateClusterMember, row) -> dict:
+    if row is None:  # Deleted by a merge
+        return {"scholarship_id": member.scholarship_id, "similarity": member.similarity, "deleted": True}
+    return {
+        "scholarship_id": member.scholarship_id, "similarity": member.similarity, "title": row.title,
+        "university": row.university, "degree_level": row.degree_level, "deadline": row.deadline,
+        "created_at": row.created_at,
+    }
+
+def _open_cluster(id: int, db: Session) -> models.DuplicateCluster:
+    cluster = db.get(models.DuplicateCluster, id)
+    if not cluster:
+        raise HTTPException(404, "Not found")
+    return cluster
+
+@router.post("/duplicates/{id}/merge", dependencies=[Depends(get_current_admin)])
+def merge_duplicates(id: int, body: DuplicateMerge, db: Session = Depends(get_db)):
+    """Keeps canonical_id; the other members' saves, applications and history move onto it."""
+    from app.services.dedup import merge_cluster
+    try:
+        deleted = merge_cluster(db, _open_cluster(id, db), body.canonical_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"status": "merged", "canonical_id": body.canonical_id, "deleted": deleted}
+
+@router.post("/duplicates/{id}/dismiss", dependencies=[Depends(get_current_admin)])
+def dismiss_duplicates(id: int, db: Session = Depends(get_db)):
+    """Not duplicates; the same group is not reopened by later scans."""
+    from app.services.dedup import dismiss_cluster
+    try:
+        dismiss_cluster(db, _open_cluster(id, db))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"status": "dismissed"}
+
+# --- Bulk Resume Export (app/services/resume_export.py) ---
+class ResumeExportFilter(BaseModel):
+    user_ids: Optional[List[int]] = None
+    target_country: Optional[str] = None
+    target_degree: Optional[str] = None
+    current_degree: Optional[str] = None
+    current_university: Optional[str] = None
+    nationality: Optional[str] = None
+    major: Optional[str] = None
+    graduation_year: Optional[int] = None
+    active_only: bool = True
+    limit: Optional[int] = None  # Max users, lowest ids first
+
+@router.post("/resumes/export", dependencies=[Depends(get_current_admin)])
+def export_resumes(body: ResumeExportFilter, db: Session = Depends(get_db)):
+    """ZIP of the matching users' resume PDFs, streamed while they render."""
+    from fastapi.responses import StreamingResponse
+    from app.services.resume_export import count_users, stream_resume_zip
+    filters = body.model_dump(exclude={"limit"})
+    if not count_users(db, filters):
+        raise HTTPException(status_code=404, detail="No users match the filter")
+    filename = f"resumes_{datetime.date.today().isoformat()}.zip"
+    return StreamingResponse(
+        stream_resume_zip(filters, limit=body.limit),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 # ============================================
 # TUITION & SCHOLARSHIP VERIFICATION
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db import models, schemas
 from app.api import deps
+from app.recommendation.logging import log_interaction
 
 router = APIRouter()
 
@@ -36,6 +37,7 @@ def save_application(
     db.add(new_app)
     db.commit()
     db.refresh(new_app)
+    log_interaction(db, current_user.id, app_in.scholarship_id, "apply")
     return new_app
 
 @router.get("/", response_model=List[schemas.ApplicationOut])
@@ -87,31 +89,38 @@ def delete_application(
     db.commit()
     return {"message": "Application removed from tracking"}
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 @router.get("/notifications")
 def get_deadline_notifications(
     db: Session = Depends(get_db), 
     current_user: models.User = Depends(deps.get_current_user)
 ):
-    # Logic: Scholarships expiring in the next 7 days
-    today = datetime.utcnow()
-    warning_limit = today + timedelta(days=7)
-    
-    apps = db.query(models.Application).filter(models.Application.user_id == current_user.id).all()
-    
+    # Reminders are precomputed by the deadline job (app/tasks.py); this only reads them
+    now = datetime.utcnow()
+    rows = db.query(models.Notification, models.Scholarship.title, models.Scholarship.deadline).join(
+        models.Scholarship, models.Scholarship.id == models.Notification.scholarship_id
+    ).filter(
+        models.Notification.user_id == current_user.id,
+        models.Notification.channel == "in_app",
+        models.Notification.type == "deadline_reminder",
+        models.Scholarship.deadline >= now,
+    ).order_by(models.Notification.sent_date.desc()).limit(50).all()
+
     notifications = []
-    for app in apps:
-        if app.scholarship and app.scholarship.deadline:
-            # Check if deadline is upcoming
-            if today <= app.scholarship.deadline <= warning_limit:
-                days_left = (app.scholarship.deadline - today).days
-                notifications.append({
-                    "id": app.id,
-                    "message": f"Deadline for '{app.scholarship.title}' is in {max(0, days_left)} days! ⏳",
-                    "days_left": days_left,
-                    "read": False,
-                    "scholarship_id": app.scholarship_id
-                })
+    seen = set()
+    for notification, title, deadline in rows:
+        # Only the latest window per scholarship (T-7 replaces T-30)
+        if notification.scholarship_id in seen:
+            continue
+        seen.add(notification.scholarship_id)
+        days_left = (deadline - now).days
+        notifications.append({
+            "id": notification.id,
+            "message": f"Deadline for '{title}' is in {max(0, days_left)} days! ⏳",
+            "days_left": days_left,
+            "read": False,
+            "scholarship_id": notification.scholarship_id
+        })
                 
     return notifications
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -5,29 +6,28 @@ from app.api import deps
 from app.db import models, schemas
 from app.core import security
 from app.db.session import get_db
+from app.services.user_cache import invalidate_user
+from app.recommendation.percolator import index_user_profile
 
 router = APIRouter()
 
 from sqlalchemy import func
 
-@router.post("/register", response_model=schemas.UserOut)
-def register(
-    user_in: schemas.UserCreate,
-    db: Session = Depends(get_db)
-):
-    # Check if user exists (case-insensitive check)
-    email = user_in.email.lower().strip()
-    user = db.query(models.User).filter(func.lower(models.User.email) == email).first()
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this email already exists in the system.",
-        )
-    
-    # Create user
+def _find_user(db: Session, email: str):
+    """(id, hashed_password, is_active) of the user with this email, or None."""
+    # querying using func.lower to match legacy mixed-case emails too
+    row = db.query(models.User.id, models.User.hashed_password, models.User.is_active).filter(
+        func.lower(models.User.email) == email
+    ).first()
+    # Give the pooled connection back before waiting on the hash pool
+    db.rollback()
+    return row
+
+
+def _create_user(db: Session, user_in: schemas.UserCreate, email: str, hashed_password: str) -> models.User:
     db_user = models.User(
         email=email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         full_name=user_in.full_name,
         nationality=user_in.nationality,
         current_degree=user_in.current_degree,
@@ -40,21 +40,52 @@ def register(
         degree_level=user_in.current_degree, 
     )
     db.add(db_user)
+    db.flush()
+    index_user_profile(db, db_user)  # New-scholarship alerts
     db.commit()
     db.refresh(db_user)
     return db_user
 
+
+def _store_rehash(db: Session, user_id: int, new_hash: str) -> None:
+    db.query(models.User).filter(models.User.id == user_id).update({"hashed_password": new_hash})
+    db.commit()
+    invalidate_user(user_id)
+
+
+# Database steps run in threads and only the pbkdf2 work waits on the hash pool,
+# so neither blocks the event loop during a login burst
+@router.post("/register", response_model=schemas.UserOut)
+async def register(
+    user_in: schemas.UserCreate,
+    db: Session = Depends(get_db)
+):
+    # Check if user exists (case-insensitive check)
+    email = user_in.email.lower().strip()
+    if await asyncio.to_thread(_find_user, db, email):
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system.",
+        )
+    
+    # Create user (hashing runs on the bounded hash pool, off the event loop)
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    return await asyncio.to_thread(_create_user, db, user_in, email, hashed_password)
+
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     # Authenticate user (case-insensitive lookup)
     email = form_data.username.lower().strip()
-    # querying using func.lower to match legacy mixed-case emails too
-    user = db.query(models.User).filter(func.lower(models.User.email) == email).first()
-    
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await asyncio.to_thread(_find_user, db, email)
+
+    is_valid, new_hash = False, None
+    if user:
+        is_valid, new_hash = await security.verify_and_update_password(form_data.password, user.hashed_password)
+
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -64,6 +95,10 @@ def login(
         raise HTTPException(
             status_code=400, detail="Inactive user"
         )
+
+    # Transparently re-hash with the current rounds setting
+    if new_hash:
+        await asyncio.to_thread(_store_rehash, db, user.id, new_hash)
     
     return {
         "access_token": security.create_access_token(user.id),
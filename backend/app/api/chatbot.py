@@ -1,77 +1,179 @@
 # backend/app/api/chatbot.py
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+import asyncio
+import json
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Form, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from app.services.chatbot import get_ai_response
-from app.db.session import get_db
+from app.services.chatbot import get_ai_response, stream_ai_response
+from app.services.chat_context import build_context, history_page, refresh_summary
+from app.db.session import SessionLocal, get_db
 from app.db.models import ChatMessage, User
 from app.api.deps import get_current_user # Auth dependency
+from app.core.config import settings
 
 router = APIRouter()
 
 # 1. Chat History Get Karne Ka Route
 @router.get("/history")
-async def get_chat_history(
+def get_chat_history(
+    limit: int = Query(settings.CHAT_HISTORY_PAGE_SIZE, ge=1, le=settings.CHAT_HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Sirf is user ke messages laao, purane se naye tartib mein
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.user_id == current_user.id
-    ).order_by(ChatMessage.timestamp.asc()).all()
-    
+    """
+    Newest `limit` messages, returned oldest -> newest. Pass `next_cursor` back as
+    `cursor` to load the page before it; it is null on the oldest page.
+    """
+    try:
+        messages, next_cursor = history_page(db, current_user.id, limit, before=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     # Return serializable data
-    return [
-        {
-            "id": m.id,
-            "role": m.role,
-            "content": m.content,
-            "file_name": m.file_name,
-            "timestamp": m.timestamp.isoformat() if m.timestamp else None
-        } for m in messages
-    ]
+    return {
+        "messages": [
+            {
+                "id": m.id,
+                "role": m.role,
+                "content": m.content,
+                "file_name": m.file_name,
+                "timestamp": m.timestamp.isoformat() if m.timestamp else None
+            } for m in messages
+        ],
+        "next_cursor": next_cursor,
+    }
 
-# 2. Message Send Karne Ka Route (Updated to Save in DB)
-@router.post("/")
-async def chat_endpoint(
-    message: str = Form(...),
-    file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user) # Login zaroori hai
-):
+def _save_ai_message(user_id: int, content: str) -> int:
+    db = SessionLocal()
+    try:
+        ai_msg_db = ChatMessage(user_id=user_id, role="ai", content=content)
+        db.add(ai_msg_db)
+        db.commit()
+        return ai_msg_db.id
+    finally:
+        db.close()
+
+
+async def _read_upload(file: UploadFile) -> bytes:
+    """Reads the upload in chunks and gives up as soon as it passes ATTACHMENT_MAX_BYTES."""
+    limit = settings.ATTACHMENT_MAX_BYTES
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File is too large (max {round(limit / (1024 * 1024), 1):g} MB)",
+    )
+    if file.size is not None and file.size > limit:
+        raise too_large
+    chunks, size = [], 0
+    while chunk := await file.read(1024 * 1024):
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _save_user_message(db: Session, user: User, message: str, file: Optional[UploadFile]):
+    """
+    Validates the form, stores the user's message and returns (file_data, file_type,
+    history) where history is the conversation context for the LLM.
+    """
     if not message:
         raise HTTPException(status_code=400, detail="Message is required")
-    
+
     file_data = None
     file_type = None
     file_name = None
 
     if file:
-        file_data = await file.read()
+        file_data = await _read_upload(file)
         file_type = file.content_type
         file_name = file.filename
 
     # --- A. User ka Message DB mein Save Karein ---
     user_msg_db = ChatMessage(
-        user_id=current_user.id,
+        user_id=user.id,
         role="user",
         content=message,
         file_name=file_name
     )
     db.add(user_msg_db)
-    db.commit()
+    db.flush()
+    message_id = user_msg_db.id  # Read before commit expires the instance
+    db.commit()  # Also hands the connection back to the pool before the LLM call
+    history = await asyncio.to_thread(build_context, user.id, message_id)
+    return file_data, file_type, history
+
+
+# 2. Message Send Karne Ka Route (Updated to Save in DB)
+@router.post("/")
+async def chat_endpoint(
+    background_tasks: BackgroundTasks,
+    message: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    no_cache: bool = Form(False),  # Skip the answer cache (e.g. "regenerate")
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user) # Login zaroori hai
+):
+    user_id = current_user.id
+    file_data, file_type, history = await _save_user_message(db, current_user, message, file)
 
     # --- B. AI se Jawab Lein ---
-    ai_reply_text = get_ai_response(message, file_data, file_type)
+    ai_reply_text = await get_ai_response(message, file_data, file_type, use_cache=not no_cache, history=history)
     
     # --- C. AI ka Jawab DB mein Save Karein ---
-    ai_msg_db = ChatMessage(
-        user_id=current_user.id,
-        role="ai",
-        content=ai_reply_text
-    )
-    db.add(ai_msg_db)
-    db.commit()
+    await asyncio.to_thread(_save_ai_message, user_id, ai_reply_text)
+    # Older turns are folded into the rolling summary after the response is sent
+    background_tasks.add_task(refresh_summary, user_id)
     
     return {"reply": ai_reply_text}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# 3. Streaming Route (tokens as server-sent events)
+@router.post("/stream")
+async def chat_stream_endpoint(
+    message: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    no_cache: bool = Form(False),  # Skip the answer cache (e.g. "regenerate")
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Same input as POST /, but the answer arrives as `token` events while the model
+    writes it, followed by `done` with the stored message id. The AI message is saved
+    once the stream ends (also when the client disconnects midway).
+    """
+    user_id = current_user.id
+    file_data, file_type, history = await _save_user_message(db, current_user, message, file)
+
+    async def events():
+        reply = []
+        finished = False
+        try:
+            async for chunk in stream_ai_response(message, file_data, file_type, use_cache=not no_cache, history=history):
+                reply.append(chunk)
+                yield _sse("token", {"text": chunk})
+            finished = True
+        finally:
+            if not finished and reply:
+                # Client went away; keep the partial answer in the history. Handed to a
+                # thread without awaiting it: this generator is being closed or cancelled
+                asyncio.get_running_loop().run_in_executor(None, _save_ai_message, user_id, "".join(reply))
+        # Nothing to keep if the model produced no text
+        message_id = await asyncio.to_thread(_save_ai_message, user_id, "".join(reply)) if reply else None
+        yield _sse("done", {"id": message_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(refresh_summary, user_id),
+    )
@@ -4,6 +4,7 @@ from typing import List
 from app.db import models, schemas
 from app.api import deps
 from app.db.session import get_db
+from app.recommendation.logging import log_interaction
 
 router = APIRouter()
 
@@ -22,6 +23,7 @@ def save_scholarship(
         
     current_user.saved_items.append(scholarship)
     db.commit()
+    log_interaction(db, current_user.id, scholarship_id, "save")
     return {"message": "Scholarship saved", "status": "saved"}
 
 @router.delete("/unsave/{scholarship_id}")
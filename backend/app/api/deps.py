@@ -7,6 +7,7 @@ from app.core import security
 from app.core.config import settings
 from app.db import models, schemas
 from app.db.session import get_db
+from app.services.user_cache import load_user
 from typing import Optional
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -33,7 +34,12 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
+    if payload.get("scope"):  # Single-purpose token (e.g. the notification stream), not a session
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    user = load_user(db, int(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -54,10 +60,9 @@ def get_current_user_optional(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         user_id = payload.get("sub")
-        if not user_id:
+        if not user_id or payload.get("scope"):
             return None
             
-        user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-        return user
+        return load_user(db, int(user_id))
     except (JWTError, ValidationError):
         return None
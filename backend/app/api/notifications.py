@@ -0,0 +1,151 @@
+import asyncio
+import json
+from datetime import timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from jose import jwt, JWTError
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import models
+from app.db.session import SessionLocal, get_db
+from app.services import notification_stream
+from app.services.notification_stream import hub
+
+router = APIRouter()
+
+STREAM_SCOPE = "notification_stream"
+
+
+class MarkRead(BaseModel):
+    ids: Optional[List[int]] = None  # None marks everything read
+
+
+def _sse(event: str, data: dict, event_id: int = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _authenticate(token: str) -> int:
+    """Resolves the stream token to an active user id with a short-lived session."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Could not validate credentials")
+    # Only stream tokens: a session token in a URL would end up in access logs
+    if payload.get("scope") != STREAM_SCOPE:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Could not validate credentials")
+    db = SessionLocal()
+    try:
+        user = db.query(models.User.id).filter(models.User.id == user_id, models.User.is_active.is_(True)).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user_id
+    finally:
+        db.close()
+
+
+def _unread_count(user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return notification_stream.unread_count(db, user_id)
+    finally:
+        db.close()
+
+
+@router.post("/stream-token")
+def create_stream_token(current_user: models.User = Depends(deps.get_current_user)):
+    """
+    Short-lived token for /stream only. EventSource cannot send headers, so the token goes
+    in the URL, where proxies and access logs may keep it; it is useless elsewhere.
+    """
+    expires = timedelta(seconds=settings.NOTIFICATION_STREAM_TOKEN_SECONDS)
+    return {
+        "token": create_access_token(current_user.id, expires_delta=expires, scope=STREAM_SCOPE),
+        "expires_in": settings.NOTIFICATION_STREAM_TOKEN_SECONDS,
+    }
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    token: str = Query(..., description="Token from POST /notifications/stream-token"),
+    after: Optional[int] = Query(None, description="Last notification id seen, for a manual reconnect"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Server-sent events for the signed-in user: `unread` with the counter on connect, then
+    `notification` for every in-app notification as it is produced. No database session
+    is held while the connection is open. The token is only checked on connect.
+    """
+    user_id = await asyncio.to_thread(_authenticate, token)
+    if last_event_id is None:
+        last_event_id = after
+
+    async def events():
+        queue = hub.subscribe(user_id)
+        try:
+            yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n"
+            # EventSource resends the last id after a reconnect; replay what was missed
+            if last_event_id is not None:
+                missed = await asyncio.to_thread(notification_stream.fetch_since, last_event_id, user_id, 50)
+                for item in missed:
+                    yield _sse("notification", item, item["id"])
+            yield _sse("unread", {"count": await asyncio.to_thread(_unread_count, user_id)})
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"  # Keeps proxies from closing an idle connection
+                    continue
+                yield _sse("notification", item, item["id"])
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/")
+def list_notifications(
+    limit: int = Query(30, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    rows = db.query(models.Notification, models.Scholarship.title).outerjoin(
+        models.Scholarship, models.Scholarship.id == models.Notification.scholarship_id
+    ).filter(
+        models.Notification.user_id == current_user.id,
+        models.Notification.channel == "in_app",
+    ).order_by(models.Notification.id.desc()).limit(limit).all()
+    return [notification_stream.serialize(n, title) for n, title in rows]
+
+
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    return {"count": notification_stream.unread_count(db, current_user.id)}
+
+
+@router.post("/read")
+def mark_notifications_read(
+    body: MarkRead,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    updated = notification_stream.mark_read(db, current_user.id, body.ids)
+    db.commit()
+    return {"updated": updated, "count": notification_stream.unread_count(db, current_user.id)}
@@ -66,22 +66,13 @@ def get_profile_recommendations(
     2) Fetch Candidates
     3) Run Rules Engine (+ Blended ML if model exists)
     """
-    from app.recommendation.engine import UserProfile, score_scholarship, get_recommended_degree
-    import joblib
-    import os
+    from app.recommendation.engine import score_scholarship, get_recommended_degree
+    from app.recommendation.features import (
+        build_user_profile, extract_candidate_features, get_match_model, predict_match_probability
+    )
 
     # 1. Map current_user to UserProfile DTO
-    user_p = UserProfile(
-        id=current_user.id,
-        full_name=current_user.full_name or "User",
-        country=current_user.nationality or "Pakistan",
-        highest_completed_degree=current_user.degree_level or "Bachelor's",
-        field_of_study=current_user.field_of_interest or "",
-        specialization=current_user.specialization,
-        cgpa=current_user.cgpa or 0.0,
-        preferred_countries=["United Kingdom", "Canada"], # Placeholder
-        target_budget_per_year_usd=20000 # Placeholder
-    )
+    user_p = build_user_profile(current_user)
 
     # 2. Fetch Candidate Set
     # --- PLUG-IN: Dynamic candidate fetching logic ---
@@ -95,41 +86,36 @@ def get_profile_recommendations(
         )
     ).limit(30).all()
 
-    # 3. Load ML Model if available
-    ml_model = None
-    model_path = "models/scholar_match.pkl"
-    if os.path.exists(model_path):
-        try:
-            ml_model = joblib.load(model_path)
-            print("ML Model loaded successfully.")
-        except Exception as e:
-            print(f"Error loading ML model: {e}")
+    # 3. ML probabilities for all candidates at once (model is cached per worker).
+    # Features come from the same code the training pipeline uses.
+    ml_probs = predict_match_probability(get_match_model(), extract_candidate_features(user_p, candidates))
 
     # 4. Score and Rank
+    from app.recommendation.popularity import popularity_features
+    from app.recommendation.cf import get_cf_model
+    from app.core.config import settings
+    popularity = popularity_features(db, [s.id for s in candidates])
+
+    # Collaborative filtering: one matrix-vector product over all candidates
+    cf_model = get_cf_model()
+    cf_scores = cf_model.score(current_user.id, [s.id for s in candidates]) if cf_model else {}
+
     recommendations = []
-    for s in candidates:
+    for i, s in enumerate(candidates):
         # Rule-based scoring
-        rule_data = score_scholarship(user_p, s)
+        rule_data = score_scholarship(user_p, s, popularity.get(s.id, 0.0))
         rule_score = rule_data["fit_score"]
         
         final_score = rule_score
 
-        # Blended ML Scoring
-        if ml_model:
-            # --- PLUG-IN: Extract actual features from (user_p, s) ---
-            # Features must match the training set: [degree_path_match, field_match_score, country_match, cgpa_gap]
-            feat_degree = 1 if (user_p.highest_completed_degree == "Bachelor's" and "Master" in (s.degree_level or "")) else 0
-            feat_field = 1.0 if (user_p.field_of_study.lower() in (s.field_of_study or "").lower()) else 0.5
-            feat_country = 1 if s.country in user_p.preferred_countries else 0
-            feat_cgpa = (user_p.cgpa - (s.university.min_cgpa or 3.0)) if s.university else 0
-            
-            # Prediction
-            try:
-                ml_prob = ml_model.predict_proba([[feat_degree, feat_field, feat_country, feat_cgpa]])[0][1]
-                # Weighted Blend: 60% ML, 40% Rules
-                final_score = (0.6 * (ml_prob * 100)) + (0.4 * rule_score)
-            except:
-                pass # Fallback to rule_score
+        # Blended ML Scoring: 60% ML, 40% Rules
+        if ml_probs is not None:
+            final_score = (0.6 * (ml_probs[i] * 100)) + (0.4 * rule_score)
+
+        # Blend CF preference (~0..1) for users/scholarships seen in training
+        if s.id in cf_scores:
+            cf_score = max(0.0, min(1.0, cf_scores[s.id])) * 100
+            final_score = (1 - settings.CF_BLEND_WEIGHT) * final_score + settings.CF_BLEND_WEIGHT * cf_score
         
         recommendations.append(schemas.ScholarshipRecommendation(
             id=s.id,
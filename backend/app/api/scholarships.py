@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException
 from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
 from app.db import models, schemas
 from app.db.session import get_db
 from app.api import deps
 from app.utils.scoring import calculate_match_score
-from app.services.fraud_detection import analyze_fraud_risk
+from app.services.fraud_detection import analyze_fraud_risk, result_values
+from app.services.dedup import check_new_scholarship
+from app.services import catalog_cache
+from app.recommendation.logging import log_interaction
+from app.recommendation.percolator import percolate_scholarships
 
 router = APIRouter()
 
@@ -24,6 +29,7 @@ def list_scholarships(
     min_funding_amount: Optional[float] = None,
     field_category: Optional[str] = None,
     deadline_before: Optional[str] = None,
+    sort: Optional[str] = Query(None, description="'trending' to order by recent popularity"),
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(deps.get_current_user_optional)
 ):
@@ -86,6 +92,18 @@ def list_scholarships(
     
     # Get total count before pagination
     total = query.count()
+
+    sort_by_trending = sort == "trending"
+    if sort_by_trending:
+        # Precomputed decayed scores; scholarships without activity go last
+        query = query.outerjoin(
+            models.ScholarshipTrending,
+            models.ScholarshipTrending.scholarship_id == models.Scholarship.id
+        ).order_by(
+            models.ScholarshipTrending.log_score.is_(None),
+            models.ScholarshipTrending.log_score.desc(),
+            models.Scholarship.id
+        )
     
     # Calculate pagination
     total_pages = (total + page_size - 1) // page_size  # Ceiling division
@@ -106,7 +124,7 @@ def list_scholarships(
             s.match_score = 0
 
     # Sort by match score if logged in
-    if current_user:
+    if current_user and not sort_by_trending:
         scholarships.sort(key=lambda x: x.match_score, reverse=True)
     
     return {
@@ -257,14 +275,9 @@ def get_university_details(
     db: Session = Depends(get_db)
 ):
     """Returns detailed information for a specific university including its scholarships."""
-    uni = db.query(models.University).options(joinedload(models.University.scholarships)).filter(models.University.id == uni_id).first()
+    uni = catalog_cache.get_university(db, uni_id)
     if not uni:
         raise HTTPException(status_code=404, detail="University not found")
-    
-    # Populate university_name for each scholarship in the list
-    for s in uni.scholarships:
-        s.university_name = uni.name
-
     return uni
 
 @router.get("/universities/by-name/{name}", response_model=schemas.UniversityDetails)
@@ -273,18 +286,15 @@ def get_university_by_name(
     db: Session = Depends(get_db)
 ):
     """Returns detailed information for a specific university by name."""
-    uni = db.query(models.University).options(joinedload(models.University.scholarships)).filter(models.University.name == name).first()
+    uni = catalog_cache.get_university_by_name(db, name)
     if not uni:
         raise HTTPException(status_code=404, detail="University not found")
-    
-    for s in uni.scholarships:
-        s.university_name = uni.name
-        
     return uni
 
 @router.post("/", response_model=schemas.ScholarshipOut)
 def create_scholarship(
     scholarship: schemas.ScholarshipBase,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
@@ -292,21 +302,29 @@ def create_scholarship(
     Creates a new scholarship and automatically checks for fraud risk.
     """
     # 1. Fraud Check Run karein
-    fraud_result = analyze_fraud_risk(scholarship.title, scholarship.description)
+    fraud_result = analyze_fraud_risk(scholarship.title, scholarship.description, scholarship.eligibility)
     
     # 2. Add to database
     db_scholarship = models.Scholarship(**scholarship.dict())
     
-    # 3. Agar suspicious hai, to auto-flag karein
+    # 3. Agar suspicious hai, to auto-flag karein. The reason stays out of the description
+    # (its phrases would match the rules on every rescan); fraud_scan_results keeps the matches
     if fraud_result["is_suspicious"]:
         db_scholarship.is_suspicious = True
-        # Optional: Reason ko description mein add kiya ja sakta hai
-        if db_scholarship.description:
-            db_scholarship.description += f"\n\n[ADMIN ALERT]: {fraud_result['reason']}"
             
     db.add(db_scholarship)
+    db.flush()
+    # Recorded with the row, so the incremental scan does not pick it up again
+    db.add(models.FraudScanResult(**result_values(db_scholarship.id, fraud_result, datetime.datetime.utcnow())))
+    # Near-duplicates of existing listings go to the admin review queue
+    duplicates = check_new_scholarship(db, db_scholarship)
+    if duplicates:
+        print(f"🧬 Scholarship {db_scholarship.id} looks like {[sid for sid, _ in duplicates]}")
     db.commit()
     db.refresh(db_scholarship)
+
+    # 4. Alert users whose profile matches (after the response is sent)
+    background_tasks.add_task(percolate_scholarships, [db_scholarship.id])
     
     # Populate university_name for response
     if db_scholarship.university:
@@ -318,18 +336,13 @@ def create_scholarship(
 @router.get("/{scholarship_id}", response_model=schemas.ScholarshipOut)
 def get_scholarship(
     scholarship_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(deps.get_current_user_optional)
 ):
-    scholarship = db.query(models.Scholarship).options(joinedload(models.Scholarship.university)).filter(models.Scholarship.id == scholarship_id).first()
+    # Served from the catalog cache; invalidated on every scholarship/university write
+    scholarship = catalog_cache.get_scholarship(db, scholarship_id)
     if not scholarship:
         raise HTTPException(status_code=404, detail="Scholarship not found")
-        
-    if scholarship.university:
-        scholarship.university_name = scholarship.university.name
-        # Fallback to university coordinates if scholarship ones are missing
-        if scholarship.latitude is None:
-            scholarship.latitude = scholarship.university.latitude
-        if scholarship.longitude is None:
-            scholarship.longitude = scholarship.university.longitude
-        
+    if current_user:
+        log_interaction(db, current_user.id, scholarship_id, "view")
     return scholarship
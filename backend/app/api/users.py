@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from app.db import models, schemas
 from app.api import deps
 from app.db.session import get_db
+from app.services.user_cache import invalidate_user
+from app.recommendation.percolator import index_user_profile
 
 router = APIRouter()
 
@@ -23,6 +25,8 @@ def update_user_me(
         setattr(current_user, field, value)
     
     db.add(current_user)
+    index_user_profile(db, current_user)  # Keep new-scholarship alert criteria in sync
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
     return current_user
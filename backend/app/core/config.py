@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "ScholarIQ"
@@ -9,10 +9,135 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "SECRET_KEY_FOR_DEVELOPMENT_ONLY_CHANGE_IN_PRODUCTION")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+
+    # Password hashing - existing hashes are re-hashed on login when rounds change
+    PASSWORD_HASH_ROUNDS: int = 29000  # passlib's pbkdf2_sha256 default
+    PASSWORD_HASH_WORKERS: int = 4  # Max concurrent hash computations per worker
     
     # Database - SQLite for development, PostgreSQL for production
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL", "sqlite:///./scholariq.db")
-    
+
+    # Caching - in-memory by default, set CACHE_URL=redis://... to share across workers.
+    # Without Redis each worker caches alone: writes reach other workers after the local TTLs
+    CACHE_URL: Optional[str] = os.getenv("CACHE_URL")
+    CATALOG_CACHE_MAX_ITEMS: int = 5000
+    CATALOG_CACHE_LOCAL_TTL_SECONDS: int = 30
+    CATALOG_CACHE_SHARED_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_ITEMS: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # Interaction logging (write-behind buffer)
+    INTERACTION_BUFFER_MAX_QUEUE: int = 10000
+    INTERACTION_BUFFER_BATCH_SIZE: int = 500
+    INTERACTION_BUFFER_FLUSH_SECONDS: float = 2.0
+    INTERACTION_BUFFER_PUT_TIMEOUT_SECONDS: float = 0.05
+
+    # Trending score: weight of an interaction halves every N hours
+    TRENDING_HALF_LIFE_HOURS: float = 72
+
+    # Profile match model (scripts/train_scholar_match.py)
+    SCHOLAR_MATCH_MODEL_PATH: str = "models/scholar_match.pkl"
+
+    # Collaborative filtering model (scripts/train_cf.py)
+    CF_MODEL_DIR: str = "models/cf"
+    CF_BLEND_WEIGHT: float = 0.2  # Share of the profile fit score taken from CF
+
+    # Bulk email (deadline reminders): reused SMTP sessions, one message in flight per session
+    EMAIL_POOL_SIZE: int = 8
+    EMAIL_MESSAGES_PER_CONNECTION: int = 100
+
+    # Deadline reminders go out this many days before a deadline (in-app + email)
+    REMINDER_WINDOWS_DAYS: List[int] = [30, 7, 1]
+
+    # Scheduled jobs (app/services/jobs.py): one run per cluster per slot
+    JOB_LOCK_BACKEND: str = "database"  # database (multi-host) or file (single host, fcntl)
+    JOB_LOCK_DIR: str = "/tmp/scholariq-locks"
+    JOB_LEASE_SECONDS: int = 3600  # A crashed run's lease frees up after this
+    JOB_SHARDS: int = 1  # Split the deadline job across workers by user id
+
+    # Email outbox (app/services/outbox.py)
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_DRAIN_INTERVAL_SECONDS: int = 60
+    OUTBOX_LEASE_SECONDS: int = 300  # Claimed rows become due again after this if the worker dies
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BASE_SECONDS: float = 60  # Doubles per attempt
+    OUTBOX_RETRY_MAX_SECONDS: float = 6 * 3600
+    OUTBOX_DOMAIN_RATE_PER_SECOND: float = 20  # Per recipient domain; 0 disables the limit
+    OUTBOX_DOMAIN_BURST: float = 40
+
+    # Fraud scanning (app/services/fraud_detection.py)
+    FRAUD_RULES_FILE: str = ""  # JSON list of {"phrase", "weight", "category"}; empty = built-in rules
+    FRAUD_SUSPICIOUS_SCORE: float = 0.6  # Combined score at which a listing is flagged
+    FRAUD_SCAN_CHUNK_SIZE: int = 1000  # Rows per query and commit
+    FRAUD_SCAN_INTERVAL_SECONDS: int = 3600  # Incremental rescan of changed rows
+
+    # Near-duplicate scholarships, MinHash + LSH (app/services/dedup.py)
+    DEDUP_SHINGLE_WORDS: int = 3  # Words per shingle
+    DEDUP_NUM_PERM: int = 128  # MinHash signature length; must be a multiple of DEDUP_BANDS
+    DEDUP_BANDS: int = 16  # 16 bands x 8 rows: pairs above ~0.7 Jaccard become candidates
+    DEDUP_THRESHOLD: float = 0.8  # Estimated Jaccard at which candidates join a cluster
+    DEDUP_CHUNK_SIZE: int = 1000  # Signatures computed per query and commit
+    DEDUP_INTERVAL_SECONDS: int = 6 * 3600
+
+    # In-app notification push (SSE, app/services/notification_stream.py)
+    NOTIFICATION_STREAM_POLL_SECONDS: float = 2  # One query per worker per tick, not per connection
+    NOTIFICATION_STREAM_LAG_SECONDS: float = 30  # Rows committed out of id order within this are still pushed
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100  # Per connection; events beyond this are dropped
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15
+    NOTIFICATION_STREAM_RETRY_MS: int = 5000  # Client reconnect delay
+    NOTIFICATION_STREAM_TOKEN_SECONDS: int = 60  # Lifetime of the single-purpose token in the stream URL
+
+    # Chatbot LLM (app/services/chatbot.py)
+    CHAT_BACKEND: str = "openai"  # openai, or fake for offline load tests
+    CHAT_MODEL: str = "gpt-4o-mini"
+    CHAT_MAX_TOKENS: int = 300
+    CHAT_TEMPERATURE: float = 0.7
+    FAKE_LLM_FIRST_TOKEN_MS: float = 400
+    FAKE_LLM_TOKEN_MS: float = 15
+    FAKE_LLM_TOKENS: int = 120
+
+    # Chatbot answer cache for text-only messages (app/services/chat_cache.py)
+    CHAT_CACHE_ENABLED: bool = True
+    CHAT_CACHE_MAX_ITEMS: int = 5000
+    CHAT_CACHE_TTL_SECONDS: int = 24 * 3600
+    CHAT_CACHE_SIMILARITY_ENABLED: bool = False  # Also answer near-duplicate questions
+    CHAT_CACHE_SIMILARITY_THRESHOLD: float = 0.9  # Cosine of hashed bag-of-words vectors
+
+    # Catalog TF-IDF index shared by the recommender and chatbot retrieval (app/recommendation/index.py)
+    CATALOG_INDEX_CHECK_SECONDS: int = 60  # How often a worker compares the catalog signature
+    CATALOG_INDEX_MAX_AGE_SECONDS: int = 3600  # Rebuild anyway, e.g. for renamed universities
+    CHAT_RETRIEVAL_ENABLED: bool = True
+    CHAT_RETRIEVAL_TOP_K: int = 5
+    CHAT_RETRIEVAL_MIN_SCORE: float = 0.05
+    CHAT_RETRIEVAL_TOKEN_BUDGET: int = 600  # Prompt tokens spent on catalog records (~4 chars/token)
+
+    # Chat history paging and conversation context (app/services/chat_context.py)
+    CHAT_HISTORY_PAGE_SIZE: int = 50
+    CHAT_HISTORY_MAX_PAGE_SIZE: int = 200
+    CHAT_CONTEXT_TURNS: int = 6  # Latest messages sent with a new question
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 800  # Summary + turns
+    CHAT_CONTEXT_MAX_AGE_MINUTES: int = 60  # Older conversations are not continued
+    CHAT_SUMMARY_BATCH: int = 10  # Fold older turns into the summary once this many piled up
+    CHAT_SUMMARY_MAX_BATCH: int = 50  # Turns folded per refresh
+    CHAT_SUMMARY_MAX_TOKENS: int = 200
+
+    # Chat attachments (app/services/attachments.py)
+    ATTACHMENT_MAX_BYTES: int = 10 * 1024 * 1024  # Larger uploads get 413
+    ATTACHMENT_WORKERS: int = 2  # Parser processes per worker
+    ATTACHMENT_PDF_TEXT_BUDGET: int = 10000  # Characters sent to the model; extraction stops here
+    ATTACHMENT_PDF_MAX_PAGES: int = 50
+    ATTACHMENT_IMAGE_MAX_SIDE: int = 1024  # px, longest side
+    ATTACHMENT_IMAGE_QUALITY: int = 80  # JPEG
+    ATTACHMENT_CACHE_MAX_ITEMS: int = 256
+    ATTACHMENT_CACHE_TTL_SECONDS: int = 24 * 3600
+
+    # Resume PDFs (app/services/resume_cache.py)
+    RESUME_CACHE_DIR: str = "/tmp/scholariq-resumes"  # One PDF per profile hash; share it across workers
+    RESUME_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Least recently used files are evicted past this
+    RESUME_RENDER_WORKERS: int = 2  # Render processes per worker
+    RESUME_EXPORT_BATCH_SIZE: int = 500  # Users read per query by the bulk ZIP export
+    RESUME_EXPORT_IN_FLIGHT: int = 8  # PDFs rendered or held at once per export
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Float, DateTime, Boolean, ForeignKey, Table, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
@@ -11,7 +11,11 @@ saved_scholarships = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id")),
     Column("scholarship_id", Integer, ForeignKey("scholarships.id")),
-    Column("saved_at", DateTime, default=datetime.datetime.utcnow)
+    Column("saved_at", DateTime, default=datetime.datetime.utcnow),
+    # One row per (user, scholarship); also serves "saved by user" lookups
+    Index("uq_saved_scholarships_user_scholarship", "user_id", "scholarship_id", unique=True),
+    # Reverse lookup for Scholarship.saved_by (deadline reminders)
+    Index("ix_saved_scholarships_scholarship_id", "scholarship_id"),
 )
 
 class User(Base):
@@ -58,6 +62,10 @@ class User(Base):
 
 class Scholarship(Base):
     __tablename__ = "scholarships"
+    __table_args__ = (
+        # Scholarships of a university, and the CSV importers' upsert key (university_id, title)
+        Index("ix_scholarships_university_id_title", "university_id", "title"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
@@ -66,14 +74,14 @@ class Scholarship(Base):
     university_id = Column(Integer, ForeignKey("universities.id"), nullable=False)
     
     # Geographical denormalization for faster filtering
-    country = Column(String)
+    country = Column(String, index=True)
     city = Column(String)
     
     # Funding Details
     funding_type = Column(String)  # Fully Funded, Partial, etc.
     funding_amount = Column(String)  # consolidated naming
     amount = Column(String)  # Keeping for backward compat briefly
-    deadline = Column(DateTime)
+    deadline = Column(DateTime, index=True)
     
     # ============================================
     # VERIFIED FINANCIAL DATA (New Feature)
@@ -127,11 +135,73 @@ class Scholarship(Base):
     longitude = Column(Float, nullable=True)
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Bumped by every ORM / Core UPDATE; the incremental fraud scan rescans rows changed since their last scan
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     # Relationships
     university = relationship("University", back_populates="scholarships")
     saved_by = relationship("User", secondary=saved_scholarships, back_populates="saved_items")
 
+class FraudScanResult(Base):
+    """Latest fraud scan of a scholarship (app/services/fraud_detection.py)."""
+    __tablename__ = "fraud_scan_results"
+    __table_args__ = (
+        Index("ix_fraud_scan_results_score", "score"),  # Admin review queue, riskiest first
+    )
+
+    scholarship_id = Column(Integer, ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, default=0.0)  # 0..1
+    risk_level = Column(String, nullable=False)  # SAFE, LOW, MEDIUM, HIGH
+    matches = Column(Text, nullable=True)  # JSON list of {"phrase", "category", "weight"}
+    rules_version = Column(String, nullable=False)  # Rows scanned with other rules are rescanned
+    scanned_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ScholarshipSignature(Base):
+    """MinHash signature of a scholarship's title + description (app/services/dedup.py)."""
+    __tablename__ = "scholarship_signatures"
+
+    scholarship_id = Column(Integer, ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True)
+    minhash = Column(LargeBinary, nullable=False)  # DEDUP_NUM_PERM little-endian uint32
+    params = Column(String, nullable=False)  # Signatures computed with other settings are recomputed
+    computed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ScholarshipLSHBucket(Base):
+    """One LSH band hash per (scholarship, band); rows sharing a bucket are duplicate candidates."""
+    __tablename__ = "scholarship_lsh_buckets"
+    __table_args__ = (
+        Index("ix_scholarship_lsh_buckets_band_bucket", "band", "bucket"),
+    )
+
+    scholarship_id = Column(Integer, ForeignKey("scholarships.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+
+class DuplicateCluster(Base):
+    """Near-duplicate scholarships awaiting admin review."""
+    __tablename__ = "duplicate_clusters"
+    __table_args__ = (
+        Index("ix_duplicate_clusters_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, default="open", nullable=False)  # open, merged, dismissed
+    canonical_id = Column(Integer, nullable=True)  # Scholarship kept by a merge
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    resolved_at = Column(DateTime, nullable=True)
+
+    members = relationship("DuplicateClusterMember", cascade="all, delete-orphan")
+
+class DuplicateClusterMember(Base):
+    __tablename__ = "duplicate_cluster_members"
+    __table_args__ = (
+        Index("ix_duplicate_cluster_members_scholarship_id", "scholarship_id"),
+    )
+
+    cluster_id = Column(Integer, ForeignKey("duplicate_clusters.id", ondelete="CASCADE"), primary_key=True)
+    # No foreign key: members of a merged cluster are kept as history after their rows are deleted
+    scholarship_id = Column(Integer, primary_key=True)
+    similarity = Column(Float, nullable=True)  # Estimated Jaccard to the cluster's lowest id
+
 class University(Base):
     __tablename__ = "universities"
     id = Column(Integer, primary_key=True, index=True)
@@ -175,6 +245,15 @@ class University(Base):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_sent_date", "user_id", "sent_date"),
+        # Outbox worker: due pending rows in order
+        Index("ix_notifications_status_next_attempt_at", "status", "next_attempt_at"),
+        # One notification per (channel, user, scholarship, reminder type); enqueueing twice is a no-op
+        Index("uq_notifications_idempotency_key", "idempotency_key", unique=True),
+        # Unread counter for the notification bell
+        Index("ix_notifications_user_id_read_at", "user_id", "read_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     scholarship_id = Column(Integer, ForeignKey("scholarships.id"), nullable=True)
@@ -183,6 +262,14 @@ class Notification(Base):
     status = Column(String, default="sent") # sent, pending, failed
     sent_date = Column(DateTime, default=datetime.datetime.utcnow)
 
+    # Outbox delivery state (see app/services/outbox.py)
+    channel = Column(String, default="email")  # email, in_app
+    idempotency_key = Column(String, nullable=True)  # e.g. email:deadline_7d:<user>:<scholarship>
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    read_at = Column(DateTime, nullable=True)  # in_app only; NULL = unread
+
 class UserScholarshipInteraction(Base):
     """Tracks user interactions with scholarships for ML training"""
     __tablename__ = "user_scholarship_interactions"
@@ -192,8 +279,71 @@ class UserScholarshipInteraction(Base):
     interaction_type = Column(String)  # "view", "save", "apply"
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+class ScholarshipInteractionRollup(Base):
+    """Per-scholarship interaction counts in hourly and daily buckets (maintained incrementally)"""
+    __tablename__ = "scholarship_interaction_rollups"
+    __table_args__ = (
+        Index("uq_interaction_rollups_bucket", "scholarship_id", "granularity", "bucket_start", unique=True),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    scholarship_id = Column(Integer, ForeignKey("scholarships.id"), nullable=False)
+    granularity = Column(String, nullable=False)  # "hour" or "day"
+    bucket_start = Column(DateTime, nullable=False)
+    views = Column(Integer, default=0, nullable=False)
+    saves = Column(Integer, default=0, nullable=False)
+    applies = Column(Integer, default=0, nullable=False)
+
+class ScholarshipTrending(Base):
+    """Time-decayed popularity per scholarship, stored as a log-score (see recommendation/popularity.py)"""
+    __tablename__ = "scholarship_trending"
+    scholarship_id = Column(Integer, ForeignKey("scholarships.id"), primary_key=True)
+    log_score = Column(Float, nullable=False, index=True)
+    total_events = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class ProfileMatchTerm(Base):
+    """Reverse index of user profile criteria for new-scholarship alerts (see recommendation/percolator.py)"""
+    __tablename__ = "profile_match_terms"
+    __table_args__ = (
+        # Postings lookup: all users holding a term
+        Index("ix_profile_match_terms_term_user_id", "term", "user_id"),
+    )
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    term = Column(String, primary_key=True)  # e.g. "degree:master", "country:united kingdom", "field:computer"
+
+class JobLease(Base):
+    """Cluster-wide lock per scheduled job (shard): who ran the latest slot and until when it is held"""
+    __tablename__ = "job_leases"
+    name = Column(String, primary_key=True)  # e.g. "deadline_reminders#0/4"
+    owner = Column(String, nullable=True)  # host:pid:token of the worker holding it
+    slot = Column(Integer, nullable=True)  # Latest claimed schedule slot (epoch seconds // period)
+    acquired_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)  # NULL once released
+
+class JobRun(Base):
+    """History of scheduled job executions"""
+    __tablename__ = "job_runs"
+    __table_args__ = (
+        Index("ix_job_runs_job_name_started_at", "job_name", "started_at"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String, nullable=False)
+    shard = Column(String, nullable=True)  # "2/4" for sharded jobs
+    slot = Column(Integer, nullable=True)
+    owner = Column(String)
+    status = Column(String, default="running")  # running, success, failed
+    started_at = Column(DateTime, default=datetime.datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    result = Column(Text, nullable=True)  # JSON summary returned by the job
+    error = Column(Text, nullable=True)
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Keyset pagination of a user's history on (timestamp, id)
+        Index("ix_chat_messages_user_id_timestamp_id", "user_id", "timestamp", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))  # Link to User
@@ -205,8 +355,22 @@ class ChatMessage(Base):
     # Relationship with User
     user = relationship("User", back_populates="messages")
 
+class ChatSummary(Base):
+    """Rolling summary of a user's older chat turns (app/services/chat_context.py)."""
+    __tablename__ = "chat_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    summary = Column(Text, nullable=False, default="")
+    # Last message folded into the summary; (timestamp, id) keyset position
+    covered_until_timestamp = Column(DateTime, nullable=True)
+    covered_until_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("ix_applications_user_id_scholarship_id", "user_id", "scholarship_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
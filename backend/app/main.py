@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, users, scholarships, recommendations, chatbot, dashboard, applications, resume
+from app.api import auth, users, scholarships, recommendations, chatbot, dashboard, applications, resume, notifications
 from app.tasks import start_scheduler
 from app.services.email import send_deadline_email
 
@@ -13,10 +13,21 @@ async def test_email(to_email: str):
 
 from app.db.session import init_db
 
+from app.recommendation.logging import interaction_buffer
+
 @app.on_event("startup")
 async def startup_event():
     init_db()  # Ensure database tables are created on startup
+    interaction_buffer.start()
     start_scheduler()
+    # Build the catalog TF-IDF index in the background so the first chat/recommendation doesn't wait
+    import threading
+    from app.recommendation.index import get_catalog_index
+    threading.Thread(target=get_catalog_index, daemon=True, name="catalog-index").start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    interaction_buffer.stop()  # Flush buffered interaction events
 
 # CORS middleware configuration
 app.add_middleware(
@@ -45,6 +56,7 @@ app.include_router(chatbot.router, prefix="/api/chat", tags=["Chatbot"])
 app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 app.include_router(applications.router, prefix="/applications", tags=["Applications ATS"])
 app.include_router(resume.router, prefix="/resume", tags=["Resume"])
+app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
 from app.api import admin
 app.include_router(admin.router, prefix="/admin", tags=["Admin Panel"])
 
@@ -0,0 +1,229 @@
+"""
+Implicit-feedback collaborative filtering (Hu, Koren & Volinsky ALS).
+
+Training (offline, see scripts/train_cf.py) streams user_scholarship_interactions into
+a sparse user x item confidence matrix and writes float32 factor arrays. Serving
+memory-maps those arrays and scores a candidate list with one matrix-vector product.
+
+Artifact layout in CF_MODEL_DIR:
+    CURRENT                       name of the live version, swapped atomically
+    versions/<version>/
+        user_factors.npy  float32 [n_users, k]
+        item_factors.npy  float32 [n_items, k]
+        user_ids.npy      int64 sorted user ids (row i of user_factors)
+        item_ids.npy      int64 sorted scholarship ids (row j of item_factors)
+        meta.json         training parameters and stats
+
+A version directory is never written to once published, so a worker that has the
+factors memory-mapped keeps reading a complete, consistent set until it reloads.
+"""
+import datetime
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.recommendation.popularity import EVENT_WEIGHTS
+
+
+# --- Training ---
+
+def stream_interactions(db: Session, chunk_size: int = 50000,
+                        before: datetime.datetime = None) -> Iterator[tuple]:
+    """
+    Yields (user_ids, item_ids, weights) numpy chunks in id order, never loading the whole table.
+    before limits training to events logged earlier (offline evaluation).
+    """
+    last_id = 0
+    while True:
+        query = db.query(
+            models.UserScholarshipInteraction.id,
+            models.UserScholarshipInteraction.user_id,
+            models.UserScholarshipInteraction.scholarship_id,
+            models.UserScholarshipInteraction.interaction_type,
+        ).filter(
+            models.UserScholarshipInteraction.id > last_id,
+            models.UserScholarshipInteraction.user_id.isnot(None),
+            models.UserScholarshipInteraction.scholarship_id.isnot(None),
+        )
+        if before is not None:
+            query = query.filter(models.UserScholarshipInteraction.created_at < before)
+        rows = query.order_by(models.UserScholarshipInteraction.id).limit(chunk_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield (
+            np.fromiter((r.user_id for r in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((r.scholarship_id for r in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((EVENT_WEIGHTS.get(r.interaction_type, 0.0) for r in rows), dtype=np.float32, count=len(rows)),
+        )
+
+
+def build_matrix(chunks) -> tuple:
+    """
+    Accumulates chunks into a CSR matrix of summed event weights.
+    Returns (matrix, user_ids, item_ids) where ids are the sorted row/column labels.
+    """
+    users, items, weights = [], [], []
+    for u, i, w in chunks:
+        users.append(u)
+        items.append(i)
+        weights.append(w)
+    if not users:
+        return sparse.csr_matrix((0, 0), dtype=np.float32), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    users, items, weights = np.concatenate(users), np.concatenate(items), np.concatenate(weights)
+    user_ids, user_rows = np.unique(users, return_inverse=True)
+    item_ids, item_cols = np.unique(items, return_inverse=True)
+    # Duplicate (user, item) pairs are summed by the COO -> CSR conversion
+    matrix = sparse.coo_matrix(
+        (weights, (user_rows, item_cols)), shape=(len(user_ids), len(item_ids)), dtype=np.float32
+    ).tocsr()
+    return matrix, user_ids, item_ids
+
+
+def _als_step(confidence: sparse.csr_matrix, fixed: np.ndarray, regularization: float) -> np.ndarray:
+    """Solves every row's factors with the other side held fixed (one half of an ALS sweep)."""
+    n, k = confidence.shape[0], fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(k)
+    solved = np.zeros((n, k), dtype=np.float64)
+    for row in range(n):
+        start, end = confidence.indptr[row], confidence.indptr[row + 1]
+        if start == end:
+            continue
+        cols = confidence.indices[start:end]
+        conf = confidence.data[start:end].astype(np.float64)
+        factors = fixed[cols]
+        # (Y^T C_u Y + reg I) = gram + Y^T (C_u - I) Y, and b = Y^T C_u p_u
+        a = gram + (factors.T * (conf - 1.0)) @ factors
+        b = factors.T @ conf
+        solved[row] = np.linalg.solve(a, b)
+    return solved
+
+
+def train_als(matrix: sparse.csr_matrix, factors: int = 32, iterations: int = 15,
+              regularization: float = 0.1, alpha: float = 20.0, seed: int = 42) -> tuple:
+    """Fits user/item factors on the weight matrix; confidence = 1 + alpha * weight."""
+    rng = np.random.default_rng(seed)
+    confidence = matrix.copy().astype(np.float64)
+    confidence.data = 1.0 + alpha * confidence.data
+    confidence_t = confidence.T.tocsr()
+
+    user_factors = rng.normal(scale=0.01, size=(matrix.shape[0], factors))
+    item_factors = rng.normal(scale=0.01, size=(matrix.shape[1], factors))
+    for _ in range(iterations):
+        user_factors = _als_step(confidence, item_factors, regularization)
+        item_factors = _als_step(confidence_t, user_factors, regularization)
+    return user_factors.astype(np.float32), item_factors.astype(np.float32)
+
+
+KEEP_VERSIONS = 3  # Older versions are deleted; workers still mapping one keep their open inode
+
+
+def save_model(model_dir: str, user_factors, item_factors, user_ids, item_ids, params: dict) -> str:
+    """Writes a new version directory and publishes it by swapping CURRENT. Returns the version."""
+    version = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    versions_dir = os.path.join(model_dir, "versions")
+    target = os.path.join(versions_dir, version)
+    os.makedirs(target)
+    np.save(os.path.join(target, "user_factors.npy"), np.ascontiguousarray(user_factors, dtype=np.float32))
+    np.save(os.path.join(target, "item_factors.npy"), np.ascontiguousarray(item_factors, dtype=np.float32))
+    np.save(os.path.join(target, "user_ids.npy"), user_ids.astype(np.int64))
+    np.save(os.path.join(target, "item_ids.npy"), item_ids.astype(np.int64))
+    with open(os.path.join(target, "meta.json"), "w") as f:
+        json.dump({
+            **params,
+            "version": version,
+            "n_users": int(len(user_ids)),
+            "n_items": int(len(item_ids)),
+            "trained_at": datetime.datetime.utcnow().isoformat(),
+        }, f, indent=2)
+
+    # Atomic swap so serving only ever sees a fully written version
+    pointer = os.path.join(model_dir, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+    for old in sorted(os.listdir(versions_dir))[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(versions_dir, old), ignore_errors=True)
+    return version
+
+
+def current_version_dir(model_dir: str) -> Optional[str]:
+    """Directory of the live version, or None if no model was published."""
+    try:
+        with open(os.path.join(model_dir, "CURRENT")) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return os.path.join(model_dir, "versions", version) if version else None
+
+
+# --- Serving ---
+
+class CFModel:
+    def __init__(self, model_dir: str):
+        self.user_factors = np.load(os.path.join(model_dir, "user_factors.npy"), mmap_mode="r")
+        self.item_factors = np.load(os.path.join(model_dir, "item_factors.npy"), mmap_mode="r")
+        self.user_ids = np.load(os.path.join(model_dir, "user_ids.npy"))
+        self.item_ids = np.load(os.path.join(model_dir, "item_ids.npy"))
+
+    @classmethod
+    def from_factors(cls, user_factors, item_factors, user_ids, item_ids) -> "CFModel":
+        """In-memory model straight from train_als, without publishing it (offline evaluation)."""
+        model = cls.__new__(cls)
+        model.user_factors, model.item_factors = user_factors, item_factors
+        model.user_ids, model.item_ids = np.asarray(user_ids), np.asarray(item_ids)
+        return model
+
+    @staticmethod
+    def _lookup(sorted_ids: np.ndarray, ids) -> np.ndarray:
+        """Row index for each id, -1 where the id was not in training data."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(sorted_ids) == 0:
+            return np.full(len(ids), -1)
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[pos] == ids, pos, -1)
+
+    def score(self, user_id: int, scholarship_ids: List[int]) -> Dict[int, float]:
+        """Predicted preference per scholarship; empty if the user has no interactions."""
+        user_row = self._lookup(self.user_ids, [user_id])[0]
+        if user_row < 0 or not scholarship_ids:
+            return {}
+        item_rows = self._lookup(self.item_ids, scholarship_ids)
+        known = item_rows >= 0
+        if not known.any():
+            return {}
+        scores = self.item_factors[item_rows[known]] @ self.user_factors[user_row]
+        return dict(zip(np.asarray(scholarship_ids)[known].tolist(), scores.tolist()))
+
+
+_model: Optional[CFModel] = None
+_model_dir: Optional[str] = None
+_model_lock = threading.Lock()
+
+
+def get_cf_model() -> Optional[CFModel]:
+    """Worker-wide model, reloaded when a new version is published. None if never trained."""
+    global _model, _model_dir
+    version_dir = current_version_dir(settings.CF_MODEL_DIR)
+    if version_dir is None:
+        return None
+    if _model is None or version_dir != _model_dir:
+        with _model_lock:
+            if _model is None or version_dir != _model_dir:
+                try:
+                    _model = CFModel(version_dir)
+                    _model_dir = version_dir
+                except Exception as e:
+                    print(f"Error loading CF model: {e}")
+                    return _model  # Keep serving the previous version
+    return _model
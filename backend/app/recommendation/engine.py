@@ -13,10 +13,11 @@ class UserProfile(BaseModel):
     preferred_countries: List[str] = []
     target_budget_per_year_usd: float = 0
 
-def score_scholarship(user: UserProfile, sch: any) -> dict:
+def score_scholarship(user: UserProfile, sch: any, popularity: float = 0.0) -> dict:
     """
     Scoring logic for Phase 1: Rule-Based Engine.
     'sch' is an instance ofmodels.Scholarship or similar object with attributes.
+    'popularity' is the trending feature in [0, 1) from recommendation.popularity.
     """
     reasons = []
     fit_score = 0
@@ -76,8 +77,8 @@ def score_scholarship(user: UserProfile, sch: any) -> dict:
     if is_fully_funded:
         fit_score += 20
         reasons.append("Fully funded: Covers tuition and likely more.")
-    elif sch.funding_amount_numeric and user.target_budget_per_year_usd > 0:
-        if sch.funding_amount_numeric >= (sch.tuition_fee_numeric or 30000) - user.target_budget_per_year_usd:
+    elif sch.scholarship_amount_numeric and user.target_budget_per_year_usd > 0:
+        if sch.scholarship_amount_numeric >= (sch.tuition_fee_numeric or 30000) - user.target_budget_per_year_usd:
             fit_score += 15
             reasons.append("Scholarship makes this university affordable within your budget.")
 
@@ -92,6 +93,12 @@ def score_scholarship(user: UserProfile, sch: any) -> dict:
                 fit_score += 10
                 reasons.append("Optimal application window (1-6 months left).")
 
+    # 7. Trending (+5)
+    if popularity > 0:
+        fit_score += round(5 * popularity)
+        if popularity >= 0.5:
+            reasons.append("Popular with students right now.")
+
     # Clamp Score
     final_score = max(0, min(100, fit_score))
 
@@ -0,0 +1,114 @@
+"""
+Feature extraction for the scholar_match model.
+
+Shared by serving (/recommendations/profile) and training (scripts/train_scholar_match.py)
+so both always compute identical features. Everything works on aligned arrays of
+(user profile, scholarship) pairs, so a whole candidate set or training set is one call.
+"""
+import os
+import threading
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.recommendation.engine import UserProfile
+
+# Column order of the model input. Changing it requires retraining.
+FEATURE_NAMES = ["degree_path_match", "field_match_score", "country_match", "cgpa_gap"]
+
+DEFAULT_MIN_CGPA = 3.0
+
+
+def build_user_profile(user) -> UserProfile:
+    """Maps a models.User row to the UserProfile DTO used by the engine."""
+    return UserProfile(
+        id=user.id,
+        full_name=user.full_name or "User",
+        country=user.nationality or "Pakistan",
+        highest_completed_degree=user.degree_level or "Bachelor's",
+        field_of_study=user.field_of_interest or "",
+        specialization=user.specialization,
+        cgpa=user.cgpa or 0.0,
+        preferred_countries=["United Kingdom", "Canada"],  # Placeholder
+        target_budget_per_year_usd=20000  # Placeholder
+    )
+
+
+def extract_features(profiles: Sequence[UserProfile], scholarships: Sequence) -> np.ndarray:
+    """
+    Returns a float array [n_pairs, len(FEATURE_NAMES)] for aligned (profile, scholarship) pairs.
+    Scholarships are models.Scholarship rows (with .university loaded) or any object
+    with the same attributes.
+    """
+    n = len(scholarships)
+    if n == 0:
+        return np.zeros((0, len(FEATURE_NAMES)), dtype=np.float64)
+
+    # Scholarship side
+    levels = np.array([s.degree_level or "" for s in scholarships], dtype=str)
+    fields = np.char.lower(np.array([s.field_of_study or "" for s in scholarships], dtype=str))
+    countries = np.array([s.country or "" for s in scholarships], dtype=str)
+    has_uni = np.array([s.university is not None for s in scholarships])
+    min_cgpa = np.array([
+        (s.university.min_cgpa or DEFAULT_MIN_CGPA) if s.university is not None else 0.0
+        for s in scholarships
+    ], dtype=np.float64)
+
+    # User side
+    is_bachelor = np.array([p.highest_completed_degree == "Bachelor's" for p in profiles])
+    user_fields = np.array([p.field_of_study.lower() for p in profiles], dtype=str)
+    user_cgpa = np.array([p.cgpa for p in profiles], dtype=np.float64)
+    preferred = [set(p.preferred_countries) for p in profiles]
+
+    degree = (is_bachelor & (np.char.find(levels, "Master") >= 0)).astype(np.float64)
+    field = np.where(np.char.find(fields, user_fields) >= 0, 1.0, 0.5)
+    country = np.array([c in pref for c, pref in zip(countries, preferred)], dtype=np.float64)
+    cgpa_gap = np.where(has_uni, user_cgpa - min_cgpa, 0.0)
+
+    return np.column_stack([degree, field, country, cgpa_gap])
+
+
+def extract_candidate_features(profile: UserProfile, scholarships: Sequence) -> np.ndarray:
+    """Serving helper: one profile against a list of candidates."""
+    return extract_features([profile] * len(scholarships), scholarships)
+
+
+# --- Model loading (serving) ---
+
+_model = None
+_model_mtime: float = 0.0
+_model_lock = threading.Lock()
+
+
+def get_match_model():
+    """Worker-wide scholar_match model, reloaded when the artifact changes. None if absent."""
+    global _model, _model_mtime
+    path = settings.SCHOLAR_MATCH_MODEL_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _model is None or mtime != _model_mtime:
+        with _model_lock:
+            if _model is None or mtime != _model_mtime:
+                try:
+                    import joblib
+                    _model = joblib.load(path)
+                    _model_mtime = mtime
+                    print("ML Model loaded successfully.")
+                except Exception as e:
+                    print(f"Error loading ML model: {e}")
+                    return None
+    return _model
+
+
+def predict_match_probability(model, features: np.ndarray) -> Optional[np.ndarray]:
+    """P(positive) per row, or None if the model cannot score these features."""
+    if model is None or len(features) == 0:
+        return None
+    try:
+        return model.predict_proba(features)[:, 1]
+    except Exception as e:
+        print(f"ML prediction failed: {e}")
+        return None
@@ -0,0 +1,192 @@
+"""
+Per-worker TF-IDF index over the scholarship catalog.
+
+One index serves both content-based recommendations (similarity of a profile to a
+candidate set) and chatbot retrieval (top matches for a question). It is built once
+from Scholarship + University rows and shared; get_catalog_index() rebuilds it when
+the catalog signature (row count, max id, max updated_at, flagged rows) changes or it is older than
+CATALOG_INDEX_MAX_AGE_SECONDS, checking at most every CATALOG_INDEX_CHECK_SECONDS.
+
+Only the very first build happens on a request. Later checks and rebuilds run on a
+background thread while requests keep using the previous index, which is swapped out
+once the new one is ready.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+_base_analyzer = TfidfVectorizer(stop_words="english").build_analyzer()
+
+
+def analyze(text: str) -> List[str]:
+    # Fold plurals so "masters" finds "Master" and "scholarships" finds "Scholarship"
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in _base_analyzer(text)]
+
+
+_metrics = {"builds": 0, "last_build_seconds": 0.0, "searches": 0, "search_seconds": 0.0}
+
+
+def _signature(db: Session) -> tuple:
+    S = models.Scholarship
+    # Fraud flags keep updated_at (fraud_detection.scan_catalog), so they are counted separately
+    count, max_id, max_updated, flagged = db.query(
+        func.count(S.id), func.max(S.id), func.max(S.updated_at),
+        func.sum(case((S.is_suspicious.is_(True), 1), else_=0)),
+    ).one()
+    return count, max_id, max_updated, flagged or 0
+
+
+class CatalogIndex:
+    def __init__(self, ids: List[int], records: List[dict], documents: List[str], signature: tuple):
+        self.ids = np.array(ids, dtype=np.int64)
+        self.records = records
+        self.row_of: Dict[int, int] = {sid: row for row, sid in enumerate(ids)}
+        self.suspicious = np.array([bool(r["is_suspicious"]) for r in records], dtype=bool)
+        self.signature = signature
+        self.built_at = time.monotonic()
+        self.vectorizer = TfidfVectorizer(analyzer=analyze)
+        try:
+            # Rows are L2-normalized, so a dot product is the cosine similarity
+            self.matrix = self.vectorizer.fit_transform(documents)
+        except ValueError:  # Empty catalog or no usable words
+            self.matrix = None
+
+    @classmethod
+    def build(cls, db: Session) -> "CatalogIndex":
+        started = time.perf_counter()
+        signature = _signature(db)
+        rows = db.query(
+            models.Scholarship.id, models.Scholarship.title, models.Scholarship.description,
+            models.Scholarship.field_of_study, models.Scholarship.degree_level, models.Scholarship.country,
+            models.Scholarship.city, models.Scholarship.funding_type, models.Scholarship.scholarship_amount_value,
+            models.Scholarship.deadline, models.Scholarship.is_suspicious, models.University.name.label("university"),
+        ).outerjoin(
+            models.University, models.University.id == models.Scholarship.university_id
+        ).order_by(models.Scholarship.id).all()
+
+        ids, records, documents = [], [], []
+        for row in rows:
+            record = dict(row._mapping)
+            ids.append(record["id"])
+            documents.append(" ".join(str(record[k] or "") for k in (
+                "title", "description", "field_of_study", "degree_level", "country", "city", "university", "funding_type"
+            )))
+            del record["description"]  # Not needed for prompts; keeps the index small
+            records.append(record)
+
+        index = cls(ids, records, documents, signature)
+        _metrics["builds"] += 1
+        _metrics["last_build_seconds"] = round(time.perf_counter() - started, 3)
+        print(f"📚 Catalog index built: {len(ids)} scholarships in {_metrics['last_build_seconds']}s")
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def version(self) -> str:
+        """Short id of the catalog state this index was built from (chat answer cache keys)."""
+        return hashlib.sha1(repr(self.signature).encode("utf-8")).hexdigest()[:12]
+
+    def _query_vector(self, text: str):
+        return self.vectorizer.transform([text or ""])
+
+    def similarity(self, text: str, scholarship_ids: Sequence[int]) -> np.ndarray:
+        """Cosine similarity of text to each id (0.0 for ids not in the index yet)."""
+        scores = np.zeros(len(scholarship_ids))
+        if self.matrix is None:
+            return scores
+        positions = [(i, self.row_of[sid]) for i, sid in enumerate(scholarship_ids) if sid in self.row_of]
+        if not positions:
+            return scores
+        targets, rows = zip(*positions)
+        scores[list(targets)] = (self.matrix[list(rows)] @ self._query_vector(text).T).toarray().ravel()
+        return scores
+
+    def search(self, text: str, k: int = 5, min_score: float = 0.0, exclude_suspicious: bool = True) -> List[Tuple[dict, float]]:
+        """Top-k records for a free-text query, best first."""
+        started = time.perf_counter()
+        try:
+            if self.matrix is None or k <= 0:
+                return []
+            scores = (self.matrix @ self._query_vector(text).T).toarray().ravel()
+            if exclude_suspicious:
+                scores[self.suspicious] = 0.0
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.records[i], float(scores[i])) for i in top if scores[i] > min_score]
+        finally:
+            _metrics["searches"] += 1
+            _metrics["search_seconds"] += time.perf_counter() - started
+
+
+_current: Optional[CatalogIndex] = None
+_last_check = 0.0
+_refreshing = False
+_lock = threading.Lock()
+
+
+def _refresh() -> None:
+    """Background check: rebuilds if the catalog changed, then swaps the new index in."""
+    global _current, _last_check, _refreshing
+    try:
+        db = SessionLocal()
+        try:
+            current = _current
+            fresh = time.monotonic() - current.built_at < settings.CATALOG_INDEX_MAX_AGE_SECONDS
+            if not (fresh and current.signature == _signature(db)):
+                _current = CatalogIndex.build(db)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"🚨 Catalog index refresh failed, serving the previous one: {e}")
+    finally:
+        _last_check = time.monotonic()
+        _refreshing = False
+
+
+def get_catalog_index(db: Session = None) -> CatalogIndex:
+    """The worker's shared index; built on first use, refreshed in the background after that."""
+    global _current, _last_check, _refreshing
+    if _current is None:
+        with _lock:
+            if _current is None:  # Nothing to serve yet, so this one build blocks
+                session = db or SessionLocal()
+                try:
+                    _current = CatalogIndex.build(session)
+                    _last_check = time.monotonic()
+                finally:
+                    if db is None:
+                        session.close()
+        return _current
+
+    if time.monotonic() - _last_check >= settings.CATALOG_INDEX_CHECK_SECONDS and not _refreshing:
+        with _lock:
+            if _refreshing:
+                return _current  # Another request started the refresh meanwhile
+            _refreshing = True
+        threading.Thread(target=_refresh, name="catalog-index-refresh", daemon=True).start()
+    return _current
+
+
+def index_metrics() -> dict:
+    searches = _metrics["searches"]
+    return {
+        "size": len(_current) if _current is not None else 0,
+        "builds": _metrics["builds"],
+        "refreshing": _refreshing,
+        "last_build_seconds": _metrics["last_build_seconds"],
+        "searches": searches,
+        "avg_search_ms": round(_metrics["search_seconds"] / searches * 1000, 3) if searches else 0.0,
+    }
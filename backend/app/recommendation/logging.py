@@ -1,15 +1,152 @@
+import atexit
+import datetime
+import queue
+import threading
+import time
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db import models
+from app.recommendation.popularity import apply_interactions
+
+
+class InteractionBuffer:
+    """
+    Write-behind sink for interaction events.
+
+    Events are queued in memory and a background thread writes them with one bulk
+    INSERT per batch (every `flush_interval` seconds or `batch_size` events, whichever
+    comes first). When the queue is full, callers wait up to `put_timeout` seconds
+    (backpressure) and the event is dropped after that.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, put_timeout: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+
+        # Metrics
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="interaction-buffer", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def stop(self, timeout: float = 10):
+        """Stops the flusher and writes whatever is still queued."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._flush(self._drain(limit=None))
+
+    def log(self, user_id: int, scholarship_id: int, interaction_type: str) -> bool:
+        """Queues an event. Returns False if it had to be dropped."""
+        if not self._thread:
+            self.start()
+        event = {
+            "user_id": user_id,
+            "scholarship_id": scholarship_id,
+            "interaction_type": interaction_type,
+            "created_at": datetime.datetime.utcnow(),
+        }
+        try:
+            self._queue.put(event, timeout=self.put_timeout)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "running": bool(self._thread and self._thread.is_alive()),
+        }
+
+    def _drain(self, limit):
+        batch = []
+        while limit is None or len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            batch = []
+            while len(batch) < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+                batch.extend(self._drain(limit=self.batch_size - len(batch)))
+            self._flush(batch)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        from app.db.session import SessionLocal
+
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            db.execute(insert(models.UserScholarshipInteraction), batch)
+            # Keep popularity rollups in step with the raw events, same transaction
+            apply_interactions(db, batch)
+            db.commit()
+            self.flushed += len(batch)
+            self.flushes += 1
+        except Exception as e:
+            db.rollback()
+            self.failed += len(batch)
+            print(f"❌ Interaction flush failed ({len(batch)} events lost): {e}")
+        finally:
+            db.close()
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+
+interaction_buffer = InteractionBuffer(
+    max_queue=settings.INTERACTION_BUFFER_MAX_QUEUE,
+    batch_size=settings.INTERACTION_BUFFER_BATCH_SIZE,
+    flush_interval=settings.INTERACTION_BUFFER_FLUSH_SECONDS,
+    put_timeout=settings.INTERACTION_BUFFER_PUT_TIMEOUT_SECONDS,
+)
+
 
 def log_interaction(db: Session, user_id: int, scholarship_id: int, interaction_type: str) -> None:
     """
     Logs user interactions (view, save, apply) for future ML training.
+    Writes are buffered and bulk-inserted in the background; `db` is not used
+    and only kept so existing callers keep working.
     """
-    interaction = models.UserScholarshipInteraction(
-        user_id=user_id,
-        scholarship_id=scholarship_id,
-        interaction_type=interaction_type
-    )
-    db.add(interaction)
-    db.commit()
-    db.refresh(interaction)
+    interaction_buffer.log(user_id, scholarship_id, interaction_type)
@@ -0,0 +1,215 @@
+"""
+Reverse ("percolator") matching of new scholarships against stored user profiles.
+
+Instead of scoring every user when a scholarship arrives, each user's criteria are
+indexed once as terms in profile_match_terms:
+
+    degree:<bachelor|master|phd>   target degree (degree:* if unknown)
+    country:<name>                 target country (country:* if unknown)
+    field:<token>                  tokens of major / field of interest / specialization
+    cgpa:<band>                    CGPA rounded down to 0.5 (cgpa:* if unknown)
+
+A scholarship is turned into the set of terms that would accept it per dimension,
+and the interested users are those holding a term from every dimension. The query
+walks the field postings (an index range on (term, user_id)) and checks the other
+dimensions with primary-key probes, so cost follows the number of users sharing a
+field with the scholarship, not the number of users. Matches become in-app
+new_match notifications.
+"""
+import hashlib
+import re
+from typing import Iterable, List, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.db import models
+from app.db.session import SessionLocal
+
+COUNTRY_ALIASES = {
+    "uk": "united kingdom", "england": "united kingdom", "scotland": "united kingdom", "britain": "united kingdom",
+    "usa": "united states", "us": "united states", "america": "united states",
+}
+FIELD_STOPWORDS = {
+    "and", "of", "the", "in", "for", "with", "studies", "science", "sciences", "general", "all", "any", "fields", "field",
+}
+GENERIC_FIELDS = {"", "all", "any", "all fields", "any field", "various", "multiple", "open"}
+CGPA_BANDS = [b / 2 for b in range(0, 9)]  # 0.0 .. 4.0
+
+
+def normalize_country(value) -> str:
+    value = (value or "").strip().lower()
+    return COUNTRY_ALIASES.get(value, value)
+
+
+def degree_tokens(value) -> Set[str]:
+    text = (value or "").lower()
+    tokens = set()
+    if "phd" in text or "doctor" in text:
+        tokens.add("phd")
+    if "master" in text or re.search(r"\b(ms|msc|ma|mba|mphil|mres)\b", text):
+        tokens.add("master")
+    if "bachelor" in text or "undergrad" in text or re.search(r"\b(bs|bsc|ba)\b", text):
+        tokens.add("bachelor")
+    return tokens
+
+
+def field_tokens(*values) -> Set[str]:
+    tokens = set()
+    for value in values:
+        for word in re.findall(r"[a-z]+", (value or "").lower()):
+            if len(word) >= 3 and word not in FIELD_STOPWORDS:
+                tokens.add(word)
+    return tokens
+
+
+def cgpa_band(cgpa: float) -> float:
+    return min(4.0, max(0.0, int(cgpa * 2) / 2))
+
+
+def profile_terms(user) -> Set[str]:
+    """Index terms for one user. Users without any field of study get no terms (no alerts)."""
+    fields = field_tokens(user.major, user.field_of_interest, user.specialization)
+    if not fields:
+        return set()
+
+    targets = degree_tokens(user.target_degree)
+    if not targets:
+        # Next step after the current degree, as in the rule engine
+        current = degree_tokens(user.current_degree or user.degree_level)
+        targets = {"phd"} if "master" in current else {"master"} if "bachelor" in current else set()
+
+    country = normalize_country(user.target_country)
+    terms = {f"field:{t}" for t in fields}
+    terms |= {f"degree:{t}" for t in targets} or {"degree:*"}
+    terms.add(f"country:{country}" if country else "country:*")
+    terms.add(f"cgpa:{cgpa_band(user.cgpa)}" if user.cgpa is not None else "cgpa:*")
+    return terms
+
+
+def index_user_profile(db: Session, user) -> None:
+    """Replaces the user's terms. Runs in the caller's transaction."""
+    db.query(models.ProfileMatchTerm).filter(models.ProfileMatchTerm.user_id == user.id).delete(
+        synchronize_session=False
+    )
+    terms = profile_terms(user)
+    if terms:
+        db.execute(models.ProfileMatchTerm.__table__.insert(), [{"user_id": user.id, "term": t} for t in terms])
+
+
+def rebuild_index(db: Session, chunk_size: int = 2000) -> int:
+    """Re-indexes every active user. Returns the number of users with terms."""
+    db.query(models.ProfileMatchTerm).delete(synchronize_session=False)
+    indexed, last_id = 0, 0
+    while True:
+        users = db.query(models.User).filter(
+            models.User.id > last_id, models.User.is_active.is_(True)
+        ).order_by(models.User.id).limit(chunk_size).all()
+        if not users:
+            break
+        last_id = users[-1].id
+        rows = [{"user_id": u.id, "term": t} for u in users for t in profile_terms(u)]
+        if rows:
+            db.execute(models.ProfileMatchTerm.__table__.insert(), rows)
+        indexed += len({r["user_id"] for r in rows})
+    return indexed
+
+
+def scholarship_query_terms(scholarship) -> List[List[str]]:
+    """One list of acceptable terms per dimension; a user must hold a term from every list."""
+    dimensions = []
+
+    field_text = (scholarship.field_of_study or "").strip().lower()
+    if field_text not in GENERIC_FIELDS:
+        tokens = field_tokens(field_text)
+        if tokens:
+            dimensions.append([f"field:{t}" for t in tokens])
+
+    degrees = degree_tokens(scholarship.degree_level)
+    if degrees:
+        dimensions.append([f"degree:{t}" for t in degrees] + ["degree:*"])
+
+    country = normalize_country(scholarship.country)
+    if country:
+        dimensions.append([f"country:{country}", "country:*"])
+
+    university = scholarship.university
+    if university is not None and university.min_cgpa:
+        bands = [b for b in CGPA_BANDS if b >= cgpa_band(university.min_cgpa)]
+        dimensions.append([f"cgpa:{b}" for b in bands] + ["cgpa:*"])
+    return dimensions
+
+
+def match_users(db: Session, scholarship) -> List[int]:
+    """Active users whose indexed profile accepts the scholarship."""
+    dimensions = scholarship_query_terms(scholarship)
+    # Without a field, degree or country constraint every profile would match
+    if len(dimensions) < 2 and not any(d[0].startswith("field:") for d in dimensions):
+        return []
+    # Drive from the first (most selective: field) postings list and probe the other
+    # dimensions per candidate through the (user_id, term) primary key
+    table = models.ProfileMatchTerm.__table__
+    driver = table.alias("driver")
+    candidate_ids = select(driver.c.user_id).where(driver.c.term.in_(dimensions[0])).distinct()
+    for terms in dimensions[1:]:
+        probe = table.alias()
+        candidate_ids = candidate_ids.where(
+            select(probe.c.user_id).where(probe.c.user_id == driver.c.user_id, probe.c.term.in_(terms)).exists()
+        )
+
+    # Exact CGPA check on the (small) candidate set; bands are coarse
+    query = db.query(models.User.id).filter(
+        models.User.id.in_(candidate_ids), models.User.is_active.is_(True)
+    )
+    university = scholarship.university
+    if university is not None and university.min_cgpa:
+        query = query.filter((models.User.cgpa.is_(None)) | (models.User.cgpa >= university.min_cgpa))
+    return [row.id for row in query]
+
+
+def _match_key(scholarship) -> str:
+    # Importers delete and re-insert scholarships; key on identity, not the row id
+    identity = f"{scholarship.university_id}|{(scholarship.title or '').strip().lower()}"
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+
+def percolate(db: Session, scholarships: Iterable) -> int:
+    """Queues new_match notifications for every user matching each scholarship. The caller commits."""
+    from app.services import outbox
+
+    notifications = []
+    for scholarship in scholarships:
+        if scholarship.is_suspicious:
+            continue
+        key = _match_key(scholarship)
+        for user_id in match_users(db, scholarship):
+            notifications.append({
+                "user_id": user_id,
+                "scholarship_id": scholarship.id,
+                "type": "new_match",
+                "message": f"New scholarship matching your profile: {scholarship.title} 🎓",
+                "idempotency_key": f"in_app:new_match:{user_id}:{key}",
+            })
+    outbox.enqueue(db, notifications, channel="in_app")
+    return len(notifications)
+
+
+def percolate_scholarships(scholarship_ids: List[int]) -> int:
+    """Entry point for create_scholarship (background task) and the import scripts."""
+    if not scholarship_ids:
+        return 0
+    db = SessionLocal()
+    try:
+        scholarships = db.query(models.Scholarship).options(joinedload(models.Scholarship.university)).filter(
+            models.Scholarship.id.in_(scholarship_ids)
+        ).all()
+        matched = percolate(db, scholarships)
+        db.commit()
+        print(f"🔔 New-match alerts: {matched} for {len(scholarships)} new scholarships")
+        return matched
+    except Exception as e:
+        db.rollback()
+        print(f"🚨 New-match percolation failed: {e}")
+        return 0
+    finally:
+        db.close()
@@ -0,0 +1,141 @@
+"""
+Popularity rollups and trending scores, maintained incrementally from interaction batches.
+
+Trending uses forward decay: each event adds w * exp(lambda * (t - EPOCH)) to a
+scholarship's score, and we store the log of that sum. The stored value never has
+to be re-decayed, and ordering by log_score is the same as ordering by the decayed
+score at any moment. Decayed score now = exp(log_score - lambda * (now - EPOCH)).
+"""
+import datetime
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+EVENT_WEIGHTS = {"view": 1.0, "save": 3.0, "apply": 5.0}
+EVENT_COLUMNS = {"view": "views", "save": "saves", "apply": "applies"}
+
+EPOCH = datetime.datetime(2024, 1, 1)
+DECAY_RATE = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)  # per second
+
+# Decayed score at which the popularity feature reaches 0.5
+POPULARITY_SATURATION = 10.0
+
+
+def _bucket(ts: datetime.datetime, granularity: str) -> datetime.datetime:
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _log_add(a: float, b: float) -> float:
+    """log(exp(a) + exp(b)) without overflow."""
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def _log_add_sql(db: Session, a, b):
+    """_log_add as a SQL expression: greatest + ln(1 + exp(-|a - b|))."""
+    if db.bind.dialect.name == "postgresql":
+        greatest, least = func.greatest, func.least
+    else:
+        greatest, least = func.max, func.min  # Two-argument max/min are scalar in SQLite
+    # exp() of the gap is capped so PostgreSQL cannot raise an underflow error; ln(1 + e^-700) == 0 anyway
+    return greatest(a, b) + func.ln(1.0 + func.exp(-least(func.abs(a - b), 700.0)))
+
+
+def _insert(db: Session):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def apply_interactions(db: Session, events: Iterable[dict]) -> None:
+    """
+    Folds a batch of interaction events into the rollup and trending tables.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    counts: Dict[tuple, Dict[str, int]] = defaultdict(lambda: {"views": 0, "saves": 0, "applies": 0})
+    log_mass: Dict[int, float] = {}
+    totals: Dict[int, int] = defaultdict(int)
+
+    for e in events:
+        column = EVENT_COLUMNS.get(e["interaction_type"])
+        if column is None:
+            continue
+        sid, ts = e["scholarship_id"], e["created_at"]
+        for granularity in ("hour", "day"):
+            counts[(sid, granularity, _bucket(ts, granularity))][column] += 1
+        contribution = math.log(EVENT_WEIGHTS[e["interaction_type"]]) + DECAY_RATE * (ts - EPOCH).total_seconds()
+        log_mass[sid] = _log_add(log_mass[sid], contribution) if sid in log_mass else contribution
+        totals[sid] += 1
+
+    if not counts:
+        return
+
+    # 1. Rollups: atomic increments via INSERT .. ON CONFLICT DO UPDATE
+    insert = _insert(db)
+    table = models.ScholarshipInteractionRollup.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scholarship_id", "granularity", "bucket_start"],
+        set_={
+            "views": table.c.views + stmt.excluded.views,
+            "saves": table.c.saves + stmt.excluded.saves,
+            "applies": table.c.applies + stmt.excluded.applies,
+        },
+    )
+    db.execute(stmt, [
+        {"scholarship_id": sid, "granularity": g, "bucket_start": bucket, **c}
+        for (sid, g, bucket), c in counts.items()
+    ])
+
+    # 2. Trending: one upsert, the log-sum-exp is computed by the database so concurrent
+    # flushes of the same scholarship (including its first events) cannot collide
+    table = models.ScholarshipTrending.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scholarship_id"],
+        set_={
+            "log_score": _log_add_sql(db, table.c.log_score, stmt.excluded.log_score),
+            "total_events": table.c.total_events + stmt.excluded.total_events,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    now = datetime.datetime.utcnow()
+    db.execute(stmt, [
+        {"scholarship_id": sid, "log_score": mass, "total_events": totals[sid], "updated_at": now}
+        for sid, mass in log_mass.items()
+    ])
+
+
+def decayed_score(log_score: float, now: datetime.datetime = None) -> float:
+    now = now or datetime.datetime.utcnow()
+    return math.exp(log_score - DECAY_RATE * (now - EPOCH).total_seconds())
+
+
+def trending_scores(db: Session, scholarship_ids: List[int]) -> Dict[int, float]:
+    """Current decayed trending score per scholarship (missing ids have no activity)."""
+    if not scholarship_ids:
+        return {}
+    rows = db.query(models.ScholarshipTrending.scholarship_id, models.ScholarshipTrending.log_score).filter(
+        models.ScholarshipTrending.scholarship_id.in_(scholarship_ids)
+    ).all()
+    now = datetime.datetime.utcnow()
+    return {sid: decayed_score(log_score, now) for sid, log_score in rows}
+
+
+def popularity_features(db: Session, scholarship_ids: List[int]) -> Dict[int, float]:
+    """Trending score squashed into [0, 1) for use as a recommender feature."""
+    return {
+        sid: score / (score + POPULARITY_SATURATION)
+        for sid, score in trending_scores(db, scholarship_ids).items()
+    }
@@ -0,0 +1,179 @@
+"""
+Chat attachment processing (PDF text, images) off the event loop.
+
+Parsing runs in a small process pool: pypdf is pure Python and would hold the GIL,
+so threads would still slow every other request down. Work is bounded up front:
+
+    PDF    pages are read until ATTACHMENT_PDF_TEXT_BUDGET characters (or
+           ATTACHMENT_PDF_MAX_PAGES pages) are collected, not the whole document
+    image  downscaled to ATTACHMENT_IMAGE_MAX_SIDE px and re-encoded as JPEG before
+           base64, instead of sending the original resolution to the model
+
+Results are cached by SHA-256 of the file bytes (per worker, then as JSON in the
+shared cache backend when it is Redis), and concurrent uploads of the same file share
+one parse. A crashed parser gives an uncached error result (like an unreadable file)
+and its broken pool is replaced on the next upload.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.cache import TTLCache, get_shared_backend
+
+_results = TTLCache(max_items=settings.ATTACHMENT_CACHE_MAX_ITEMS, ttl=settings.ATTACHMENT_CACHE_TTL_SECONDS)
+_in_flight: Dict[str, asyncio.Task] = {}
+_pool: Optional[ProcessPoolExecutor] = None
+_metrics = {"processed": 0, "cache_hits": 0, "shared_hits": 0, "joined": 0, "errors": 0}
+
+
+# --- Worker functions (run in the pool; must stay importable and picklable) ---
+
+def extract_pdf_text(data: bytes, budget: int, max_pages: int) -> dict:
+    from pypdf import PdfReader  # PDF parhne ke liye
+
+    try:
+        reader = PdfReader(BytesIO(data))
+        parts, length = [], 0
+        for page in reader.pages[:max_pages]:
+            text = page.extract_text() or ""
+            parts.append(text)
+            length += len(text) + 1
+            if length >= budget:
+                break  # Budget reached; the remaining pages are never parsed
+        text = "\n".join(parts)[:budget]  # Limit text to save tokens
+        return {"type": "text", "content": f"Here is the content of the attached PDF:\n{text}"}
+    except Exception:
+        return {"type": "error", "content": "Could not read PDF."}
+
+
+def encode_image(data: bytes, max_side: int, quality: int) -> dict:
+    from PIL import Image  # Image processing ke liye
+
+    try:
+        image = Image.open(BytesIO(data))
+        # JPEG decoders can scale down while decoding, far cheaper than a full decode
+        image.draft("RGB", (max_side, max_side))
+        image.thumbnail((max_side, max_side))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        out = BytesIO()
+        image.save(out, format="JPEG", quality=quality, optimize=True)
+        # Image ko Base64 mein badlo taake GPT-4o-mini dekh sake
+        base64_image = base64.b64encode(out.getvalue()).decode("utf-8")
+        return {
+            "type": "image",
+            "content": {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
+            }
+        }
+    except Exception:
+        return {"type": "error", "content": "Could not process image."}
+
+
+def process_file(file_data: bytes, file_type: str) -> Optional[dict]:
+    """
+    File ko process karta hai based on type (Image or PDF)
+    """
+    if "pdf" in file_type:
+        return extract_pdf_text(file_data, settings.ATTACHMENT_PDF_TEXT_BUDGET, settings.ATTACHMENT_PDF_MAX_PAGES)
+    if "image" in file_type:
+        return encode_image(file_data, settings.ATTACHMENT_IMAGE_MAX_SIDE, settings.ATTACHMENT_IMAGE_QUALITY)
+    return None
+
+
+# --- Async entry point ---
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a server process that already runs threads (scheduler, buffers) is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.ATTACHMENT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _kind(file_type: str) -> Optional[str]:
+    file_type = file_type or ""
+    return "pdf" if "pdf" in file_type else "image" if "image" in file_type else None
+
+
+FAILED_REPLY = {"type": "error", "content": "Could not read file."}
+
+
+async def _parse(file_data: bytes, file_type: str) -> dict:
+    """process_file in the pool; executor failures become an error result, never an exception."""
+    global _pool
+    try:
+        pool = _get_pool()
+        return await asyncio.get_running_loop().run_in_executor(pool, process_file, file_data, file_type)
+    except BrokenProcessPool as e:
+        # A parser process died (OOM on a hostile file); the next upload gets a fresh pool
+        if _pool is pool:
+            _pool = None
+            pool.shutdown(wait=False)
+        print(f"🚨 Attachment parser pool broke: {e}")
+    except Exception as e:  # Pool start-up, pickling
+        print(f"🚨 Attachment parsing failed: {e}")
+    return dict(FAILED_REPLY)
+
+
+async def _load(key: str, file_data: bytes, file_type: str) -> dict:
+    backend = get_shared_backend()
+    raw = await asyncio.to_thread(backend.get, key) if backend.shared else None
+    if raw is not None:
+        result = json.loads(raw)
+        _metrics["shared_hits"] += 1
+    else:
+        result = await _parse(file_data, file_type)
+        _metrics["processed"] += 1
+        if result["type"] == "error":
+            _metrics["errors"] += 1
+        elif backend.shared:
+            await asyncio.to_thread(
+                backend.set, key, json.dumps(result).encode(), settings.ATTACHMENT_CACHE_TTL_SECONDS
+            )
+    if result["type"] != "error":
+        _results.set(key, result)
+    return result
+
+
+def _finished(key: str, task: asyncio.Task) -> None:
+    del _in_flight[key]
+    if not task.cancelled():
+        task.exception()  # Mark retrieved when every caller went away
+
+
+async def process_attachment(file_data: bytes, file_type: str) -> Optional[dict]:
+    """{"type": "text" | "image" | "error", "content": ...} for a PDF or image, else None."""
+    kind = _kind(file_type)
+    if not file_data or kind is None:
+        return None
+
+    digest = await asyncio.to_thread(hashlib.sha256, file_data)  # Releases the GIL; ~1 ms per MB
+    key = f"attachment:{kind}:{digest.hexdigest()}"
+    cached = _results.get(key)
+    if cached is not None:
+        _metrics["cache_hits"] += 1
+        return cached
+    task = _in_flight.get(key)
+    if task is not None:
+        _metrics["joined"] += 1
+    else:
+        # Its own task: a caller that disconnects does not cancel the parse others wait for
+        task = asyncio.ensure_future(_load(key, file_data, file_type))
+        _in_flight[key] = task
+        task.add_done_callback(lambda t: _finished(key, t))
+    return await asyncio.shield(task)
+
+
+def attachment_metrics() -> dict:
+    return {**_metrics, "cache": _results.stats(), "in_flight": len(_in_flight)}
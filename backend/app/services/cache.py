@@ -0,0 +1,251 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache where every entry also expires after `ttl` seconds.
+    """
+
+    def __init__(self, max_items: int = 1024, ttl: float = 60):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data)
+
+    def __contains__(self, key) -> bool:
+        """Membership without touching LRU order or hit counters."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[1] >= time.monotonic()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_items": self.max_items,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# --- Shared backends ---
+# Same interface for both: get/set/delete/delete_prefix on bytes values.
+# `shared` tells callers whether other workers see what this one writes.
+
+class MemoryBackend:
+    """
+    Local in-memory stand-in for the shared cache (dev, tests, single worker).
+    Per process: under `--workers N` nothing written here reaches the other workers,
+    so multi-worker deployments that need cross-worker invalidation must use Redis.
+    """
+    shared = False
+
+    def __init__(self):
+        self._store = TTLCache(max_items=100_000, ttl=300)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._store.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._store.set(key, value, ttl=ttl)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._store.delete(key)
+
+    def delete_prefix(self, prefix: str):
+        self.delete(*(k for k in self._store.keys() if k.startswith(prefix)))
+
+
+class RedisBackend:
+    """
+    Shared cache across workers/dynos. Needs the optional `redis` package.
+    Connection errors degrade to cache misses (and skipped writes) instead of failing requests.
+    """
+    shared = True
+
+    def __init__(self, url: str):
+        import redis  # Optional dependency, only needed when CACHE_URL points at Redis
+        self._client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._errors = redis.RedisError
+        self.error_count = 0
+
+    def _failed(self, op: str, e: Exception):
+        self.error_count += 1
+        if self.error_count == 1 or self.error_count % 1000 == 0:
+            print(f"WARNING: Redis cache {op} failed ({e}); treating as a miss. {self.error_count} errors so far.")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(key)
+        except self._errors as e:
+            self._failed("get", e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        try:
+            self._client.set(key, value, ex=max(1, int(ttl)))
+        except self._errors as e:
+            self._failed("set", e)
+
+    def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            self._client.delete(*keys)
+        except self._errors as e:
+            self._failed("delete", e)
+
+    def delete_prefix(self, prefix: str):
+        try:
+            batch = []
+            for key in self._client.scan_iter(match=f"{prefix}*", count=1000):
+                batch.append(key)
+                if len(batch) >= 1000:
+                    self._client.delete(*batch)
+                    batch = []
+            if batch:
+                self._client.delete(*batch)
+        except self._errors as e:
+            self._failed("delete_prefix", e)
+
+
+_shared_backend = None
+
+
+def get_shared_backend():
+    global _shared_backend
+    if _shared_backend is None:
+        url = settings.CACHE_URL
+        if url and url.startswith("redis"):
+            try:
+                _shared_backend = RedisBackend(url)
+            except Exception as e:
+                print(f"WARNING: Redis cache unavailable ({e}). Using in-memory cache.")
+                _shared_backend = MemoryBackend()
+        else:
+            _shared_backend = MemoryBackend()
+    return _shared_backend
+
+
+# --- Read-through cache ---
+
+_registry: Dict[str, "ReadThroughCache"] = {}
+
+
+class ReadThroughCache:
+    """
+    Two-tier read-through cache: a per-worker TTLCache in front of the shared backend.
+    Values must be picklable. A loader returning None is not cached (404s stay cheap to retry).
+
+    The second tier is only used when the backend is really shared (Redis). With the
+    in-memory backend it would be a second per-process copy with the longer shared TTL,
+    out of reach of invalidations made by other workers; without it a write in another
+    worker (or a raw-SQL import) is visible here within local_ttl.
+    """
+
+    def __init__(self, namespace: str, max_items: int, local_ttl: float, shared_ttl: float):
+        self.namespace = namespace
+        self.local = TTLCache(max_items=max_items, ttl=local_ttl)
+        self.shared_ttl = shared_ttl
+        self.shared_hits = 0
+        self.loads = 0
+        _registry[namespace] = self
+
+    def _key(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get_or_load(self, key, loader: Callable[[], Any]):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        backend = get_shared_backend()
+        raw = backend.get(self._key(key)) if backend.shared else None
+        if raw is not None:
+            self.shared_hits += 1
+            value = pickle.loads(raw)
+            self.local.set(key, value)
+            return value
+
+        self.loads += 1
+        value = loader()
+        if value is not None:
+            self.local.set(key, value)
+            if backend.shared:
+                backend.set(self._key(key), pickle.dumps(value), self.shared_ttl)
+        return value
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        get_shared_backend().delete(*(self._key(k) for k in keys))
+
+    def invalidate_all(self):
+        """Drops every entry of this namespace (bulk writes that bypass the mapper events)."""
+        self.local.clear()
+        get_shared_backend().delete_prefix(f"{self.namespace}:")
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats["shared_hits"] = self.shared_hits
+        stats["loads"] = self.loads
+        return stats
+
+
+def cache_stats() -> dict:
+    """Hit/miss metrics for every read-through cache in this worker."""
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,165 @@
+"""
+Read-through cache for catalog lookups (scholarships and universities).
+
+Cached values are the serialized API payloads, not ORM objects, so they can be
+shared across sessions and workers. Invalidation is driven by SQLAlchemy mapper
+events: keys touched during a flush are collected on the session and dropped
+once the transaction commits. Writers that bypass the ORM (the CSV import
+scripts) call invalidate_catalog() instead.
+
+Mapper events only reach other workers through a shared backend (CACHE_URL=redis://).
+Without one, other workers pick a write up within CATALOG_CACHE_LOCAL_TTL_SECONDS.
+"""
+from typing import Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, joinedload, object_session
+
+from app.core.config import settings
+from app.db import models, schemas
+from app.services.cache import ReadThroughCache
+
+scholarship_cache = ReadThroughCache(
+    "scholarship",
+    max_items=settings.CATALOG_CACHE_MAX_ITEMS,
+    local_ttl=settings.CATALOG_CACHE_LOCAL_TTL_SECONDS,
+    shared_ttl=settings.CATALOG_CACHE_SHARED_TTL_SECONDS,
+)
+university_cache = ReadThroughCache(
+    "university",
+    max_items=settings.CATALOG_CACHE_MAX_ITEMS,
+    local_ttl=settings.CATALOG_CACHE_LOCAL_TTL_SECONDS,
+    shared_ttl=settings.CATALOG_CACHE_SHARED_TTL_SECONDS,
+)
+# name -> university id
+university_name_cache = ReadThroughCache(
+    "university_name",
+    max_items=settings.CATALOG_CACHE_MAX_ITEMS,
+    local_ttl=settings.CATALOG_CACHE_LOCAL_TTL_SECONDS,
+    shared_ttl=settings.CATALOG_CACHE_SHARED_TTL_SECONDS,
+)
+
+
+# --- Lookups ---
+
+def get_scholarship(db: Session, scholarship_id: int):
+    """Returns the ScholarshipOut payload for an id, or None if it does not exist."""
+    def load():
+        scholarship = db.query(models.Scholarship).options(
+            joinedload(models.Scholarship.university)
+        ).filter(models.Scholarship.id == scholarship_id).first()
+        if not scholarship:
+            return None
+
+        data = schemas.ScholarshipOut.model_validate(scholarship).model_dump()
+        if scholarship.university:
+            data["university_name"] = scholarship.university.name
+            # Fallback to university coordinates if scholarship ones are missing
+            if data["latitude"] is None:
+                data["latitude"] = scholarship.university.latitude
+            if data["longitude"] is None:
+                data["longitude"] = scholarship.university.longitude
+        return data
+
+    return scholarship_cache.get_or_load(scholarship_id, load)
+
+
+def get_university(db: Session, uni_id: int):
+    """Returns the UniversityDetails payload (with its scholarships) for an id, or None."""
+    def load():
+        uni = db.query(models.University).options(
+            joinedload(models.University.scholarships)
+        ).filter(models.University.id == uni_id).first()
+        if not uni:
+            return None
+
+        for s in uni.scholarships:
+            s.university_name = uni.name
+        return schemas.UniversityDetails.model_validate(uni).model_dump()
+
+    return university_cache.get_or_load(uni_id, load)
+
+
+def get_university_by_name(db: Session, name: str):
+    def load():
+        row = db.query(models.University.id).filter(models.University.name == name).first()
+        return row[0] if row else None
+
+    uni_id = university_name_cache.get_or_load(name, load)
+    if uni_id is None:
+        return None
+    return get_university(db, uni_id)
+
+
+# --- Invalidation ---
+
+def invalidate_catalog() -> None:
+    """Drops every cached catalog entry; for bulk writes made with raw SQL."""
+    for cache in (scholarship_cache, university_cache, university_name_cache):
+        cache.invalidate_all()
+
+
+def _pending(target) -> Optional[dict]:
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault(
+        "catalog_invalidate", {"scholarship": set(), "university": set(), "university_name": set()}
+    )
+
+
+def _previous_value(target, attr: str):
+    history = inspect(target).attrs[attr].history
+    return history.deleted[0] if history.deleted else None
+
+
+@event.listens_for(models.Scholarship, "after_insert")
+@event.listens_for(models.Scholarship, "after_update")
+@event.listens_for(models.Scholarship, "after_delete")
+def _scholarship_changed(mapper, connection, target):
+    pending = _pending(target)
+    if pending is None:
+        return
+    pending["scholarship"].add(target.id)
+    # University pages embed their scholarships
+    pending["university"].add(target.university_id)
+    previous_uni = _previous_value(target, "university_id")
+    if previous_uni is not None:
+        pending["university"].add(previous_uni)
+
+
+@event.listens_for(models.University, "after_insert")
+@event.listens_for(models.University, "after_update")
+@event.listens_for(models.University, "after_delete")
+def _university_changed(mapper, connection, target):
+    pending = _pending(target)
+    if pending is None:
+        return
+    pending["university"].add(target.id)
+    pending["university_name"].add(target.name)
+    previous_name = _previous_value(target, "name")
+    if previous_name is not None:
+        pending["university_name"].add(previous_name)
+    # Scholarship payloads embed the university
+    ids = connection.execute(
+        select(models.Scholarship.id).where(models.Scholarship.university_id == target.id)
+    ).scalars().all()
+    pending["scholarship"].update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session):
+    pending = session.info.pop("catalog_invalidate", None)
+    if not pending:
+        return
+    if pending["scholarship"]:
+        scholarship_cache.invalidate(*pending["scholarship"])
+    if pending["university"]:
+        university_cache.invalidate(*pending["university"])
+    if pending["university_name"]:
+        university_name_cache.invalidate(*pending["university_name"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("catalog_invalidate", None)
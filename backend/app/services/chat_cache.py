@@ -0,0 +1,172 @@
+"""
+Prompt -> answer cache for text-only chatbot messages.
+
+Lookups go, cheapest first:
+
+    1. exact      normalized prompt (case, punctuation, filler words removed) in the
+                  per-worker TTLCache, then in the shared cache backend
+    2. similar    optional (CHAT_CACHE_SIMILARITY_ENABLED): cosine similarity of hashed
+                  bag-of-words vectors against the prompts cached in this worker,
+                  accepted at CHAT_CACHE_SIMILARITY_THRESHOLD or above. One differing
+                  word in a short question (Germany vs Denmark) stays below 0.9.
+
+Keys include the model name, so changing CHAT_MODEL starts from an empty cache, and
+the catalog index version the answer's retrieved records came from, so an edited,
+merged, deleted or flagged scholarship is not named again from an old answer.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.services.cache import TTLCache, get_shared_backend
+
+FILLER_WORDS = {
+    "hi", "hello", "hey", "please", "pls", "plz", "kindly", "thanks", "thank", "you", "can", "could",
+    "would", "tell", "me", "i", "want", "to", "know", "the", "a", "an", "is", "are", "what", "whats",
+}
+
+
+def _terms(normalized: str):
+    # Word order and plural "s" do not change the question
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in normalized.split()}
+
+
+def normalize(message: str) -> str:
+    words = re.findall(r"[a-z0-9]+", (message or "").lower())
+    kept = [w for w in words if w not in FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+class ChatResponseCache:
+    def __init__(self, max_items: int = None, ttl: float = None):
+        self.local = TTLCache(
+            max_items=max_items or settings.CHAT_CACHE_MAX_ITEMS,
+            ttl=ttl or settings.CHAT_CACHE_TTL_SECONDS,
+        )
+        self._vectors: "OrderedDict[str, object]" = OrderedDict()  # key -> sparse row
+        self._matrix = None  # stacked self._vectors, rebuilt after a change
+        self._lock = threading.Lock()
+        self._vectorizer = None
+        self.metrics = {"exact_hits": 0, "shared_hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0, "stored": 0}
+        self._lookup_seconds = 0.0
+        self._lookups = 0
+
+    def _prefix(self, catalog_version: Optional[str]) -> str:
+        return f"{settings.CHAT_MODEL}:{catalog_version or '-'}:"
+
+    def _key(self, normalized: str, catalog_version: Optional[str] = None) -> str:
+        return self._prefix(catalog_version) + normalized
+
+    def _shared_key(self, key: str) -> str:
+        return "chat_response:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    # --- Similarity index ---
+
+    def _vectorize(self, normalized: str):
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+
+            self._vectorizer = HashingVectorizer(
+                analyzer=_terms, n_features=2 ** 18, alternate_sign=False, norm="l2"
+            )
+        return self._vectorizer.transform([normalized])
+
+    def _index(self, key: str, normalized: str) -> None:
+        vector = self._vectorize(normalized)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            # Drop rows whose answers the TTLCache already evicted or expired
+            if len(self._vectors) > self.local.max_items:
+                for stale in [k for k in self._vectors if k not in self.local]:
+                    del self._vectors[stale]
+                while len(self._vectors) > self.local.max_items:
+                    self._vectors.popitem(last=False)
+            self._matrix = None
+
+    def _most_similar(self, normalized: str) -> Optional[str]:
+        from scipy.sparse import vstack
+
+        query = self._vectorize(normalized)
+        with self._lock:
+            if not self._vectors:
+                return None
+            if self._matrix is None:
+                self._matrix = (list(self._vectors), vstack(list(self._vectors.values())).tocsr())
+            keys, matrix = self._matrix
+        scores = (matrix @ query.T).toarray().ravel()
+        best = int(scores.argmax())
+        if scores[best] < settings.CHAT_CACHE_SIMILARITY_THRESHOLD:
+            return None
+        return keys[best]
+
+    # --- Public API ---
+
+    def get(self, message: str, catalog_version: Optional[str] = None) -> Optional[str]:
+        started = time.perf_counter()
+        try:
+            normalized = normalize(message)
+            key = self._key(normalized, catalog_version)
+            answer = self.local.get(key)
+            if answer is not None:
+                self.metrics["exact_hits"] += 1
+                return answer
+
+            raw = get_shared_backend().get(self._shared_key(key))
+            if raw is not None:
+                answer = raw.decode("utf-8")
+                self.local.set(key, answer)
+                self.metrics["shared_hits"] += 1
+                return answer
+
+            if settings.CHAT_CACHE_SIMILARITY_ENABLED:
+                similar = self._most_similar(normalized)
+                # Answers cached under another catalog version are stale
+                current = similar is not None and similar.startswith(self._prefix(catalog_version))
+                answer = self.local.get(similar) if current else None
+                if answer is not None:
+                    self.metrics["similar_hits"] += 1
+                    return answer
+
+            self.metrics["misses"] += 1
+            return None
+        finally:
+            self._lookups += 1
+            self._lookup_seconds += time.perf_counter() - started
+
+    def set(self, message: str, answer: str, catalog_version: Optional[str] = None) -> None:
+        normalized = normalize(message)
+        key = self._key(normalized, catalog_version)
+        self.local.set(key, answer)
+        get_shared_backend().set(self._shared_key(key), answer.encode("utf-8"), self.local.ttl)
+        if settings.CHAT_CACHE_SIMILARITY_ENABLED:
+            self._index(key, normalized)
+        self.metrics["stored"] += 1
+
+    def record_bypass(self) -> None:
+        self.metrics["bypassed"] += 1
+
+    def clear(self) -> None:
+        self.local.clear()
+        with self._lock:
+            self._vectors.clear()
+            self._matrix = None
+
+    def stats(self) -> dict:
+        hits = self.metrics["exact_hits"] + self.metrics["shared_hits"] + self.metrics["similar_hits"]
+        total = hits + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "size": len(self.local),
+            "indexed": len(self._vectors),
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "avg_lookup_ms": round(self._lookup_seconds / self._lookups * 1000, 3) if self._lookups else 0.0,
+            "similarity_enabled": settings.CHAT_CACHE_SIMILARITY_ENABLED,
+        }
+
+
+chat_cache = ChatResponseCache()
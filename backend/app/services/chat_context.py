@@ -0,0 +1,198 @@
+"""
+Chat history paging and the conversation context sent to the LLM.
+
+History is read with keyset pagination on (user_id, timestamp, id), so every page is
+one index range no matter how long the history is. The LLM sees a bounded context:
+
+    [rolling summary of older turns] + [last CHAT_CONTEXT_TURNS messages]
+
+trimmed to CHAT_CONTEXT_TOKEN_BUDGET. Messages that fall out of the window are folded
+into chat_summaries in batches after a reply (refresh_summary), so prompt size stays
+flat as history grows. Only turns from the last CHAT_CONTEXT_MAX_AGE_MINUTES count as
+an ongoing conversation; a question without them is answered without any history.
+"""
+import asyncio
+import base64
+import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.chatbot import estimate_tokens, get_chat_backend
+
+SUMMARY_INSTRUCTION = (
+    "You maintain a running summary of a student's conversation with a scholarship assistant. "
+    "Merge the new turns into the existing summary. Keep facts about the student (degree, field, "
+    "grades, test scores, target countries, budget, preferences) and questions still open. "
+    "Plain text, at most 120 words."
+)
+
+
+# --- Cursor pagination ---
+
+def encode_cursor(message: models.ChatMessage) -> str:
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    """Raises ValueError for a malformed cursor."""
+    timestamp, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    return datetime.datetime.fromisoformat(timestamp), int(message_id)
+
+
+def _position():
+    return tuple_(models.ChatMessage.timestamp, models.ChatMessage.id)
+
+
+def history_page(db: Session, user_id: int, limit: int, before: Optional[str] = None):
+    """
+    (messages oldest -> newest, cursor for the previous page or None). The first page
+    is the newest `limit` messages; pass the returned cursor as `before` to go back.
+    """
+    query = db.query(models.ChatMessage).filter(models.ChatMessage.user_id == user_id)
+    if before:
+        query = query.filter(_position() < tuple_(*decode_cursor(before)))
+    rows = query.order_by(models.ChatMessage.timestamp.desc(), models.ChatMessage.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return rows, (encode_cursor(rows[0]) if has_more and rows else None)
+
+
+# --- Context for the LLM ---
+
+def _recent_messages(db: Session, user_id: int, before_id: Optional[int], limit: int) -> List[models.ChatMessage]:
+    query = db.query(models.ChatMessage).filter(models.ChatMessage.user_id == user_id)
+    if before_id is not None:
+        query = query.filter(models.ChatMessage.id != before_id)
+    rows = query.order_by(models.ChatMessage.timestamp.desc(), models.ChatMessage.id.desc()).limit(limit).all()
+    rows.reverse()
+    return rows
+
+
+def build_context(user_id: int, exclude_id: Optional[int] = None) -> List[dict]:
+    """
+    Chat messages (role/content dicts) to put before the new question, or [] when there
+    is no ongoing conversation. exclude_id is the question itself, already stored.
+    """
+    db = SessionLocal()
+    try:
+        recent = _recent_messages(db, user_id, exclude_id, settings.CHAT_CONTEXT_TURNS)
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(minutes=settings.CHAT_CONTEXT_MAX_AGE_MINUTES)
+        if not recent or (recent[-1].timestamp or datetime.datetime.min) < cutoff:
+            return []
+        summary = db.get(models.ChatSummary, user_id)
+    finally:
+        db.close()
+
+    budget = settings.CHAT_CONTEXT_TOKEN_BUDGET
+    context = []
+    if summary and summary.summary:
+        text = f"Summary of the earlier conversation with this student:\n{summary.summary}"
+        budget -= estimate_tokens(text)
+        context.append({"role": "system", "content": text})
+
+    # Newest turns first, so the ones closest to the question survive the budget
+    turns = []
+    for message in reversed(recent):
+        cost = estimate_tokens(message.content or "")
+        if cost > budget:
+            break
+        budget -= cost
+        turns.append({"role": "assistant" if message.role == "ai" else "user", "content": message.content or ""})
+    return context + turns[::-1]
+
+
+# --- Rolling summary ---
+
+def _pending_turns(user_id: int):
+    """(summary row or None, messages older than the context window not yet summarized)."""
+    db = SessionLocal()
+    try:
+        window = _recent_messages(db, user_id, None, settings.CHAT_CONTEXT_TURNS)
+        if len(window) < settings.CHAT_CONTEXT_TURNS:
+            return None, []
+        summary = db.get(models.ChatSummary, user_id)
+        query = db.query(models.ChatMessage).filter(
+            models.ChatMessage.user_id == user_id,
+            _position() < tuple_(window[0].timestamp, window[0].id),
+        )
+        if summary and summary.covered_until_id is not None:
+            query = query.filter(_position() > tuple_(summary.covered_until_timestamp, summary.covered_until_id))
+        turns = query.order_by(models.ChatMessage.timestamp, models.ChatMessage.id).limit(
+            settings.CHAT_SUMMARY_MAX_BATCH
+        ).all()
+        db.expunge_all()
+        return summary, turns
+    finally:
+        db.close()
+
+
+def _extractive_summary(previous: str, turns) -> str:
+    """Fallback without a real LLM: keep the student's own questions, newest last."""
+    lines = [previous] if previous else []
+    lines += [f"Student asked: {(t.content or '')[:160]}" for t in turns if t.role == "user"]
+    return "\n".join(lines)[-settings.CHAT_SUMMARY_MAX_TOKENS * 4:]
+
+
+async def _summarize(previous: str, turns) -> str:
+    backend = get_chat_backend()
+    if backend.name != "openai":
+        return _extractive_summary(previous, turns)
+    transcript = "\n".join(
+        f"{'Assistant' if t.role == 'ai' else 'Student'}: {(t.content or '')[:600]}" for t in turns
+    )
+    messages = [
+        {"role": "system", "content": SUMMARY_INSTRUCTION},
+        {"role": "user", "content": [{"type": "text", "text": f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"}]},
+    ]
+    chunks = [chunk async for chunk in backend.stream(messages)]
+    return "".join(chunks).strip()[:settings.CHAT_SUMMARY_MAX_TOKENS * 4]
+
+
+def _store_summary(user_id: int, previous: Optional[models.ChatSummary], text: str, last) -> bool:
+    db = SessionLocal()
+    try:
+        values = {
+            "summary": text,
+            "covered_until_timestamp": last.timestamp,
+            "covered_until_id": last.id,
+            "updated_at": datetime.datetime.utcnow(),
+        }
+        if previous is None:
+            db.add(models.ChatSummary(user_id=user_id, **values))
+        else:
+            # Optimistic: a concurrent refresh that got here first wins, ours is dropped
+            updated = db.query(models.ChatSummary).filter(
+                models.ChatSummary.user_id == user_id,
+                models.ChatSummary.covered_until_id == previous.covered_until_id,
+            ).update(values, synchronize_session=False)
+            if not updated:
+                return False
+        db.commit()
+        return True
+    except IntegrityError:  # First summary inserted concurrently
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+async def refresh_summary(user_id: int) -> None:
+    """Folds turns that left the context window into the summary once enough have piled up."""
+    try:
+        summary, turns = await asyncio.to_thread(_pending_turns, user_id)
+        if len(turns) < settings.CHAT_SUMMARY_BATCH:
+            return
+        previous = summary.summary if summary else ""
+        text = await _summarize(previous, turns)
+        if text:
+            await asyncio.to_thread(_store_summary, user_id, summary, text, turns[-1])
+    except Exception as e:
+        print(f"🚨 Chat summary refresh failed for user {user_id}: {e}")
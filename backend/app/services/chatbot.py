@@ -1,90 +1,235 @@
 # backend/app/services/chatbot.py
 
+import asyncio
 import os
-import base64
-from io import BytesIO
-from openai import OpenAI
+from abc import ABC, abstractmethod
+import time
+from typing import AsyncIterator, List, Optional
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
-from pypdf import PdfReader  # PDF parhne ke liye
-from PIL import Image        # Image processing ke liye
+
+from app.core.config import settings
+from app.services.attachments import process_attachment
+from app.services.chat_cache import chat_cache
 
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = None
-if api_key:
-    client = OpenAI(api_key=api_key)
-else:
-    print("WARNING: OPENAI_API_KEY not found. Chatbot will return fallback responses.")
 
-def process_file(file_data, file_type):
-    """
-    File ko process karta hai based on type (Image or PDF)
-    """
-    if "pdf" in file_type:
-        # PDF se text nikalo
-        try:
-            reader = PdfReader(BytesIO(file_data))
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return {"type": "text", "content": f"Here is the content of the attached PDF:\n{text[:10000]}"} # Limit text to save tokens
-        except Exception as e:
-            return {"type": "error", "content": "Could not read PDF."}
-            
-    elif "image" in file_type:
-        # Image ko Base64 mein badlo taake GPT-4o-mini dekh sake
-        try:
-            base64_image = base64.b64encode(file_data).decode('utf-8')
-            return {
-                "type": "image", 
-                "content": {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
-                }
-            }
-        except Exception as e:
-            return {"type": "error", "content": "Could not process image."}
-    
-    return None
-
-def get_ai_response(user_message: str, file_data=None, file_type=None):
-    if not client:
-        return "Chatbot is currently offline (API key missing). Please contact admin."
-    try:
-        system_instruction = """
+SYSTEM_INSTRUCTION = """
         You are the AI Assistant for 'ScholarIQ'.
         Help students with scholarships. 
         If a user uploads a document (Image/PDF), analyze it and answer their questions about it.
         Keep answers concise.
         """
+CATALOG_INSTRUCTION = (
+    "Relevant scholarships from the ScholarIQ catalog (use these when they answer the question, "
+    "mention them by title, and do not invent scholarships that are not listed):"
+)
+OFFLINE_REPLY = "Chatbot is currently offline (API key missing). Please contact admin."
+ERROR_REPLY = "I am having trouble analyzing the file. Please try again."
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1  # ~4 characters per token for English text
+
+
+def format_catalog_record(record: dict) -> str:
+    details = [
+        record["university"], record["country"], record["degree_level"], record["field_of_study"],
+        record["funding_type"], record["scholarship_amount_value"],
+        f"deadline {record['deadline']:%d %b %Y}" if record["deadline"] else None,
+    ]
+    return f"- {record['title']} (id {record['id']}): " + "; ".join(str(d) for d in details if d)
+
 
-        messages = [{"role": "system", "content": system_instruction}]
+def retrieve_catalog_context(user_message: str, index=None) -> Optional[str]:
+    """Top catalog matches for the question, formatted within CHAT_RETRIEVAL_TOKEN_BUDGET."""
+    from app.recommendation.index import get_catalog_index
 
-        # User ka message content prepare karein
-        user_content = [{"type": "text", "text": user_message}]
+    hits = (index or get_catalog_index()).search(
+        user_message, k=settings.CHAT_RETRIEVAL_TOP_K, min_score=settings.CHAT_RETRIEVAL_MIN_SCORE
+    )
+    lines, budget = [], settings.CHAT_RETRIEVAL_TOKEN_BUDGET - estimate_tokens(CATALOG_INSTRUCTION)
+    for record, _score in hits:
+        line = format_catalog_record(record)
+        budget -= estimate_tokens(line)
+        if budget < 0:
+            break  # Hits are best-first; drop the tail rather than truncating a record
+        lines.append(line)
+    return CATALOG_INSTRUCTION + "\n" + "\n".join(lines) if lines else None
 
-        # Agar koi file hai to usay add karein
-        if file_data and file_type:
-            processed = process_file(file_data, file_type)
-            if processed and processed["type"] == "text":
-                # PDF Text ko message mein jod do
-                user_content[0]["text"] += f"\n\n{processed['content']}"
-            elif processed and processed["type"] == "image":
-                # Image ko alag se jod do
-                user_content.append(processed["content"])
 
-        messages.append({"role": "user", "content": user_content})
+def build_messages(
+    user_message: str,
+    processed: Optional[dict] = None,
+    catalog_context: Optional[str] = None,
+    history: Optional[List[dict]] = None,
+) -> List[dict]:
+    messages = [{"role": "system", "content": SYSTEM_INSTRUCTION}]
+    if catalog_context:
+        messages.append({"role": "system", "content": catalog_context})
+    # Earlier turns (summary + latest messages) from chat_context.build_context
+    messages.extend(history or [])
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Best & Cheapest Vision Model
+    # User ka message content prepare karein
+    user_content = [{"type": "text", "text": user_message}]
+
+    # Agar koi file hai to usay add karein
+    if processed and processed["type"] == "text":
+        # PDF Text ko message mein jod do
+        user_content[0]["text"] += f"\n\n{processed['content']}"
+    elif processed and processed["type"] == "image":
+        # Image ko alag se jod do
+        user_content.append(processed["content"])
+
+    messages.append({"role": "user", "content": user_content})
+    return messages
+
+
+# --- LLM backends ---
+
+class ChatBackend(ABC):
+    """Streams a completion as text chunks. Implementations must never block the event loop."""
+    name = "base"
+
+    @abstractmethod
+    def stream(self, messages: List[dict]) -> AsyncIterator[str]:
+        """An async generator of text chunks."""
+
+
+class OpenAIChatBackend(ChatBackend):
+    name = "openai"
+
+    def __init__(self, key: str):
+        self.client = AsyncOpenAI(api_key=key)
+
+    async def stream(self, messages):
+        response = await self.client.chat.completions.create(
+            model=settings.CHAT_MODEL,  # gpt-4o-mini: Best & Cheapest Vision Model
             messages=messages,
-            max_tokens=300,
-            temperature=0.7
+            max_tokens=settings.CHAT_MAX_TOKENS,
+            temperature=settings.CHAT_TEMPERATURE,
+            stream=True,
         )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class OfflineChatBackend(ChatBackend):
+    name = "offline"
 
-        return response.choices[0].message.content
+    async def stream(self, messages):
+        yield OFFLINE_REPLY
 
+
+class FakeChatBackend(ChatBackend):
+    """
+    Local stand-in for load tests (CHAT_BACKEND=fake): a canned answer of `tokens` words
+    with OpenAI-like time to first token and inter-token delay. blocking=True sleeps
+    synchronously, the way a sync client called from async code stalls the event loop.
+    """
+    name = "fake"
+
+    def __init__(self, first_token_ms: float = None, token_ms: float = None, tokens: int = None, blocking: bool = False):
+        self.first_token = (settings.FAKE_LLM_FIRST_TOKEN_MS if first_token_ms is None else first_token_ms) / 1000
+        self.token_delay = (settings.FAKE_LLM_TOKEN_MS if token_ms is None else token_ms) / 1000
+        self.tokens = settings.FAKE_LLM_TOKENS if tokens is None else tokens
+        self.blocking = blocking
+
+    async def _sleep(self, seconds: float):
+        if self.blocking:
+            time.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def stream(self, messages):
+        question = messages[-1]["content"][0]["text"][:80]
+        words = f"Here is what I found about: {question}.".split()
+        words += ["scholarship"] * max(0, self.tokens - len(words))
+        await self._sleep(self.first_token)
+        for i, word in enumerate(words[:max(self.tokens, 1)]):
+            if i:
+                await self._sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+
+_backend: Optional[ChatBackend] = None
+
+
+def get_chat_backend() -> ChatBackend:
+    global _backend
+    if _backend is None:
+        if settings.CHAT_BACKEND == "fake":
+            _backend = FakeChatBackend()
+        elif api_key:
+            _backend = OpenAIChatBackend(api_key)
+        else:
+            print("WARNING: OPENAI_API_KEY not found. Chatbot will return fallback responses.")
+            _backend = OfflineChatBackend()
+    return _backend
+
+
+def set_chat_backend(backend: Optional[ChatBackend]) -> None:
+    """Swaps the backend (benchmarks, tests); None re-reads the settings on next use."""
+    global _backend
+    _backend = backend
+
+
+async def stream_ai_response(
+    user_message: str, file_data=None, file_type=None, use_cache: bool = True, history: Optional[List[dict]] = None
+) -> AsyncIterator[str]:
+    # Only standalone text questions are cached; an attachment or an ongoing
+    # conversation makes every answer different
+    cacheable = settings.CHAT_CACHE_ENABLED and not file_data and not history
+    if cacheable and not use_cache:
+        chat_cache.record_bypass()
+        cacheable = False
+
+    # One index for the cache key and the retrieval, so an answer is stored under the
+    # catalog version its records came from
+    index = catalog_version = None
+    if settings.CHAT_RETRIEVAL_ENABLED:
+        from app.recommendation.index import get_catalog_index
+        try:
+            index = await asyncio.to_thread(get_catalog_index)  # Only the first build touches the DB
+            catalog_version = index.version
+        except Exception as e:
+            print(f"Chatbot retrieval error: {e}")
+            cacheable = False  # Cannot tell which catalog an answer would be for
+
+    if cacheable:
+        cached = chat_cache.get(user_message, catalog_version)
+        if cached is not None:
+            yield cached
+            return
+
+    # PDF parsing / image resizing runs in the attachment pool, cached by content hash
+    processed = await process_attachment(file_data, file_type) if file_data and file_type else None
+    catalog_context = None
+    if index is not None:
+        try:
+            # Search is a sparse dot product
+            catalog_context = await asyncio.to_thread(retrieve_catalog_context, user_message, index)
+        except Exception as e:
+            print(f"Chatbot retrieval error: {e}")
+    messages = build_messages(user_message, processed, catalog_context, history)
+    backend = get_chat_backend()
+    chunks = []
+    try:
+        async for chunk in backend.stream(messages):
+            chunks.append(chunk)
+            yield chunk
     except Exception as e:
         print(f"Chatbot Error: {e}")
-        return "I am having trouble analyzing the file. Please try again."
+        if not chunks:
+            yield ERROR_REPLY
+        return
+    if cacheable and chunks and backend.name != "offline":
+        chat_cache.set(user_message, "".join(chunks), catalog_version)
+
+
+async def get_ai_response(
+    user_message: str, file_data=None, file_type=None, use_cache: bool = True, history: Optional[List[dict]] = None
+) -> str:
+    return "".join([chunk async for chunk in stream_ai_response(user_message, file_data, file_type, use_cache, history)])
@@ -0,0 +1,413 @@
+"""
+Near-duplicate scholarship detection with MinHash and LSH.
+
+The import scripts only replace rows with the same (title, university_id), so a
+listing scraped from two sources with slightly different wording is stored twice.
+
+    shingles  DEDUP_SHINGLE_WORDS-word shingles of title + description
+    MinHash   DEDUP_NUM_PERM hash minima per row (scholarship_signatures); the share of
+              equal positions in two signatures estimates their Jaccard similarity
+    LSH       each signature is cut into DEDUP_BANDS bands and every band hashed to a
+              bucket (scholarship_lsh_buckets). Rows sharing a bucket are candidates,
+              so only candidates are compared, never all pairs.
+
+find_duplicates() refreshes signatures of new and changed rows in chunks, then groups
+candidates at DEDUP_THRESHOLD into duplicate_clusters for admin review.
+check_new_scholarship() does the same for one row at insert time. merge_cluster()
+keeps one scholarship and moves saves, applications, notifications and interactions
+of the others onto it.
+"""
+import datetime
+import itertools
+import re
+import time
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+_WORD = re.compile(r"[a-z0-9]+")
+_MAX_HASH = (1 << 32) - 1
+_SHINGLE_MIX = np.uint64(1000003)
+MAX_REPRESENTATIVES = 5  # Distinct clusters compared per bucket; caps work on huge buckets
+
+
+def params() -> str:
+    return f"k{settings.DEDUP_SHINGLE_WORDS}:p{settings.DEDUP_NUM_PERM}:b{settings.DEDUP_BANDS}"
+
+
+@lru_cache(maxsize=4)
+def _hash_constants(num_perm: int):
+    # Fixed seed: signatures stored by earlier runs must stay comparable
+    rng = np.random.RandomState(1)
+    a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)  # Odd multipliers
+    b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    band_mix = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    return a, b, band_mix
+
+
+def shingles(title: Optional[str], description: Optional[str]) -> np.ndarray:
+    """32-bit hashes of the distinct word shingles of a listing."""
+    words = _WORD.findall(f"{title or ''} {description or ''}".lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    word_hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    # Combine k consecutive word hashes arithmetically instead of hashing joined strings
+    k = min(settings.DEDUP_SHINGLE_WORDS, len(words))
+    count = len(words) - k + 1
+    grams = word_hashes[:count].copy()
+    for offset in range(1, k):
+        grams = grams * _SHINGLE_MIX + word_hashes[offset:offset + count]
+    return np.unique(grams & np.uint64(_MAX_HASH))
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    a, b, _ = _hash_constants(settings.DEDUP_NUM_PERM)
+    if not len(hashes):
+        return np.full(settings.DEDUP_NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    # Multiply-shift hashing, one function per permutation: (a * x + b) mod 2**64, top 32 bits
+    values = (np.outer(hashes, a) + b) >> np.uint64(32)
+    return values.min(axis=0).astype(np.uint32)
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """Signed 64-bit bucket per band; [] for an empty listing, which matches nothing."""
+    if (signature == _MAX_HASH).all():
+        return []
+    _, _, band_mix = _hash_constants(settings.DEDUP_NUM_PERM)
+    bands = (signature.astype(np.uint64) * band_mix).reshape(settings.DEDUP_BANDS, -1).sum(axis=1)
+    return bands.view(np.int64).tolist()
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def _decode(raw: bytes) -> np.ndarray:
+    return np.frombuffer(raw, dtype="<u4")
+
+
+def _insert(db: Session):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+# --- Signatures ---
+
+def _store_signatures(db: Session, rows, computed_at: datetime.datetime) -> Dict[int, np.ndarray]:
+    """Upserts the signature and LSH buckets of each (id, title, description) row."""
+    G, B = models.ScholarshipSignature, models.ScholarshipLSHBucket
+    signatures = {row.id: minhash(shingles(row.title, row.description)) for row in rows}
+    stmt = _insert(db)(G.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["scholarship_id"],
+        set_={c: stmt.excluded[c] for c in ("minhash", "params", "computed_at")},
+    )
+    db.execute(stmt, [
+        {"scholarship_id": sid, "minhash": sig.astype("<u4").tobytes(), "params": params(), "computed_at": computed_at}
+        for sid, sig in signatures.items()
+    ])
+    db.execute(delete(B).where(B.scholarship_id.in_(list(signatures))))
+    buckets = [
+        {"scholarship_id": sid, "band": band, "bucket": key}
+        for sid, sig in signatures.items()
+        for band, key in enumerate(band_buckets(sig))
+    ]
+    if buckets:
+        db.execute(B.__table__.insert(), buckets)
+    return signatures
+
+
+def refresh_signatures(db: Session, full: bool = False, chunk_size: int = None) -> int:
+    """(Re)computes signatures of rows without one, changed since, or made with other params."""
+    S, G = models.Scholarship, models.ScholarshipSignature
+    chunk_size = chunk_size or settings.DEDUP_CHUNK_SIZE
+    last_id, refreshed = 0, 0
+    while True:
+        computed_at = datetime.datetime.utcnow()  # Before reading, so racing edits stay newer
+        query = db.query(S.id, S.title, S.description).outerjoin(G, G.scholarship_id == S.id).filter(S.id > last_id)
+        if not full:
+            query = query.filter(or_(G.scholarship_id.is_(None), G.params != params(), S.updated_at > G.computed_at))
+        rows = query.order_by(S.id).limit(chunk_size).all()
+        if not rows:
+            return refreshed
+        last_id = rows[-1].id
+        _store_signatures(db, rows, computed_at)
+        db.commit()
+        refreshed += len(rows)
+
+
+def _load_signatures(db: Session, ids: Iterable[int]) -> Dict[int, np.ndarray]:
+    G = models.ScholarshipSignature
+    ids, signatures = list(ids), {}
+    for start in range(0, len(ids), 900):  # Stay below SQLite's bound parameter limit
+        for sid, raw in db.query(G.scholarship_id, G.minhash).filter(G.scholarship_id.in_(ids[start:start + 900])):
+            signatures[sid] = _decode(raw)
+    return signatures
+
+
+# --- Clustering ---
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        self.parent[self.find(a)] = self.find(b)
+
+    def components(self) -> List[Set[int]]:
+        groups = defaultdict(set)
+        for x in self.parent:
+            groups[self.find(x)].add(x)
+        return [g for g in groups.values() if len(g) > 1]
+
+
+def _candidate_groups(db: Session) -> List[List[int]]:
+    """Scholarship ids per LSH bucket that holds more than one row."""
+    B = models.ScholarshipLSHBucket
+    shared = db.query(B.band, B.bucket).group_by(B.band, B.bucket).having(func.count() > 1).subquery()
+    rows = db.query(B.band, B.bucket, B.scholarship_id).join(
+        shared, and_(B.band == shared.c.band, B.bucket == shared.c.bucket)
+    ).order_by(B.band, B.bucket, B.scholarship_id).yield_per(5000)
+    return [[r.scholarship_id for r in group] for _, group in itertools.groupby(rows, key=lambda r: (r.band, r.bucket))]
+
+
+def _cluster(groups: List[List[int]], signatures: Dict[int, np.ndarray], threshold: float) -> List[Set[int]]:
+    """
+    Joins candidates whose estimated similarity reaches threshold. Within a bucket each
+    row is compared to at most MAX_REPRESENTATIVES earlier rows of distinct clusters,
+    so a large bucket of true duplicates costs one comparison per row.
+    """
+    sets = _DisjointSet()
+    for members in groups:
+        representatives = []
+        for sid in members:
+            signature = signatures.get(sid)
+            if signature is None:
+                continue
+            for rep in representatives:
+                if sets.find(rep) == sets.find(sid) or similarity(signatures[rep], signature) >= threshold:
+                    sets.union(sid, rep)
+                    break
+            else:
+                if len(representatives) < MAX_REPRESENTATIVES:
+                    representatives.append(sid)
+    return sets.components()
+
+
+def _record_cluster(db: Session, ids: Set[int], signatures: Dict[int, np.ndarray]) -> bool:
+    """
+    Stores a group of duplicates: extends (and joins) the open clusters its rows are
+    in, or opens a new one. A group an admin already dismissed is not reopened.
+    Returns whether anything changed.
+    """
+    C, M = models.DuplicateCluster, models.DuplicateClusterMember
+    memberships = db.query(M.cluster_id, M.scholarship_id, C.status).join(C, C.id == M.cluster_id).filter(
+        M.scholarship_id.in_(ids), C.status.in_(("open", "dismissed"))
+    ).all()
+    dismissed, open_ids = defaultdict(set), set()
+    for cluster_id, sid, status in memberships:
+        if status == "dismissed":
+            dismissed[cluster_id].add(sid)
+        else:
+            open_ids.add(cluster_id)
+    if not open_ids and any(ids <= members for members in dismissed.values()):
+        return False
+
+    ids = set(ids)
+    if open_ids:
+        cluster = db.get(C, min(open_ids))
+        existing = {m.scholarship_id for m in cluster.members}
+        for other_id in sorted(open_ids - {cluster.id}):
+            other = db.get(C, other_id)
+            ids |= {m.scholarship_id for m in other.members}
+            db.delete(other)
+    else:
+        cluster = C(status="open")
+        db.add(cluster)
+        existing = set()
+
+    added = sorted(ids - existing)
+    missing = [sid for sid in ids | existing if sid not in signatures]
+    signatures = {**signatures, **_load_signatures(db, missing)} if missing else signatures
+    rep = signatures.get(min(ids | existing))
+    for sid in added:
+        sig = signatures.get(sid)
+        score = similarity(rep, sig) if rep is not None and sig is not None else None
+        cluster.members.append(M(scholarship_id=sid, similarity=score))
+    db.flush()
+    return bool(added)
+
+
+def _remove_orphans(db: Session) -> None:
+    """Signatures of deleted scholarships (SQLite does not enforce ON DELETE CASCADE)."""
+    live = select(models.Scholarship.id)
+    for model in (models.ScholarshipLSHBucket, models.ScholarshipSignature):
+        db.execute(delete(model).where(model.scholarship_id.notin_(live)))
+
+
+def find_duplicates(db: Session, full: bool = False, chunk_size: int = None) -> dict:
+    """Refreshes signatures, then clusters every candidate bucket. Work grows with candidates, not pairs."""
+    started = time.perf_counter()
+    _remove_orphans(db)
+    db.commit()
+    refreshed = refresh_signatures(db, full=full, chunk_size=chunk_size)
+    signed = time.perf_counter()
+
+    groups = _candidate_groups(db)
+    signatures = _load_signatures(db, {sid for group in groups for sid in group})
+    components = _cluster(groups, signatures, settings.DEDUP_THRESHOLD)
+    updated = sum(_record_cluster(db, component, signatures) for component in components)
+    db.commit()
+    return {
+        "signatures_refreshed": refreshed,
+        "candidate_buckets": len(groups),
+        "candidates": len(signatures),
+        "duplicate_groups": len(components),
+        "clusters_updated": updated,
+        "signature_seconds": round(signed - started, 3),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def check_new_scholarship(db: Session, scholarship: models.Scholarship) -> List[Tuple[int, float]]:
+    """
+    Signs a freshly inserted (flushed) scholarship and looks its buckets up. Matches at
+    DEDUP_THRESHOLD go into a duplicate cluster; returns [(scholarship_id, similarity)].
+    Runs inside the caller's transaction; the caller commits.
+    """
+    B = models.ScholarshipLSHBucket
+    signature = _store_signatures(db, [scholarship], datetime.datetime.utcnow())[scholarship.id]
+    keys = band_buckets(signature)
+    if not keys:
+        return []
+    candidates = {
+        sid for (sid,) in db.query(B.scholarship_id).filter(
+            or_(*(and_(B.band == band, B.bucket == key) for band, key in enumerate(keys))),
+            B.scholarship_id != scholarship.id,
+        ).distinct()
+    }
+    signatures = _load_signatures(db, candidates)
+    matches = sorted(
+        ((sid, similarity(signature, sig)) for sid, sig in signatures.items()),
+        key=lambda m: -m[1],
+    )
+    matches = [(sid, score) for sid, score in matches if score >= settings.DEDUP_THRESHOLD]
+    if matches:
+        signatures[scholarship.id] = signature
+        _record_cluster(db, {scholarship.id} | {sid for sid, _ in matches}, signatures)
+    return matches
+
+
+# --- Review ---
+
+# Later stages win when a user applied to several members of a cluster
+APPLICATION_STAGES = {"Saved": 0, "Applied": 1, "Interview": 2, "Rejected": 3, "Accepted": 4}
+
+
+def _dedupe_applications(db: Session, canonical_id: int, duplicates: List[int]) -> int:
+    """
+    Leaves at most one application per user across the canonical row and its duplicates:
+    the most advanced one, the most recent among equals. Returns the number deleted.
+    """
+    A = models.Application
+    rows = db.query(A.id, A.user_id, A.status, A.applied_date).filter(
+        A.scholarship_id.in_([canonical_id] + duplicates), A.user_id.isnot(None)
+    ).all()
+    by_user = defaultdict(list)
+    for row in rows:
+        by_user[row.user_id].append(row)
+    losers = []
+    for applications in by_user.values():
+        applications.sort(key=lambda a: (
+            APPLICATION_STAGES.get(a.status, 0), a.applied_date or datetime.datetime.min, a.id,
+        ))
+        losers.extend(a.id for a in applications[:-1])
+    if losers:
+        db.execute(delete(A).where(A.id.in_(losers)))
+    return len(losers)
+
+
+def merge_cluster(db: Session, cluster: models.DuplicateCluster, canonical_id: int) -> List[int]:
+    """
+    Keeps canonical_id and deletes the other members after moving their saves,
+    applications, notifications and interactions onto it. A user with applications to
+    several members keeps only the most advanced one. Rollup and trending rows of
+    the deleted ones are dropped; scripts/rebuild_rollups.py recomputes them from the
+    moved interactions. Returns the deleted ids; the caller commits.
+    """
+    if cluster.status != "open":
+        raise ValueError(f"Cluster is already {cluster.status}")
+    member_ids = {m.scholarship_id for m in cluster.members}
+    if canonical_id not in member_ids:
+        raise ValueError("canonical_id is not a member of this cluster")
+    duplicates = sorted(member_ids - {canonical_id})
+
+    saved = models.saved_scholarships
+    already_saved = select(saved.c.user_id).where(saved.c.scholarship_id == canonical_id)
+    db.execute(saved.insert().from_select(
+        ["user_id", "scholarship_id"],
+        select(saved.c.user_id, literal(canonical_id)).where(
+            saved.c.scholarship_id.in_(duplicates), saved.c.user_id.notin_(already_saved)
+        ).distinct(),
+    ))
+    db.execute(delete(saved).where(saved.c.scholarship_id.in_(duplicates)))
+    _dedupe_applications(db, canonical_id, duplicates)
+    for model in (models.Application, models.Notification, models.UserScholarshipInteraction):
+        db.execute(update(model).where(model.scholarship_id.in_(duplicates)).values(scholarship_id=canonical_id))
+    for model in (
+        models.ScholarshipInteractionRollup, models.ScholarshipTrending, models.FraudScanResult,
+        models.ScholarshipSignature, models.ScholarshipLSHBucket,
+    ):
+        db.execute(delete(model).where(model.scholarship_id.in_(duplicates)))
+    M = models.DuplicateClusterMember
+    db.execute(delete(M).where(M.scholarship_id.in_(duplicates), M.cluster_id != cluster.id))
+
+    # ORM deletes, so catalog caches are invalidated on commit
+    for scholarship in db.query(models.Scholarship).filter(models.Scholarship.id.in_(duplicates)):
+        db.delete(scholarship)
+    cluster.status = "merged"
+    cluster.canonical_id = canonical_id
+    cluster.resolved_at = datetime.datetime.utcnow()
+    return duplicates
+
+
+def dismiss_cluster(db: Session, cluster: models.DuplicateCluster) -> None:
+    if cluster.status != "open":
+        raise ValueError(f"Cluster is already {cluster.status}")
+    cluster.status = "dismissed"
+    cluster.resolved_at = datetime.datetime.utcnow()
+
+
+def run_duplicate_scan() -> dict:
+    """Scheduled job body (app/tasks.py)."""
+    db = SessionLocal()
+    try:
+        summary = find_duplicates(db)
+        if summary["clusters_updated"]:
+            print(f"🧬 Duplicate scan: {summary['clusters_updated']} clusters opened or extended")
+        return summary
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,8 +1,17 @@
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 from pydantic import EmailStr
 from dotenv import load_dotenv
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from typing import List, NamedTuple, Optional
+import asyncio
+import base64
 import os
 
+import aiosmtplib
+
+from app.core.config import settings
+
 load_dotenv()
 
 conf = ConnectionConfig(
@@ -39,3 +48,120 @@ async def send_deadline_email(user_email: str, scholarship_title: str, days_left
     fm = FastMail(conf)
     await fm.send_message(message)
     return {"message": "Email sent"}
+
+
+# --- Bulk delivery (deadline reminders) ---
+
+class OutgoingEmail(NamedTuple):
+    sender: str
+    recipients: List[str]
+    data: bytes
+
+
+def encode_subject(subject: str) -> str:
+    """RFC 2047 encoded Subject value; compute once and reuse for every recipient."""
+    return Header(subject, "utf-8").encode()
+
+
+def build_message(to: str, subject: str, html: str, sender: Optional[str] = None,
+                  encoded_subject: Optional[str] = None) -> OutgoingEmail:
+    """
+    Serializes a single-part HTML message straight to bytes.
+    The stdlib EmailMessage header registry costs ~2ms per message, which dominates
+    bulk sends; these headers are fixed so we write them directly.
+    """
+    sender = sender or conf.MAIL_FROM
+    headers = (
+        f"From: {sender}\r\n"
+        f"To: {to}\r\n"
+        f"Subject: {encoded_subject or encode_subject(subject)}\r\n"
+        f"Date: {formatdate(localtime=True)}\r\n"
+        f"Message-ID: {make_msgid(domain=sender.rpartition('@')[2] or None)}\r\n"
+        "MIME-Version: 1.0\r\n"
+        "Content-Type: text/html; charset=\"utf-8\"\r\n"
+        "Content-Transfer-Encoding: base64\r\n\r\n"
+    )
+    return OutgoingEmail(sender, [to], headers.encode("ascii") + base64.encodebytes(html.encode("utf-8")))
+
+
+class SMTPConnectionPool:
+    """
+    Up to `size` authenticated SMTP sessions reused across messages.
+    FastMail opens (and TLS-handshakes, and logs in) a new session per message;
+    here a session is only replaced after `messages_per_connection` sends
+    (most providers cap a session) or when the server drops it.
+    """
+
+    def __init__(self, hostname: str = None, port: int = None, username: Optional[str] = None,
+                 password: Optional[str] = None, start_tls: bool = None, use_tls: bool = None,
+                 validate_certs: bool = None, size: int = None, messages_per_connection: int = None,
+                 timeout: float = 30):
+        self.hostname = hostname or conf.MAIL_SERVER
+        self.port = port or conf.MAIL_PORT
+        if username is None and conf.USE_CREDENTIALS:
+            username, password = conf.MAIL_USERNAME, conf.MAIL_PASSWORD
+        self.username, self.password = username, password
+        self.start_tls = conf.MAIL_STARTTLS if start_tls is None else start_tls
+        self.use_tls = conf.MAIL_SSL_TLS if use_tls is None else use_tls
+        self.validate_certs = conf.VALIDATE_CERTS if validate_certs is None else validate_certs
+        self.size = size or settings.EMAIL_POOL_SIZE
+        self.messages_per_connection = messages_per_connection or settings.EMAIL_MESSAGES_PER_CONNECTION
+        self.timeout = timeout
+
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.size)
+        self._open = set()
+        self.connections_opened = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname, port=self.port, use_tls=self.use_tls,
+            start_tls=self.start_tls, validate_certs=self.validate_certs, timeout=self.timeout,
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password)
+        client.sent_count = 0
+        self._open.add(client)
+        self.connections_opened += 1
+        return client
+
+    async def _discard(self, client: aiosmtplib.SMTP) -> None:
+        self._open.discard(client)
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+    async def send(self, message: OutgoingEmail) -> None:
+        async with self._slots:
+            client = self._idle.get_nowait() if not self._idle.empty() else await self._connect()
+            try:
+                try:
+                    await client.sendmail(message.sender, message.recipients, message.data)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Idle session timed out on the server side; retry once on a fresh one
+                    self._open.discard(client)
+                    client = await self._connect()
+                    await client.sendmail(message.sender, message.recipients, message.data)
+            except Exception:
+                await self._discard(client)
+                raise
+            client.sent_count += 1
+            if client.sent_count >= self.messages_per_connection:
+                await self._discard(client)
+            else:
+                self._idle.put_nowait(client)
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for client in list(self._open):
+            await self._discard(client)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
@@ -1,45 +1,277 @@
+"""
+Fraud scanning for scholarship listings.
+
+Rules are weighted phrases ("processing fee", "western union", ...), the built-in
+DEFAULT_RULES or a JSON file at FRAUD_RULES_FILE:
+
+    [{"phrase": "gift card", "weight": 0.7, "category": "payment"}, ...]
+
+All phrases are compiled into one Aho-Corasick automaton over word tokens, so a text
+is scanned in a single pass however many rules there are, and phrases only match on
+word boundaries ("no essay" does not fire inside "piano essay"). The risk score
+combines the matched rules' weights as independent signals: 1 - prod(1 - weight).
+
+    analyze_fraud_risk()  one listing (create_scholarship)
+    scan_catalog()        the whole catalog in id-ordered chunks (batch), or only rows
+                          never scanned, changed since their scan (updated_at) or
+                          scanned with other rules (incremental); one
+                          fraud_scan_results row per scholarship
+"""
+import datetime
+import hashlib
+import json
 import re
+import time
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+
+class FraudRule(NamedTuple):
+    phrase: str
+    weight: float  # 0..1, how strongly the phrase alone indicates a scam
+    category: str
+
+
+# Words jo scam scholarships mein common hote hain
+DEFAULT_RULES = [
+    FraudRule("processing fee", 0.7, "payment"),      # Paisay mangna
+    FraudRule("application fee", 0.5, "payment"),     # Fee mangna
+    FraudRule("registration fee", 0.5, "payment"),
+    FraudRule("upfront payment", 0.7, "payment"),
+    FraudRule("pay to apply", 0.8, "payment"),        # Direct scam
+    FraudRule("gift card", 0.7, "payment"),
+    FraudRule("western union", 0.8, "transfer"),      # Unsafe transfer
+    FraudRule("moneygram", 0.8, "transfer"),          # Unsafe transfer
+    FraudRule("wire transfer", 0.6, "transfer"),
+    FraudRule("bitcoin", 0.6, "transfer"),
+    FraudRule("bank account", 0.5, "phishing"),       # Bank details mangna
+    FraudRule("credit card", 0.6, "phishing"),        # Card details
+    FraudRule("login credentials", 0.7, "phishing"),  # Phishing
+    FraudRule("social security number", 0.6, "phishing"),
+    FraudRule("guaranteed winner", 0.8, "promise"),   # Jhoota waada
+    FraudRule("guaranteed scholarship", 0.6, "promise"),
+    FraudRule("claim your prize", 0.7, "promise"),
+    FraudRule("you have been selected", 0.4, "promise"),
+    FraudRule("no essay", 0.3, "promise"),            # Too good to be true
+    FraudRule("act now", 0.3, "pressure"),
+    FraudRule("limited time offer", 0.3, "pressure"),
+]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton whose alphabet is words instead of characters."""
+
+    def __init__(self, phrases: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for index, phrase in enumerate(phrases):
+            state = 0
+            for word in tokenize(phrase):
+                if word not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][word] = len(self.goto) - 1
+                state = self.goto[state][word]
+            if state:
+                self.out[state].append(index)
+
+        # Failure links, breadth first: the longest proper suffix that is also a prefix
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, tokens: List[str]) -> set:
+        """Indexes of the phrases occurring in the token sequence."""
+        found, state = set(), 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for word in tokens:
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class FraudEngine:
+    def __init__(self, rules: List[FraudRule]):
+        self.rules = rules
+        self.matcher = PhraseMatcher([r.phrase for r in rules])
+        canonical = json.dumps(sorted([r.phrase.lower(), r.weight, r.category] for r in rules))
+        self.version = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+    def scan(self, *texts: Optional[str]) -> dict:
+        tokens = []
+        for text in texts:
+            tokens += tokenize(text)
+            tokens.append("")  # Phrases must not span two fields
+        matched = [self.rules[i] for i in sorted(self.matcher.find(tokens))]
+        safe = 1.0
+        for rule in matched:
+            safe *= 1.0 - min(max(rule.weight, 0.0), 1.0)
+        score = round(1.0 - safe, 4)
+        return {
+            "score": score,
+            "risk_level": risk_level(score),
+            "matches": [{"phrase": r.phrase, "category": r.category, "weight": r.weight} for r in matched],
+        }
+
+
+def risk_level(score: float) -> str:
+    if score >= settings.FRAUD_SUSPICIOUS_SCORE:
+        return "HIGH"
+    if score >= settings.FRAUD_SUSPICIOUS_SCORE / 2:
+        return "MEDIUM"
+    return "LOW" if score > 0 else "SAFE"
 
-def analyze_fraud_risk(title: str, description: str):
+
+def load_rules(path: str = None) -> List[FraudRule]:
+    path = path or settings.FRAUD_RULES_FILE
+    if not path:
+        return list(DEFAULT_RULES)
+    with open(path, encoding="utf-8") as f:
+        return [FraudRule(r["phrase"], float(r["weight"]), r.get("category", "custom")) for r in json.load(f)]
+
+
+_engine: Optional[FraudEngine] = None
+
+
+def get_engine() -> FraudEngine:
+    global _engine
+    if _engine is None:
+        _engine = FraudEngine(load_rules())
+    return _engine
+
+
+def analyze_fraud_risk(title: str, description: str, eligibility: str = None):
     """
     Scholarship ke content ko scan karta hai aur 'Risk Score' return karta hai.
-    Agar return True hai, to scholarship FRAUD/SUSPICIOUS hai.
+    Agar is_suspicious True hai, to scholarship FRAUD/SUSPICIOUS hai.
+    Same fields as scan_catalog, so both agree on the score.
     """
-    
-    # 1. Words jo scam scholarships mein common hote hain
-    suspicious_keywords = [
-        "processing fee",      # Paisay mangna
-        "application fee",     # Fee mangna
-        "bank account",        # Bank details mangna
-        "credit card",         # Card details
-        "western union",       # Unsafe transfer
-        "moneygram",           # Unsafe transfer
-        "guaranteed winner",   # Jhoota waada
-        "no essay",            # Too good to be true
-        "login credentials",   # Phishing
-        "pay to apply"         # Direct scam
-    ]
-
-    # 2. Text ko lowercase mein convert karein taake matching aasaan ho
-    full_text = f"{title or ''} {description or ''}".lower()
-    
-    found_flags = []
-
-    # 3. Check karein ke koi ghalat lafz to nahi hai?
-    for keyword in suspicious_keywords:
-        if keyword in full_text:
-            found_flags.append(keyword)
-
-    # 4. Result Return karein
-    if found_flags:
-        return {
-            "is_suspicious": True,
-            "reason": f"System detected high-risk keywords: {', '.join(found_flags)}",
-            "risk_level": "HIGH"
-        }
+    scan = get_engine().scan(title, description, eligibility)
+    if scan["risk_level"] == "HIGH":
+        reason = f"System detected high-risk keywords: {', '.join(m['phrase'] for m in scan['matches'])}"
+    elif scan["matches"]:
+        reason = f"Low-risk keywords below the flag threshold: {', '.join(m['phrase'] for m in scan['matches'])}"
     else:
-        return {
-            "is_suspicious": False,
-            "reason": "No suspicious keywords found.",
-            "risk_level": "SAFE"
-        }
+        reason = "No suspicious keywords found."
+    return {"is_suspicious": scan["risk_level"] == "HIGH", "reason": reason, **scan}
+
+
+def result_values(scholarship_id: int, scan: dict, scanned_at: datetime.datetime) -> dict:
+    """A fraud_scan_results row for a scan() result."""
+    return {
+        "scholarship_id": scholarship_id,
+        "score": scan["score"],
+        "risk_level": scan["risk_level"],
+        "matches": json.dumps(scan["matches"]),
+        "rules_version": get_engine().version,
+        "scanned_at": scanned_at,
+    }
+
+
+def _insert(db: Session):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def scan_catalog(db: Session, incremental: bool = True, chunk_size: int = None) -> dict:
+    """
+    Scans scholarships in id order, chunk_size rows per query and commit, so memory
+    stays flat on any catalog size. Rows reaching the HIGH threshold are flagged
+    is_suspicious; flags are never cleared here, and a row an admin unflagged is not
+    flagged again unless its score rises past the threshold or the rules change.
+    """
+    engine = get_engine()
+    chunk_size = chunk_size or settings.FRAUD_SCAN_CHUNK_SIZE
+    S, R = models.Scholarship, models.FraudScanResult
+    table = R.__table__
+    insert = _insert(db)
+    started = time.perf_counter()
+    summary = {"mode": "incremental" if incremental else "batch", "rules_version": engine.version,
+               "scanned": 0, "flagged": 0, "high": 0}
+    last_id = 0
+    while True:
+        # Taken before reading, so an edit racing this chunk is still newer than scanned_at
+        scanned_at = datetime.datetime.utcnow()
+        query = db.query(
+            S.id, S.title, S.description, S.eligibility, R.score, R.rules_version
+        ).outerjoin(R, R.scholarship_id == S.id).filter(S.id > last_id)
+        if incremental:
+            query = query.filter(or_(
+                R.scholarship_id.is_(None), R.rules_version != engine.version, S.updated_at > R.scanned_at
+            ))
+        rows = query.order_by(S.id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        values, to_flag = [], []
+        for row in rows:
+            scan = engine.scan(row.title, row.description, row.eligibility)
+            values.append(result_values(row.id, scan, scanned_at))
+            if scan["risk_level"] == "HIGH":
+                summary["high"] += 1
+                was_high = row.score is not None and row.score >= settings.FRAUD_SUSPICIOUS_SCORE
+                if not was_high or row.rules_version != engine.version:
+                    to_flag.append(row.id)
+
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["scholarship_id"],
+            set_={c: stmt.excluded[c] for c in ("score", "risk_level", "matches", "rules_version", "scanned_at")},
+        )
+        db.execute(stmt, values)
+        if to_flag:
+            # Explicit updated_at: the flag itself must not count as a change to rescan
+            flagged = db.execute(
+                update(S).where(S.id.in_(to_flag), S.is_suspicious.isnot(True))
+                .values(is_suspicious=True, updated_at=S.updated_at)
+            )
+            summary["flagged"] += flagged.rowcount
+        db.commit()
+        summary["scanned"] += len(rows)
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def run_incremental_scan() -> dict:
+    """Scheduled job body (app/tasks.py)."""
+    db = SessionLocal()
+    try:
+        summary = scan_catalog(db, incremental=True)
+        if summary["scanned"]:
+            print(f"🛡️ Fraud scan: {summary['scanned']} rows rescanned, {summary['flagged']} newly flagged")
+        return summary
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,198 @@
+"""
+Cluster-safe runner for scheduled jobs.
+
+Every worker process (uvicorn --workers N, several dynos) starts the same APScheduler,
+so every worker fires every job. run_job() makes that harmless: time is cut into
+slots of the job's period, and before running a worker must claim the job's lease
+for the current slot. The claim is one conditional UPDATE, so exactly one worker
+wins a slot and nobody starts while the previous run still holds the lease.
+
+    JOB_LOCK_BACKEND=database  job_leases table (works across hosts)
+    JOB_LOCK_BACKEND=file      fcntl lock files in JOB_LOCK_DIR (single host)
+
+Sharded jobs get one lease per shard, so N workers can split one run by user id.
+Every run is recorded in job_runs with its duration and result.
+"""
+import asyncio
+import datetime
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Shard(NamedTuple):
+    index: int
+    count: int
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def filter(self, user_id_column):
+        """SQL predicate selecting this shard's users (id modulo shard count)."""
+        return user_id_column % self.count == self.index
+
+
+def current_slot(period_seconds: int, now: float = None) -> int:
+    return int((now or time.time()) // period_seconds)
+
+
+# --- Lease backends ---
+
+def _insert(db: Session):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+class DatabaseLease:
+    def acquire(self, name: str, slot: int, ttl_seconds: int) -> Optional[object]:
+        """Claims `slot` for `name` unless it was already claimed or a run still holds the lease."""
+        db = SessionLocal()
+        try:
+            db.execute(
+                _insert(db)(models.JobLease.__table__).values(name=name)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            now = datetime.datetime.utcnow()
+            claimed = db.query(models.JobLease).filter(
+                models.JobLease.name == name,
+                (models.JobLease.slot.is_(None)) | (models.JobLease.slot < slot),
+                (models.JobLease.expires_at.is_(None)) | (models.JobLease.expires_at < now),
+            ).update({
+                "owner": OWNER,
+                "slot": slot,
+                "acquired_at": now,
+                "expires_at": now + datetime.timedelta(seconds=ttl_seconds),
+            }, synchronize_session=False)
+            db.commit()
+            return (name, slot) if claimed == 1 else None
+        finally:
+            db.close()
+
+    def release(self, token) -> None:
+        name, slot = token
+        db = SessionLocal()
+        try:
+            db.query(models.JobLease).filter(
+                models.JobLease.name == name, models.JobLease.owner == OWNER, models.JobLease.slot == slot
+            ).update({"expires_at": None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+class FileLease:
+    """flock on JOB_LOCK_DIR/<name>.lock; the file stores the last claimed slot."""
+
+    def acquire(self, name: str, slot: int, ttl_seconds: int) -> Optional[object]:
+        import fcntl
+
+        os.makedirs(settings.JOB_LOCK_DIR, exist_ok=True)
+        path = os.path.join(settings.JOB_LOCK_DIR, name.replace("/", "_") + ".lock")
+        handle = open(path, "a+")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return None
+        handle.seek(0)
+        last = handle.read().strip()
+        if last and int(last) >= slot:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+            return None
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(slot))
+        handle.flush()
+        return handle
+
+    def release(self, token) -> None:
+        import fcntl
+
+        fcntl.flock(token, fcntl.LOCK_UN)
+        token.close()
+
+
+def get_lease_backend():
+    return FileLease() if settings.JOB_LOCK_BACKEND == "file" else DatabaseLease()
+
+
+# --- Run history ---
+
+def _start_run(job_name: str, shard: Optional[Shard], slot: int) -> int:
+    db = SessionLocal()
+    try:
+        run = models.JobRun(
+            job_name=job_name, shard=str(shard) if shard else None, slot=slot, owner=OWNER, status="running"
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def _finish_run(run_id: int, started: float, result=None, error: str = None) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.JobRun).filter(models.JobRun.id == run_id).update({
+            "status": "failed" if error else "success",
+            "finished_at": datetime.datetime.utcnow(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "result": json.dumps(result, default=str) if result is not None else None,
+            "error": error,
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_job(name: str, fn: Callable[..., Awaitable], period_seconds: int, shards: int = 1) -> None:
+    """
+    Runs fn once per cluster per slot of period_seconds. With shards > 1, fn(shard=Shard)
+    is called for every shard this worker manages to claim; shards are tried starting
+    at a per-process offset so concurrent workers spread over them.
+    """
+    backend = get_lease_backend()
+    slot = current_slot(period_seconds)
+    ttl = max(period_seconds, settings.JOB_LEASE_SECONDS)
+    order = list(range(shards))
+    offset = os.getpid() % shards
+    for index in order[offset:] + order[:offset]:
+        shard = Shard(index, shards) if shards > 1 else None
+        lease_name = f"{name}#{shard}" if shard else name
+        token = await asyncio.to_thread(backend.acquire, lease_name, slot, ttl)
+        if token is None:
+            continue
+
+        run_id = await asyncio.to_thread(_start_run, name, shard, slot)
+        started = time.perf_counter()
+        try:
+            result = await (fn(shard=shard) if shard else fn())
+            await asyncio.to_thread(_finish_run, run_id, started, result)
+        except Exception as e:
+            print(f"🚨 Job {lease_name} failed: {e}")
+            await asyncio.to_thread(_finish_run, run_id, started, None, f"{type(e).__name__}: {e}")
+        finally:
+            await asyncio.to_thread(backend.release, token)
+
+
+def recent_runs(db: Session, job_name: str = None, limit: int = 50):
+    query = db.query(models.JobRun)
+    if job_name:
+        query = query.filter(models.JobRun.job_name == job_name)
+    return query.order_by(models.JobRun.started_at.desc()).limit(limit).all()
@@ -0,0 +1,176 @@
+"""
+Per-worker fan-out of in-app notifications to open SSE connections.
+
+Producers (deadline job, new-match percolator, possibly in another worker) only write
+notification rows. Each worker runs one dispatcher that, while anybody is connected,
+reads new in_app rows with a primary-key range scan every NOTIFICATION_STREAM_POLL_SECONDS
+and hands each row to the queues of that user's connections. Database load is one small
+query per worker per tick, independent of the number of connections; a connection costs
+one bounded asyncio.Queue.
+
+Ids are handed out at insert time but become visible at commit, so a row can appear
+behind one that was already pushed. The scan therefore starts at a floor that trails the
+newest id by NOTIFICATION_STREAM_LAG_SECONDS: rows above the floor are read again every
+tick and ids already pushed are skipped. A row committed later than that is not pushed;
+it still shows up in the list.
+
+A slow client whose queue is full loses events rather than holding up the others; the
+bell refetches the list when the stream reconnects.
+"""
+import asyncio
+import datetime
+import time
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+
+_metrics = {
+    "connections": 0,
+    "polls": 0,
+    "delivered": 0,
+    "dropped": 0,
+}
+
+
+def serialize(notification, title: Optional[str] = None) -> dict:
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "message": notification.message,
+        "scholarship_id": notification.scholarship_id,
+        "title": title,
+        "sent_date": notification.sent_date.isoformat() if notification.sent_date else None,
+        "read": notification.read_at is not None,
+    }
+
+
+def fetch_since(last_id: int, user_id: int = None, limit: int = 1000) -> List[dict]:
+    """In-app notifications with id > last_id (optionally for one user), oldest first."""
+    db = SessionLocal()
+    try:
+        query = db.query(models.Notification, models.Scholarship.title).outerjoin(
+            models.Scholarship, models.Scholarship.id == models.Notification.scholarship_id
+        ).filter(
+            models.Notification.id > last_id,
+            models.Notification.channel == "in_app",
+        )
+        if user_id is not None:
+            query = query.filter(models.Notification.user_id == user_id)
+        rows = query.order_by(models.Notification.id).limit(limit).all()
+        return [{**serialize(n, title), "user_id": n.user_id} for n, title in rows]
+    finally:
+        db.close()
+
+
+def _max_notification_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(func.max(models.Notification.id)).scalar() or 0
+    finally:
+        db.close()
+
+
+def unread_count(db, user_id: int) -> int:
+    return db.query(func.count(models.Notification.id)).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.read_at.is_(None),
+        models.Notification.channel == "in_app",
+    ).scalar()
+
+
+def mark_read(db, user_id: int, ids: Optional[List[int]] = None) -> int:
+    """Marks the given (or all) unread in-app notifications of the user read. The caller commits."""
+    query = db.query(models.Notification).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.read_at.is_(None),
+        models.Notification.channel == "in_app",
+    )
+    if ids is not None:
+        query = query.filter(models.Notification.id.in_(ids))
+    return query.update({"read_at": datetime.datetime.utcnow()}, synchronize_session=False)
+
+
+class NotificationHub:
+    def __init__(self, poll_seconds: float = None, queue_size: int = None):
+        self.poll_seconds = poll_seconds or settings.NOTIFICATION_STREAM_POLL_SECONDS
+        self.queue_size = queue_size or settings.NOTIFICATION_STREAM_QUEUE_SIZE
+        self.lag_seconds = settings.NOTIFICATION_STREAM_LAG_SECONDS
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._last_id: Optional[int] = None  # Scan floor; every id at or below it is settled
+        self._seen: Dict[int, float] = {}  # Pushed ids above the floor -> monotonic time first read
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        _metrics["connections"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self.subscribers.get(user_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[user_id]
+        _metrics["connections"] -= 1
+
+    def publish(self, items: List[dict]) -> None:
+        for item in items:
+            for queue in self.subscribers.get(item["user_id"], ()):
+                try:
+                    queue.put_nowait(item)
+                    _metrics["delivered"] += 1
+                except asyncio.QueueFull:
+                    _metrics["dropped"] += 1
+
+    async def poll_once(self) -> int:
+        """Reads every row written since the last tick and publishes it. Returns the row count."""
+        if self._last_id is None:
+            # Only rows written after the first connection are pushed; older ones are in the list
+            self._last_id = await asyncio.to_thread(_max_notification_id)
+            return 0
+        _metrics["polls"] += 1
+        now = time.monotonic()
+        total, cursor = 0, self._last_id
+        while True:
+            items = await asyncio.to_thread(fetch_since, cursor)
+            if not items:
+                break
+            cursor = items[-1]["id"]
+            fresh = [item for item in items if item["id"] not in self._seen]
+            for item in fresh:
+                self._seen[item["id"]] = now
+            self.publish(fresh)
+            total += len(fresh)
+        # Raise the floor past ids read long enough ago that earlier gaps are given up on
+        settled = [i for i, first_read in self._seen.items() if now - first_read >= self.lag_seconds]
+        if settled:
+            self._last_id = max(settled)
+            self._seen = {i: t for i, t in self._seen.items() if i > self._last_id}
+        return total
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"🚨 Notification stream poll failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+        # Nobody listening: stop polling and start from the head again on the next connection
+        self._last_id = None
+        self._seen.clear()
+        self._task = None
+
+
+hub = NotificationHub()
+
+
+def stream_metrics() -> dict:
+    return {**_metrics, "users": len(hub.subscribers), "last_id": hub._last_id, "window": len(hub._seen)}
@@ -0,0 +1,240 @@
+"""
+Durable email outbox on top of the notifications table.
+
+Producers (e.g. the deadline job) only insert pending rows. idempotency_key is unique,
+so re-running a job never queues the same reminder twice. drain_outbox() claims due
+rows with a lease (next_attempt_at pushed past the send window), sends them over the
+pooled SMTP sender and records the outcome:
+
+    pending --sent--> sent
+    pending --error--> pending (attempts + 1, next_attempt_at = now + backoff)
+                   \--> failed (after OUTBOX_MAX_ATTEMPTS)
+
+Rows claimed by a worker that crashes become due again when their lease expires.
+"""
+import asyncio
+import datetime
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.email import OutgoingEmail, SMTPConnectionPool
+
+# Notification.type -> fn(item) -> OutgoingEmail. Registered by the producers.
+RENDERERS: Dict[str, Callable[[dict], OutgoingEmail]] = {}
+
+_metrics = {
+    "enqueued": 0,
+    "sent": 0,
+    "retried": 0,
+    "failed": 0,
+    "rate_limited_waits": 0,
+    "drains": 0,
+    "last_drain": None,
+}
+
+
+def _insert(db: Session):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def enqueue(db: Session, notifications: List[dict], channel: str = "email", chunk_size: int = 5000) -> None:
+    """
+    Stores notifications, skipping idempotency keys that already exist. Each dict needs
+    user_id, type and idempotency_key (scholarship_id and message optional).
+    Email rows are queued as pending for drain_outbox(); in_app rows are delivered by
+    being written (status sent). The caller commits.
+    """
+    now = datetime.datetime.utcnow()
+    if channel == "email":
+        state = {"status": "pending", "next_attempt_at": now, "sent_date": None}
+    else:
+        state = {"status": "sent", "next_attempt_at": None, "sent_date": now}
+    table = models.Notification.__table__
+    stmt = _insert(db)(table).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    for start in range(0, len(notifications), chunk_size):
+        db.execute(stmt, [
+            {"scholarship_id": None, "message": None, **n, **state, "channel": channel, "attempts": 0}
+            for n in notifications[start:start + chunk_size]
+        ])
+    if channel == "email":
+        _metrics["enqueued"] += len(notifications)
+
+
+class DomainRateLimiter:
+    """Token bucket per recipient domain, so one provider never sees a burst from us."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, list] = {}  # domain -> [tokens, last refill]
+
+    async def acquire(self, domain: str) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(domain, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[domain] = [tokens - 1, now]
+                return
+            self._buckets[domain] = [tokens, now]
+            _metrics["rate_limited_waits"] += 1
+            await asyncio.sleep((1 - tokens) / self.rate)
+
+
+def _backoff(attempts: int) -> datetime.timedelta:
+    delay = min(settings.OUTBOX_RETRY_MAX_SECONDS, settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return datetime.timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def _claim_batch(batch_size: int) -> List[dict]:
+    """Leases up to batch_size due rows and returns them joined with recipient and scholarship."""
+    db = SessionLocal()
+    try:
+        now = datetime.datetime.utcnow()
+        due = db.query(models.Notification.id).filter(
+            models.Notification.status == "pending",
+            models.Notification.channel == "email",
+            models.Notification.next_attempt_at <= now,
+        ).order_by(models.Notification.next_attempt_at, models.Notification.id).limit(batch_size)
+        if db.bind.dialect.name == "postgresql":
+            due = due.with_for_update(skip_locked=True)
+        ids = [row.id for row in due]
+        if not ids:
+            return []
+
+        # The lease timestamp doubles as a claim token: a concurrent drain that
+        # selected the same ids fails the WHERE and does not get them back below.
+        lease = now + datetime.timedelta(
+            seconds=settings.OUTBOX_LEASE_SECONDS, microseconds=random.randint(0, 999999)
+        )
+        db.query(models.Notification).filter(
+            models.Notification.id.in_(ids),
+            models.Notification.status == "pending",
+            models.Notification.next_attempt_at <= now,
+        ).update({"next_attempt_at": lease}, synchronize_session=False)
+
+        rows = db.query(
+            models.Notification.id, models.Notification.type, models.Notification.message,
+            models.Notification.attempts, models.Notification.scholarship_id,
+            models.User.email, models.User.full_name,
+            models.Scholarship.title, models.Scholarship.deadline,
+        ).join(
+            models.User, models.User.id == models.Notification.user_id
+        ).outerjoin(
+            models.Scholarship, models.Scholarship.id == models.Notification.scholarship_id
+        ).filter(
+            models.Notification.id.in_(ids), models.Notification.next_attempt_at == lease
+        ).all()
+        db.commit()
+        return [dict(row._mapping) for row in rows]
+    finally:
+        db.close()
+
+
+def _record_results(results: List[tuple]) -> None:
+    """results: [(item, error or None)]. Writes all outcomes of a batch in one transaction."""
+    now = datetime.datetime.utcnow()
+    table = models.Notification.__table__
+    sent, retry, failed = [], [], []
+    for item, error in results:
+        attempts = (item["attempts"] or 0) + 1
+        if error is None:
+            sent.append({"_id": item["id"], "attempts": attempts})
+        elif attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            failed.append({"_id": item["id"], "attempts": attempts, "last_error": error[:1000]})
+        else:
+            retry.append({
+                "_id": item["id"], "attempts": attempts, "last_error": error[:1000],
+                "next_attempt_at": now + _backoff(attempts),
+            })
+
+    db = SessionLocal()
+    try:
+        by_id = table.c.id == bindparam("_id")
+        if sent:
+            db.execute(update(table).where(by_id).values(
+                status="sent", sent_date=now, last_error=None, attempts=bindparam("attempts")
+            ), sent)
+        if retry:
+            db.execute(update(table).where(by_id).values(
+                attempts=bindparam("attempts"), last_error=bindparam("last_error"),
+                next_attempt_at=bindparam("next_attempt_at"),
+            ), retry)
+        if failed:
+            db.execute(update(table).where(by_id).values(
+                status="failed", attempts=bindparam("attempts"), last_error=bindparam("last_error")
+            ), failed)
+        db.commit()
+    finally:
+        db.close()
+
+    _metrics["sent"] += len(sent)
+    _metrics["retried"] += len(retry)
+    _metrics["failed"] += len(failed)
+
+
+async def _deliver(pool: SMTPConnectionPool, limiter: DomainRateLimiter, item: dict) -> tuple:
+    renderer = RENDERERS.get(item["type"])
+    if renderer is None:
+        return item, f"No renderer for notification type '{item['type']}'"
+    try:
+        await limiter.acquire(item["email"].rpartition("@")[2].lower())
+        await pool.send(renderer(item))
+        return item, None
+    except Exception as e:
+        return item, f"{type(e).__name__}: {e}"
+
+
+async def drain_outbox(pool: Optional[SMTPConnectionPool] = None, batch_size: int = None) -> dict:
+    """Sends every due pending email. Returns {"sent", "retried", "failed", "seconds"} for this run."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    limiter = DomainRateLimiter(settings.OUTBOX_DOMAIN_RATE_PER_SECOND, settings.OUTBOX_DOMAIN_BURST)
+    owns_pool = pool is None
+    pool = pool or SMTPConnectionPool()
+    before = {k: _metrics[k] for k in ("sent", "retried", "failed")}
+    started = time.perf_counter()
+    try:
+        while True:
+            # DB work runs in a thread so the event loop keeps serving requests
+            batch = await asyncio.to_thread(_claim_batch, batch_size)
+            if not batch:
+                break
+            results = await asyncio.gather(*(_deliver(pool, limiter, item) for item in batch))
+            await asyncio.to_thread(_record_results, results)
+    finally:
+        if owns_pool:
+            await pool.close()
+
+    elapsed = time.perf_counter() - started
+    run = {k: _metrics[k] - before[k] for k in before}
+    run["seconds"] = round(elapsed, 3)
+    run["messages_per_second"] = round(run["sent"] / elapsed, 1) if elapsed else 0.0
+    _metrics["drains"] += 1
+    _metrics["last_drain"] = run
+    if run["sent"] or run["retried"] or run["failed"]:
+        print(f"📬 Outbox drained: {run}")
+    return run
+
+
+def outbox_metrics(db: Session) -> dict:
+    """Process counters plus queue depth per status from the database."""
+    depth = dict(
+        db.query(models.Notification.status, func.count(models.Notification.id))
+        .filter(models.Notification.channel == "email")
+        .group_by(models.Notification.status)
+        .all()
+    )
+    return {**_metrics, "queue": depth}
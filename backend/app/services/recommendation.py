@@ -1,10 +1,13 @@
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from sqlalchemy.orm import Session
 from app.db.models import User, Scholarship
+from app.recommendation.index import get_catalog_index
+from app.recommendation.popularity import popularity_features
 import re
 
+# Share of the final score that comes from the trending feature
+POPULARITY_WEIGHT = 0.1
+
 def clean_text(text):
     if not text:
         return ""
@@ -13,6 +16,10 @@ def clean_text(text):
     text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
     return text
 
+def build_user_tag(user) -> str:
+    """Query text matched against the catalog index (field of interest counts twice)."""
+    return clean_text(f"{user.field_of_interest or ''} {user.specialization or ''} {user.field_of_interest or ''}")
+
 def get_recommendations(db: Session, user_id: int):
     # 1. Fetch User Profile
     user = db.query(User).filter(User.id == user_id).first()
@@ -46,35 +53,19 @@ def get_recommendations(db: Session, user_id: int):
     # 3. AI Scoring (Step 2): Content-Based Filtering
     
     # Prepare User Tag
-    user_tag = f"{user.field_of_interest or ''} {user.specialization or ''} {user.field_of_interest or ''}"
-    user_tag = clean_text(user_tag)
+    user_tag = build_user_tag(user)
     
-    # Prepare Scholarship Tags
-    scholarship_data = []
-    for s in scholarships:
-        s_tag = f"{s.title} {s.description or ''} {s.field_of_study or ''}"
-        scholarship_data.append({
-            "id": s.id,
-            "tag": clean_text(s_tag),
-            "object": s
-        })
+    scholarship_data = [{"id": s.id, "object": s} for s in scholarships]
 
-    # Combine user tag with scholarship tags for vectorization
-    all_texts = [user_tag] + [item["tag"] for item in scholarship_data]
-    
-    # TF-IDF Vectorization
-    vectorizer = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(all_texts)
-    
-    # Calculate Cosine Similarity
-    # tfidf_matrix[0:1] is the user vector
-    # tfidf_matrix[1:] are the scholarship vectors
-    cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
+    # Content similarity against the worker's shared catalog TF-IDF index
+    # (fit once per catalog version instead of on every request)
+    cosine_sim = get_catalog_index(db).similarity(user_tag, [item["id"] for item in scholarship_data])
     
-    # Ranking
-    scores = cosine_sim[0]
-    for i, score in enumerate(scores):
-        scholarship_data[i]["score"] = float(score)
+    # Ranking: content similarity, nudged by recent popularity
+    popularity = popularity_features(db, [item["id"] for item in scholarship_data])
+    for i, score in enumerate(cosine_sim):
+        pop = popularity.get(scholarship_data[i]["id"], 0.0)
+        scholarship_data[i]["score"] = float(score) * (1 - POPULARITY_WEIGHT) + pop * POPULARITY_WEIGHT
 
     # Sort by score descending
     scholarship_data.sort(key=lambda x: x["score"], reverse=True)
@@ -0,0 +1,185 @@
+"""
+Rendered resume PDFs, cached on disk by profile hash.
+
+A resume only needs rendering again when a field the template reads
+(resume_generator.RESUME_FIELDS) or the template itself changed; otherwise the
+stored file is served as is.
+
+    layout     RESUME_CACHE_DIR/<hash[:2]>/<hash>.pdf, written to a temp file and
+               renamed, so readers never see a partial PDF
+    eviction   once the directory grows past RESUME_CACHE_MAX_BYTES, the least recently
+               used files (mtime, touched on every hit) are deleted down to 90%
+    rendering  reportlab holds the GIL for the whole render, so misses run in a small
+               process pool; concurrent misses for the same hash share one render
+
+Workers sharing the directory each track their own size estimate and rescan the
+directory before evicting, so the bound holds across processes.
+"""
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.resume_generator import profile_hash, render_resume
+
+
+class ResumeDiskCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # Bytes on disk; scanned on first write
+        self._lock = threading.Lock()
+        self.metrics = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # Most recently used now; eviction removes the oldest first
+        except FileNotFoundError:
+            self.metrics["misses"] += 1
+            return None
+        self.metrics["hits"] += 1
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.metrics["stored"] += 1
+        with self._lock:
+            self._size = self._scan()[1] if self._size is None else self._size + len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def _scan(self):
+        """([(mtime, size, path)], total bytes) of the cached PDFs."""
+        files = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".pdf"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # Evicted by another worker meanwhile
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files, sum(size for _, size, _ in files)
+
+    def _evict(self) -> None:
+        files, total = self._scan()
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.metrics["evicted"] += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def stats(self) -> dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self.metrics["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+cache = ResumeDiskCache(settings.RESUME_CACHE_DIR, settings.RESUME_CACHE_MAX_BYTES)
+_in_flight: Dict[str, asyncio.Task] = {}
+_pool: Optional[ProcessPoolExecutor] = None
+_metrics = {"renders": 0, "render_seconds": 0.0, "joined": 0, "errors": 0}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a server process that already runs threads (scheduler, buffers) is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.RESUME_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+async def render(fields: dict) -> bytes:
+    """Renders in the process pool without touching the cache."""
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), render_resume, fields)
+    except Exception:
+        _metrics["errors"] += 1
+        raise
+    finally:
+        _metrics["renders"] += 1
+        _metrics["render_seconds"] += time.perf_counter() - started
+
+
+async def _render_and_store(key: str, fields: dict) -> str:
+    data = await render(fields)
+    return await asyncio.to_thread(cache.put, key, data)
+
+
+def _finished(key: str, task: asyncio.Task) -> None:
+    del _in_flight[key]
+    if not task.cancelled():
+        task.exception()  # Mark retrieved when every caller went away
+
+
+async def get_resume_path(fields: dict) -> str:
+    """Path of the cached PDF for resume_generator.resume_fields(user), rendering it on a miss."""
+    key = profile_hash(fields)
+    path = cache.get(key)
+    if path is not None:
+        return path
+    task = _in_flight.get(key)
+    if task is not None:
+        _metrics["joined"] += 1
+    else:
+        # Its own task: a caller that disconnects does not cancel the render others wait for
+        task = asyncio.ensure_future(_render_and_store(key, fields))
+        _in_flight[key] = task
+        task.add_done_callback(lambda t: _finished(key, t))
+    return await asyncio.shield(task)
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def get_resume_bytes(fields: dict) -> bytes:
+    """PDF bytes through the cache; renders again if the file was evicted before the read."""
+    path = await get_resume_path(fields)
+    try:
+        return await asyncio.to_thread(_read, path)
+    except FileNotFoundError:
+        return await render(fields)
+
+
+def resume_cache_metrics() -> dict:
+    renders = _metrics["renders"]
+    return {
+        **cache.stats(),
+        "renders": renders,
+        "avg_render_ms": round(_metrics["render_seconds"] / renders * 1000, 1) if renders else 0.0,
+        "joined": _metrics["joined"],
+        "errors": _metrics["errors"],
+        "in_flight": len(_in_flight),
+    }
@@ -1,7 +1,35 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
+from types import SimpleNamespace
+import hashlib
 import io
+import json
+
+# Bump when the layout below changes, so cached PDFs (app/services/resume_cache.py) are re-rendered
+TEMPLATE_VERSION = 1
+
+# Every User field the template reads; the cache key is a hash of exactly these
+RESUME_FIELDS = (
+    "full_name", "major", "email", "phone_number", "nationality", "current_university",
+    "current_degree", "graduation_year", "cgpa", "target_degree", "target_country",
+)
+
+
+def resume_fields(user) -> dict:
+    """Plain (picklable) dict of the fields the template uses."""
+    return {name: getattr(user, name, None) for name in RESUME_FIELDS}
+
+
+def profile_hash(fields: dict) -> str:
+    payload = json.dumps({"v": TEMPLATE_VERSION, **fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_resume(fields: dict) -> bytes:
+    """Worker-process entry point: resume_fields() in, PDF bytes out."""
+    return generate_resume_pdf(SimpleNamespace(**fields)).getvalue()
+
 
 def generate_resume_pdf(user_data):
     """
@@ -0,0 +1,90 @@
+"""
+Short-TTL, per-worker cache of authenticated user profiles.
+
+Entries are keyed by (user_id, profile_version). With a shared backend (CACHE_URL=redis://)
+the version token lives there, so bumping it in one worker (PUT /users/me) makes every
+worker miss on its next lookup. With the default in-memory backend only the worker that
+did the write drops its entry; other workers serve the old profile (including is_active)
+for at most USER_CACHE_TTL_SECONDS.
+
+Password hashes are never cached.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.db import models
+from app.services.cache import TTLCache, get_shared_backend
+
+_profiles = TTLCache(max_items=settings.USER_CACHE_MAX_ITEMS, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Version tokens must outlive the cached profiles they guard
+_VERSION_TTL_SECONDS = 24 * 60 * 60
+
+
+def _version_key(user_id: int) -> str:
+    return f"user_version:{user_id}"
+
+
+_LOCAL_VERSION = b"local"
+
+# Loaded from the database on access instead; a cache is no place for credentials
+_UNCACHED_COLUMNS = {"hashed_password"}
+
+
+def _new_token() -> bytes:
+    return str(time.time_ns()).encode()
+
+
+def profile_version(user_id: int) -> bytes:
+    backend = get_shared_backend()
+    if not backend.shared:
+        return _LOCAL_VERSION
+    token = backend.get(_version_key(user_id))
+    if token is None:
+        # Expired, evicted or never set: start a new version rather than fall back to a
+        # fixed one, which could bring back a snapshot cached before the last write
+        token = _new_token()
+        backend.set(_version_key(user_id), token, _VERSION_TTL_SECONDS)
+    return token
+
+
+def invalidate_user(user_id: int) -> None:
+    """Call after any write to a user row (see the module docstring for which workers it reaches)."""
+    _profiles.delete((user_id, _LOCAL_VERSION))
+    backend = get_shared_backend()
+    if backend.shared:
+        backend.set(_version_key(user_id), _new_token(), _VERSION_TTL_SECONDS)
+
+
+def _snapshot(user: models.User) -> dict:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(models.User).column_attrs
+        if attr.key not in _UNCACHED_COLUMNS
+    }
+
+
+def load_user(db: Session, user_id: int) -> Optional[models.User]:
+    """
+    Returns the user attached to `db`, skipping the SELECT when a fresh snapshot is cached.
+    Relationships (saved_items, applications, ...) still lazy-load through the session.
+    """
+    key = (user_id, profile_version(user_id))
+    snapshot = _profiles.get(key)
+    if snapshot is not None:
+        user = models.User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if user:
+        _profiles.set(key, _snapshot(user))
+    return user
+
+
+def stats() -> dict:
+    return _profiles.stats()
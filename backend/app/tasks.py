@@ -1,91 +1,208 @@
+import asyncio
 import datetime
 import os
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from functools import lru_cache
+from html import escape
+from string import Template
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import select, union
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.db.session import SessionLocal
-from app.db.models import User, Scholarship
+from app.db.models import Application, User, Scholarship, saved_scholarships
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-from app.services.email import conf, send_deadline_email
+from app.services import outbox
+from app.services.email import SMTPConnectionPool, build_message, encode_subject
+from app.services.dedup import run_duplicate_scan
+from app.services.fraud_detection import run_incremental_scan
+from app.services.jobs import Shard, run_job
+
+# Rendered once per scholarship; only $recipient_name changes per user
+DEADLINE_EMAIL_TEMPLATE = Template("""
+<div style="font-family: sans-serif; max-width: 600px; margin: auto; padding: 20px; border: 1px solid #e2e8f0; border-radius: 12px;">
+    <h2 style="color: #1e3a8a;">Deadline Alert! ⏳</h2>
+    <p>Dear <strong>$recipient_name</strong>,</p>
+    <p>This is a reminder that the scholarship you saved, <strong>$title</strong>, has its deadline in <strong>$days_left</strong>.</p>
+    <hr style="border: 0; border-top: 1px solid #e2e8f0; margin: 20px 0;">
+    <p><strong>Deadline:</strong> $deadline</p>
+    <p>Don't miss this opportunity! Make sure to complete and submit your application on time.</p>
+    <div style="margin-top: 30px;">
+        <a href="http://localhost:5173/#detail?id=$scholarship_id" 
+           style="background-color: #1e3a8a; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; font-weight: bold;">
+           View Scholarship Details
+        </a>
+    </div>
+    <p style="margin-top: 40px; font-size: 12px; color: #64748b;">
+        You received this email because you saved this scholarship on ScholarIQ.<br>
+        © 2025 ScholarIQ. All rights reserved.
+    </p>
+</div>
+""")
+
+
+def fetch_deadline_recipients(db: Session, today: datetime.date, horizon_days: int, shard: Shard = None):
+    """
+    (scholarship_id, title, deadline, user_id, email_notifications) for every active user
+    tracking (saved or applied to) a scholarship due within horizon_days. One range scan
+    on ix_scholarships_deadline covers all reminder windows. With a shard, only that
+    shard's users are returned.
+    """
+    tracked = union(
+        select(saved_scholarships.c.user_id, saved_scholarships.c.scholarship_id),
+        select(Application.user_id, Application.scholarship_id),
+    ).subquery()
+    query = db.query(
+        Scholarship.id, Scholarship.title, Scholarship.deadline, User.id, User.email_notifications
+    ).join(
+        tracked, tracked.c.scholarship_id == Scholarship.id
+    ).join(
+        User, User.id == tracked.c.user_id
+    ).filter(
+        Scholarship.deadline >= datetime.datetime.combine(today, datetime.time.min),
+        Scholarship.deadline < datetime.datetime.combine(today + datetime.timedelta(days=horizon_days + 1), datetime.time.min),
+        User.is_active.is_(True),
+    )
+    if shard:
+        query = query.filter(shard.filter(User.id))
+    return query.all()
+
+
+def reminder_window(days_left: int, windows) -> int:
+    """Smallest configured window that still covers days_left (T-30, T-7, T-1 ...)."""
+    return min(w for w in windows if w >= days_left)
+
+
+def format_days_left(days_left: int) -> str:
+    if days_left <= 0:
+        return "less than a day"
+    return "1 day" if days_left == 1 else f"{days_left} days"
+
+
+@lru_cache(maxsize=1024)
+def _deadline_template(scholarship_id: int, title: str, deadline: datetime.datetime, days_left: int):
+    """(encoded subject, body template) for one scholarship; only $recipient_name is left to fill."""
+    # "$" in a title must survive the second substitution
+    body = Template(DEADLINE_EMAIL_TEMPLATE.safe_substitute(
+        title=escape(title or "").replace("$", "$$"),
+        deadline=deadline.strftime('%d %B, %Y') if deadline else "",
+        days_left=format_days_left(days_left),
+        scholarship_id=scholarship_id,
+    ))
+    return encode_subject(f"⚠️ {format_days_left(days_left).capitalize()} Left: {title} Deadline"), body
+
+
+def render_deadline_email(item: dict):
+    """Outbox renderer for deadline_reminder notifications. Days left are counted at send time."""
+    days_left = (item["deadline"].date() - datetime.datetime.now().date()).days if item["deadline"] else 0
+    subject, body = _deadline_template(item["scholarship_id"], item["title"], item["deadline"], days_left)
+    return build_message(
+        item["email"], None, body.substitute(recipient_name=escape(item["full_name"] or item["email"])),
+        encoded_subject=subject,
+    )
+
+
+outbox.RENDERERS["deadline_reminder"] = render_deadline_email
+
 
 # --- 2. DEADLINE CHECK LOGIC ---
-async def check_deadlines_and_notify():
+async def check_deadlines_and_notify(pool: SMTPConnectionPool = None, shard: Shard = None):
     """
-    Checks for scholarships where the deadline is exactly 7 days from today
-    and notifies users who have saved them.
+    Finds tracked scholarships whose deadline falls in a reminder window
+    (REMINDER_WINDOWS_DAYS), stores an in-app notification and queues an email per
+    user and window, then drains the outbox. Idempotency keys include the window and
+    the deadline date, so each reminder goes out once even if the job runs again or
+    misses a day, and a deadline that moves gets reminders for its new date.
+    Returns a summary for the job history.
     """
-    print(f"[{datetime.datetime.now()}] 🔍 Checking for upcoming scholarship deadlines (T-7 days)...")
+    windows = sorted(settings.REMINDER_WINDOWS_DAYS)
+    if not windows:
+        print("⚠️ REMINDER_WINDOWS_DAYS is empty; no deadline reminders are sent.")
+        return {"in_app": 0, "email": 0, "outbox": await outbox.drain_outbox(pool)}
+    print(f"[{datetime.datetime.now()}] 🔍 Checking for upcoming scholarship deadlines (T-{', T-'.join(map(str, windows))} days)...")
     db: Session = SessionLocal()
     
     try:
-        # Calculate target date (7 days from now)
         today = datetime.datetime.now().date()
-        target_date = today + datetime.timedelta(days=7)
-        
-        # Query scholarships expiring on target_date
-        upcoming_scholarships = db.query(Scholarship).filter(
-            Scholarship.deadline >= datetime.datetime.combine(target_date, datetime.time.min),
-            Scholarship.deadline <= datetime.datetime.combine(target_date, datetime.time.max)
-        ).all()
-
-        if not upcoming_scholarships:
-            print(f"[{datetime.datetime.now()}] ✅ No scholarships found expiring on {target_date}.")
-            return
-
-        fm = FastMail(conf)
-
-        for scholarship in upcoming_scholarships:
-            # Audit: Scholarship table uses 'saved_by' relationship
-            users_to_notify = [u for u in scholarship.saved_by if u.is_active]
-            
-            for user in users_to_notify:
-                email_body = f"""
-                <div style="font-family: sans-serif; max-width: 600px; margin: auto; padding: 20px; border: 1px solid #e2e8f0; border-radius: 12px;">
-                    <h2 style="color: #1e3a8a;">Deadline Alert! ⏳</h2>
-                    <p>Dear <strong>{user.full_name or user.email}</strong>,</p>
-                    <p>This is a reminder that the scholarship you saved, <strong>{scholarship.title}</strong>, has its deadline in exactly <strong>7 days</strong>.</p>
-                    <hr style="border: 0; border-top: 1px solid #e2e8f0; margin: 20px 0;">
-                    <p><strong>Deadline:</strong> {target_date.strftime('%d %B, %Y')}</p>
-                    <p>Don't miss this opportunity! Make sure to complete and submit your application on time.</p>
-                    <div style="margin-top: 30px;">
-                        <a href="http://localhost:5173/#detail?id={scholarship.id}" 
-                           style="background-color: #1e3a8a; color: white; padding: 12px 24px; text-decoration: none; border-radius: 8px; font-weight: bold;">
-                           View Scholarship Details
-                        </a>
-                    </div>
-                    <p style="margin-top: 40px; font-size: 12px; color: #64748b;">
-                        You received this email because you saved this scholarship on ScholarIQ.<br>
-                        © 2025 ScholarIQ. All rights reserved.
-                    </p>
-                </div>
-                """
-
-                message = MessageSchema(
-                    subject=f"⚠️ 7 Days Left: {scholarship.title} Deadline",
-                    recipients=[user.email],
-                    body=email_body,
-                    subtype=MessageType.html
-                )
-
-                try:
-                    await fm.send_message(message)
-                    print(f"📧 Email sent to {user.email} for '{scholarship.title}'")
-                except Exception as e:
-                    print(f"❌ Failed to send email to {user.email}: {e}")
+        rows = fetch_deadline_recipients(db, today, windows[-1], shard)
+
+        in_app, email = {}, {}
+        for scholarship_id, title, deadline, user_id, email_opt_in in rows:
+            days_left = (deadline.date() - today).days
+            window = reminder_window(days_left, windows)
+            notification = {
+                "user_id": user_id,
+                "scholarship_id": scholarship_id,
+                "type": "deadline_reminder",
+                "message": f"Deadline for '{title}' is in {format_days_left(days_left)}! ⏳",
+            }
+            # Saved and applied can both match; the key dedupes them
+            key = f"deadline_{window}d:{user_id}:{scholarship_id}:{deadline.date().isoformat()}"
+            in_app[key] = {**notification, "idempotency_key": f"in_app:{key}"}
+            if email_opt_in is not False:
+                email[key] = {**notification, "idempotency_key": f"email:{key}"}
 
+        outbox.enqueue(db, list(in_app.values()), channel="in_app")
+        outbox.enqueue(db, list(email.values()), channel="email")
+        db.commit()
     except Exception as e:
+        db.rollback()
         print(f"🚨 Critical error in deadline scheduler: {e}")
+        raise
     finally:
         db.close()
 
+    if not rows:
+        print(f"[{datetime.datetime.now()}] ✅ No tracked scholarships with deadlines in the next {windows[-1]} days.")
+    else:
+        print(f"📥 Deadline reminders: {len(in_app)} in-app, {len(email)} email (duplicates of earlier runs are skipped)")
+    drained = await outbox.drain_outbox(pool)
+    return {"in_app": len(in_app), "email": len(email), "outbox": drained}
+
 # --- 3. SCHEDULER SETUP ---
 scheduler = AsyncIOScheduler()
 
+async def scheduled_deadline_reminders():
+    await run_job("deadline_reminders", check_deadlines_and_notify, period_seconds=24 * 3600, shards=settings.JOB_SHARDS)
+
+
+async def scheduled_outbox_drain():
+    await run_job("outbox_drain", outbox.drain_outbox, period_seconds=settings.OUTBOX_DRAIN_INTERVAL_SECONDS)
+
+
+async def incremental_fraud_scan():
+    return await asyncio.to_thread(run_incremental_scan)
+
+
+async def scheduled_fraud_scan():
+    await run_job("fraud_scan", incremental_fraud_scan, period_seconds=settings.FRAUD_SCAN_INTERVAL_SECONDS)
+
+
+async def duplicate_scan():
+    return await asyncio.to_thread(run_duplicate_scan)
+
+
+async def scheduled_duplicate_scan():
+    await run_job("duplicate_scan", duplicate_scan, period_seconds=settings.DEDUP_INTERVAL_SECONDS)
+
+
 def start_scheduler():
-    scheduler.add_job(check_deadlines_and_notify, 'cron', hour=9, minute=0)
+    # Every worker schedules every job; run_job's lease lets one worker per slot (or shard) run it
+    scheduler.add_job(scheduled_deadline_reminders, 'cron', hour=9, minute=0)
+    scheduler.add_job(
+        scheduled_outbox_drain, 'interval', seconds=settings.OUTBOX_DRAIN_INTERVAL_SECONDS,
+        max_instances=1, coalesce=True,
+    )
+    scheduler.add_job(
+        scheduled_fraud_scan, 'interval', seconds=settings.FRAUD_SCAN_INTERVAL_SECONDS,
+        max_instances=1, coalesce=True,
+    )
+    scheduler.add_job(
+        scheduled_duplicate_scan, 'interval', seconds=settings.DEDUP_INTERVAL_SECONDS,
+        max_instances=1, coalesce=True,
+    )
     scheduler.start()
     print("🚀 [Scheduler] Started! Daily deadline check scheduled for 09:00 AM.")
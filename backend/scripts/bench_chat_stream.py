@@ -0,0 +1,157 @@
+"""
+Chatbot latency/concurrency benchmark against the local fake LLM (no API key needed).
+
+Starts the app on a local port (throwaway SQLite DB) and sends CONCURRENCY parallel
+chat requests in three modes while a probe keeps hitting /health:
+
+    blocking  POST /api/chat/ with a fake LLM that sleeps synchronously, i.e. the old
+              sync OpenAI client called from the async endpoint
+    async     POST /api/chat/ on the async backend (full answer in one response)
+    stream    POST /api/chat/stream (time to first token is what the user waits for)
+
+Usage (from the backend folder):
+    python scripts/bench_chat_stream.py [total_requests] [concurrency]
+    FAKE_LLM_FIRST_TOKEN_MS=600 FAKE_LLM_TOKEN_MS=20 python scripts/bench_chat_stream.py 200 50
+"""
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "bench_chat.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+from app.core import security
+from app.db import models
+from app.db.session import SessionLocal, init_db
+from app.main import app
+from app.services.chatbot import FakeChatBackend, set_chat_backend
+
+TOTAL = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+MODES = ["blocking", "async", "stream"]
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000 if values else 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    # Own thread and event loop, so a blocked server loop cannot slow the client down
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def create_user() -> str:
+    db = SessionLocal()
+    try:
+        user = models.User(email="bench-chat@example.com", hashed_password="x", full_name="Bench")
+        db.add(user)
+        db.commit()
+        return security.create_access_token(user.id)
+    finally:
+        db.close()
+
+
+async def one_request(client: httpx.AsyncClient, mode: str, i: int):
+    """Returns (time to first token, total time) in seconds."""
+    form = {"message": f"Which scholarships fit a CS master student? #{i}"}
+    start = time.perf_counter()
+    if mode != "stream":
+        r = await client.post("/api/chat/", data=form)
+        assert r.status_code == 200, r.text
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    first = None
+    async with client.stream("POST", "/api/chat/stream", data=form) as r:
+        assert r.status_code == 200
+        async for line in r.aiter_lines():
+            if first is None and line == "event: token":
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def run_mode(base_url: str, token: str, mode: str) -> dict:
+    set_chat_backend(FakeChatBackend(blocking=(mode == "blocking")))
+    limits = httpx.Limits(max_connections=CONCURRENCY + 5)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"Authorization": f"Bearer {token}"}, timeout=300, limits=limits
+    ) as client:
+        ttft, totals, probes = [], [], []
+        queue = asyncio.Queue()
+        for i in range(TOTAL):
+            queue.put_nowait(i)
+        done = asyncio.Event()
+
+        async def worker():
+            while not queue.empty():
+                first, total = await one_request(client, mode, queue.get_nowait())
+                ttft.append(first)
+                totals.append(total)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "mode": mode,
+        "req/s": TOTAL / elapsed,
+        "ttft p50": pct(ttft, 50),
+        "ttft p95": pct(ttft, 95),
+        "total p50": pct(totals, 50),
+        "total p95": pct(totals, 95),
+        "/health p95": pct(probes, 95),
+    }
+
+
+async def main():
+    init_db()
+    token = create_user()
+    port = free_port()
+    server = start_server(port)
+    probe = FakeChatBackend()
+    print(
+        f"🤖 Fake LLM: {probe.first_token * 1000:.0f} ms to first token, {probe.token_delay * 1000:.0f} ms/token, "
+        f"{probe.tokens} tokens | {TOTAL} requests, concurrency {CONCURRENCY}"
+    )
+    results = []
+    for mode in MODES:
+        results.append(await run_mode(f"http://127.0.0.1:{port}", token, mode))
+        print(f"✅ {mode} done")
+    server.should_exit = True
+
+    columns = ["mode", "req/s", "ttft p50", "ttft p95", "total p50", "total p95", "/health p95"]
+    print("\n" + "".join(f"{c:>13}" for c in columns) + "   (latencies in ms)")
+    for row in results:
+        print("".join(f"{row[c]:>13}" if isinstance(row[c], str) else f"{row[c]:>13.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,171 @@
+"""
+Benchmark for the deadline reminder job against a local SMTP sink.
+
+Seeds a temporary SQLite database with N users who each saved a scholarship due
+in 7 days, then measures:
+  - the old path (FastMail, one new SMTP session per message, sequential) on a sample,
+    extrapolated to N
+  - check_deadlines_and_notify end to end for all N: enqueue into the outbox,
+    drain over the pooled sender, record outcomes
+
+The sink speaks just enough SMTP for aiosmtplib and adds --latency-ms per command
+to stand in for a real network round trip.
+
+Usage (run from the backend folder):
+    python scripts/bench_deadline_emails.py [--users 100000] [--latency-ms 2] [--pool-size 8] [--baseline-sample 300]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+DB_DIR = tempfile.mkdtemp(prefix="bench_emails_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+# Every bench recipient shares one domain; measure raw throughput, not the per-domain limit
+os.environ.setdefault("OUTBOX_DOMAIN_RATE_PER_SECOND", "0")
+
+
+class SMTPSink:
+    """Accepts and discards mail. Counts delivered messages and sessions."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.messages = 0
+        self.sessions = 0
+        self.server = None
+
+    async def _reply(self, writer, line: bytes):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(line)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        self.sessions += 1
+        await self._reply(writer, b"220 sink ESMTP\r\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line[:4].upper()
+                if command == b"DATA":
+                    await self._reply(writer, b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    await self._reply(writer, b"250 OK queued\r\n")
+                elif command == b"QUIT":
+                    await self._reply(writer, b"221 Bye\r\n")
+                    break
+                elif command == b"EHLO":
+                    await self._reply(writer, b"250-sink\r\n250 8BITMIME\r\n")
+                else:
+                    await self._reply(writer, b"250 OK\r\n")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+
+def seed(users: int, scholarships: int = 20):
+    from sqlalchemy import insert
+    from app.db import models
+    from app.db.session import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        uni = models.University(name="Bench University", country="United Kingdom")
+        db.add(uni)
+        db.flush()
+        deadline = datetime.datetime.combine(
+            datetime.datetime.now().date() + datetime.timedelta(days=7), datetime.time(12, 0)
+        )
+        db.execute(insert(models.Scholarship), [
+            {"title": f"Bench Scholarship {i} ($5,000 award)", "university_id": uni.id, "deadline": deadline}
+            for i in range(scholarships)
+        ])
+        db.execute(insert(models.User), [
+            {"email": f"user{i}@bench-scholariq.com", "hashed_password": "x", "full_name": f"User {i}", "is_active": True}
+            for i in range(users)
+        ])
+        sch_ids = [row[0] for row in db.query(models.Scholarship.id)]
+        user_ids = [row[0] for row in db.query(models.User.id)]
+        db.execute(models.saved_scholarships.insert(), [
+            {"user_id": uid, "scholarship_id": sch_ids[i % len(sch_ids)]} for i, uid in enumerate(user_ids)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def bench_baseline(port: int, sample: int) -> float:
+    """Old behaviour: FastMail opens a new SMTP session for every message."""
+    from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+
+    fm = FastMail(ConnectionConfig(
+        MAIL_USERNAME="", MAIL_PASSWORD="", MAIL_FROM="noreply@scholariq.com", MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1", MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False, VALIDATE_CERTS=False,
+    ))
+    start = time.perf_counter()
+    for i in range(sample):
+        await fm.send_message(MessageSchema(
+            subject="Deadline", recipients=[f"user{i}@bench-scholariq.com"], body="<p>hi</p>", subtype=MessageType.html
+        ))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark deadline reminder delivery")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Simulated RTT per SMTP reply")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--baseline-sample", type=int, default=300)
+    args = parser.parse_args()
+
+    from app.services.email import SMTPConnectionPool
+    from app.tasks import check_deadlines_and_notify
+
+    print(f"🌱 Seeding {args.users} users into {DB_DIR}...")
+    seed(args.users)
+
+    sink = SMTPSink(args.latency_ms / 1000)
+    port = await sink.start()
+
+    if args.baseline_sample:
+        elapsed = await bench_baseline(port, args.baseline_sample)
+        per_msg = elapsed / args.baseline_sample
+        print(f"🐢 Baseline: {args.baseline_sample} msgs in {elapsed:.2f}s "
+              f"({1 / per_msg:.0f} msg/s) -> ~{per_msg * args.users:.0f}s for {args.users}")
+        sink.messages = sink.sessions = 0
+
+    pool = SMTPConnectionPool(
+        hostname="127.0.0.1", port=port, username="", start_tls=False, use_tls=False,
+        validate_certs=False, size=args.pool_size,
+    )
+    start = time.perf_counter()
+    await check_deadlines_and_notify(pool=pool)
+    await pool.close()
+    elapsed = time.perf_counter() - start
+    print(f"🚀 Pooled: {sink.messages} msgs over {sink.sessions} SMTP sessions in {elapsed:.2f}s "
+          f"({sink.messages / elapsed:.0f} msg/s)")
+
+    sink.server.close()
+    if sink.messages != args.users:
+        print(f"⚠️ Expected {args.users} messages, sink received {sink.messages}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,180 @@
+"""
+Import benchmark for scripts/import_uk_scholarships.py.
+
+Writes synthetic CSVs of --rows rows each (the rows of data/UK_Masters_*.csv, spread
+over --universities universities with unique scholarship names) and loads each one
+into a fresh SQLite database with the full schema:
+
+    legacy     the old loader: per row a university SELECT + INSERT/UPDATE, a DELETE of
+               the previous scholarship and an INSERT. Run on --baseline-sample rows
+               and extrapolated linearly to the full size; a lower bound, as its
+               per-row cost grows with the table
+    load       load_sqlite() into an empty catalog (every row inserted)
+    reimport   load_sqlite() of the same CSV again (every row updated in place)
+
+CSV parsing is included in the load and reimport times. Percolation is not run.
+
+Usage (run from the backend folder):
+    python scripts/bench_import_uk.py [--rows 10000 1000000] [--universities 500] [--baseline-sample 10000]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+WORK_DIR = tempfile.mkdtemp(prefix="bench_import_uk_")
+SCHEMA_DB = os.path.join(WORK_DIR, "schema.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SCHEMA_DB}"
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.dirname(__file__))
+
+import pandas as pd
+from app.db.session import init_db
+from import_uk_scholarships import CHUNK_ROWS, load_sqlite, read_chunks
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+TEMPLATES = ["UK_Masters_Top20_Verified.csv", "UK_Masters_Next10_Verified.csv", "UK_Masters_31_WithApplicationType.csv"]
+
+
+def write_csv(path: str, rows: int, universities: int) -> None:
+    templates = pd.concat([pd.read_csv(os.path.join(DATA_DIR, name)) for name in TEMPLATES], ignore_index=True)
+    for start in range(0, rows, CHUNK_ROWS):
+        index = pd.RangeIndex(start, min(start + CHUNK_ROWS, rows))
+        chunk = templates.iloc[index % len(templates)].reset_index(drop=True)
+        ids = pd.Series(index)
+        chunk["uni_name"] = chunk["uni_name"] + " " + (ids % universities).astype(str)
+        chunk["scholarship_name"] = chunk["scholarship_name"] + " #" + ids.astype(str)
+        chunk.to_csv(path, mode="a", header=start == 0, index=False)
+
+
+def legacy_load(conn, df) -> int:
+    """The row-by-row loader this benchmark replaces, verbatim."""
+    cursor = conn.cursor()
+    imported_count = 0
+    new_ids = []
+    for _, row in df.iterrows():
+        # Normalize Country
+        country = row['uni_country']
+        if country == "UK": country = "United Kingdom"
+
+        # 1. Manage University
+        cursor.execute("SELECT id FROM universities WHERE name = ?", (row['uni_name'],))
+        uni_res = cursor.fetchone()
+
+        if uni_res:
+            uni_id = uni_res[0]
+            # Update info if needed
+            cursor.execute("""
+                UPDATE universities 
+                SET city=?, country=?, latitude=?, longitude=?, website_url=?, address=?, min_cgpa=?
+                WHERE id=?
+            """, (row['uni_city'], country, row['lat'], row['lng'], row['uni_link'], row['map_address'], row['cgpa_min'], uni_id))
+        else:
+            cursor.execute("""
+                INSERT INTO universities (name, city, country, latitude, longitude, website_url, address, min_cgpa)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (row['uni_name'], row['uni_city'], country, row['lat'], row['lng'], row['uni_link'], row['map_address'], row['cgpa_min']))
+            uni_id = cursor.lastrowid
+
+        # 2. Manage Scholarship
+        # Delete existing to refresh data
+        cursor.execute("DELETE FROM scholarships WHERE title = ? AND university_id = ?", (row['scholarship_name'], uni_id))
+
+        # Note: We clear old non-verified data before, so we just insert these as verified
+        deadline_val = row['deadline']
+
+        cursor.execute("""
+            INSERT INTO scholarships (
+                title, university_id, country, city, 
+                funding_type, amount, deadline, 
+                degree_level, field_of_study, 
+                scholarship_url, website_url,
+                has_separate_form,
+                application_type, button_label, user_note,
+                tuition_fee_numeric, tuition_fee_per_year,
+                scholarship_amount_numeric, scholarship_amount_value,
+                net_cost_numeric, net_cost_per_year,
+                tuition_verified, scholarship_verified,
+                latitude, longitude, description, verified_at,
+                currency, is_suspicious
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            row['scholarship_name'], uni_id, country, row['uni_city'],
+            "Fully Funded" if row['scholarship_amount_gbp'] >= row['original_fee_gbp'] else "Partial",
+            f"£{row['scholarship_amount_gbp']}", deadline_val,
+            row['degree_level'], row['field_of_study'],
+            row['scholarship_link'], row['uni_link'],
+            1 if str(row.get('has_separate_form', 'true')).lower() == 'true' else 0,
+            row.get('application_type', 'direct_form'),
+            row.get('button_label', 'Apply Now 🎯'),
+            row.get('user_note', ''),
+            float(row['original_fee_gbp']), f"£{row['original_fee_gbp']} per year",
+            float(row['scholarship_amount_gbp']), f"£{row['scholarship_amount_gbp']} award",
+            float(row['after_scholarship_fee_gbp']), f"£{row['after_scholarship_fee_gbp']} net",
+            "verified", "verified",
+            row['lat'], row['lng'], 
+            f"Documents: {row['documents_required']} | Steps: {row['apply_steps']}",
+            datetime.now().isoformat(),
+            "GBP",
+            0
+        ))
+        new_ids.append(cursor.lastrowid)
+        imported_count += 1
+
+    conn.commit()
+    return imported_count
+
+
+def fresh_db(name: str):
+    path = os.path.join(WORK_DIR, name)
+    shutil.copy(SCHEMA_DB, path)
+    return sqlite3.connect(path)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--universities", type=int, default=500)
+    parser.add_argument("--baseline-sample", type=int, default=10000)
+    args = parser.parse_args()
+
+    init_db()
+    results = []
+    for rows in args.rows:
+        csv_path = os.path.join(WORK_DIR, f"uk_{rows}.csv")
+        print(f"📝 Writing {rows} rows...")
+        write_csv(csv_path, rows, args.universities)
+
+        sample = min(rows, args.baseline_sample)
+        conn = fresh_db(f"legacy_{rows}.db")
+        df = pd.read_csv(csv_path, nrows=sample)
+        seconds = timed(lambda: legacy_load(conn, df)) * rows / sample
+        conn.close()
+        results.append((rows, "legacy" + ("" if sample == rows else f" (~{sample})"), seconds))
+
+        conn = fresh_db(f"bulk_{rows}.db")
+        results.append((rows, "load", timed(lambda: load_sqlite(conn, read_chunks(csv_path)))))
+        results.append((rows, "reimport", timed(lambda: load_sqlite(conn, read_chunks(csv_path)))))
+        count = conn.execute("SELECT COUNT(*) FROM scholarships").fetchone()[0]
+        assert count == rows, f"{count} scholarships after importing {rows} rows"
+        conn.close()
+        print(f"✅ {rows} rows done")
+
+    print(f"\n{'rows':>10}{'mode':>22}{'seconds':>12}{'rows/s':>12}")
+    for rows, mode, seconds in results:
+        print(f"{rows:>10}{mode:>22}{seconds:>12.2f}{rows / seconds:>12.0f}")
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Login throughput benchmark under concurrency.
+
+Fires CONCURRENCY parallel /auth/login requests against the app in-process (throwaway
+SQLite DB) while a probe keeps hitting /health, so you can see both how many logins
+per second the hash pool sustains and whether other requests are starved meanwhile.
+
+Usage (from the backend folder):
+    python scripts/bench_login.py [total_logins] [concurrency]
+    PASSWORD_HASH_ROUNDS=100000 PASSWORD_HASH_WORKERS=8 python scripts/bench_login.py 400 50
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from app.core.config import settings
+from app.db.session import init_db
+from app.main import app
+
+TOTAL = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000
+
+
+async def main():
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={"email": "bench@example.com", "password": "bench-password"})
+
+        login_latencies, probe_latencies = [], []
+        queue = asyncio.Queue()
+        for _ in range(TOTAL):
+            queue.put_nowait(None)
+        done = asyncio.Event()
+
+        async def login_worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.post("/auth/login", data={"username": "bench@example.com", "password": "bench-password"})
+                assert r.status_code == 200, r.text
+                login_latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    print(f"rounds={settings.PASSWORD_HASH_ROUNDS} hash_workers={settings.PASSWORD_HASH_WORKERS} "
+          f"logins={TOTAL} concurrency={CONCURRENCY}")
+    print(f"  throughput      : {TOTAL / elapsed:8.1f} logins/s")
+    print(f"  login latency   : p50 {pct(login_latencies, 50):7.1f} ms | p95 {pct(login_latencies, 95):7.1f} ms | p99 {pct(login_latencies, 99):7.1f} ms")
+    print(f"  /health latency : p50 {pct(probe_latencies, 50):7.1f} ms | p95 {pct(probe_latencies, 95):7.1f} ms | max {max(probe_latencies) * 1000:7.1f} ms"
+          f" (mean {statistics.mean(probe_latencies) * 1000:.1f} ms over {len(probe_latencies)} probes)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""
+Resume download benchmark: inline rendering vs the disk cache.
+
+Starts the app on a local port (throwaway SQLite DB and cache directory), creates
+USERS users with distinct profiles and sends TOTAL concurrent downloads (request i
+is made by user i % USERS) in three modes while a probe keeps hitting /health:
+
+    inline  a route registered here that renders with reportlab on the request
+            thread for every download, i.e. the old GET /resume/download
+    cold    GET /resume/download on an empty cache: misses render in the worker pool
+    warm    the same requests again: every download is read from a cached PDF
+
+Usage (from the backend folder):
+    python scripts/bench_resume.py [total_requests] [users] [concurrency]
+    RESUME_RENDER_WORKERS=4 python scripts/bench_resume.py 400 200 50
+"""
+import asyncio
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'bench_resume.db')}"
+os.environ["RESUME_CACHE_DIR"] = os.path.join(WORK_DIR, "resumes")
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+from fastapi import Depends
+from fastapi.responses import StreamingResponse
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal, init_db
+from app.main import app
+from app.services.resume_cache import render, resume_cache_metrics
+from app.services.resume_generator import RESUME_FIELDS, generate_resume_pdf
+
+TOTAL = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+CONCURRENCY = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+MODES = ["inline", "cold", "warm"]
+
+
+@app.get("/bench/resume-inline")
+def download_inline(current_user: models.User = Depends(deps.get_current_user)):
+    return StreamingResponse(generate_resume_pdf(current_user), media_type="application/pdf")
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000 if values else 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    # Own thread and event loop, so a blocked server loop cannot slow the client down
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def create_users() -> list:
+    db = SessionLocal()
+    try:
+        users = [
+            models.User(
+                email=f"bench-resume-{i}@example.com", hashed_password="x", full_name=f"Bench User {i}",
+                major="Computer Science", nationality="Pakistan", current_university="NUST",
+                current_degree="BS", graduation_year=2025, cgpa=3.0 + (i % 100) / 100,
+                target_degree="Masters", target_country="UK",
+            )
+            for i in range(USERS)
+        ]
+        db.add_all(users)
+        db.commit()
+        return [security.create_access_token(u.id) for u in users]
+    finally:
+        db.close()
+
+
+async def run_mode(base_url: str, tokens: list, mode: str) -> dict:
+    path = "/bench/resume-inline" if mode == "inline" else "/resume/download"
+    limits = httpx.Limits(max_connections=CONCURRENCY + 5)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        latencies, probes = [], []
+        queue = asyncio.Queue()
+        for i in range(TOTAL):
+            queue.put_nowait(i)
+        done = asyncio.Event()
+
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.get(path, headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+                assert r.status_code == 200 and r.content.startswith(b"%PDF"), r.text
+                latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "mode": mode,
+        "req/s": TOTAL / elapsed,
+        "p50": pct(latencies, 50),
+        "p95": pct(latencies, 95),
+        "p99": pct(latencies, 99),
+        "/health p95": pct(probes, 95),
+    }
+
+
+async def main():
+    init_db()
+    tokens = create_users()
+    port = free_port()
+    server = start_server(port)
+    print(
+        f"📄 {TOTAL} downloads by {USERS} users, concurrency {CONCURRENCY}, "
+        f"{settings.RESUME_RENDER_WORKERS} render workers"
+    )
+    results = []
+    for mode in MODES:
+        if mode == "cold":
+            # Spawned render processes start on first use; keep their startup out of the numbers
+            await asyncio.gather(*(
+                render(dict.fromkeys(RESUME_FIELDS)) for _ in range(settings.RESUME_RENDER_WORKERS)
+            ))
+        results.append(await run_mode(f"http://127.0.0.1:{port}", tokens, mode))
+        print(f"✅ {mode} done")
+    server.should_exit = True
+
+    columns = ["mode", "req/s", "p50", "p95", "p99", "/health p95"]
+    print("\n" + "".join(f"{c:>13}" for c in columns) + "   (latencies in ms)")
+    for row in results:
+        print("".join(f"{row[c]:>13}" if isinstance(row[c], str) else f"{row[c]:>13.1f}" for c in columns))
+    stats = resume_cache_metrics()
+    print(
+        f"\n🗂️ Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['renders']} renders "
+        f"({stats['avg_render_ms']} ms avg), {stats['joined']} joined, {stats['size_bytes']} bytes on disk"
+    )
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""
+Catalog index benchmark: build time, chatbot retrieval latency and the recommender's
+content scoring, measured apart from LLM time (throwaway SQLite DB, synthetic catalog).
+
+    build      CatalogIndex over every scholarship (once per worker / catalog change)
+    retrieval  search + prompt formatting for one chat question
+    recommend  get_recommendations(): per-request TF-IDF fit (old) vs shared index
+    chat       time to first token with retrieval on/off against a zero-latency fake
+               LLM, i.e. what retrieval adds in front of the model call
+
+Usage (from the backend folder):
+    python scripts/bench_retrieval.py [scholarships] [queries]
+"""
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+DB_FILE = os.path.join(tempfile.mkdtemp(), "bench_retrieval.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_FILE}"
+os.environ.setdefault("CHAT_BACKEND", "fake")
+os.environ.setdefault("CHAT_CACHE_ENABLED", "false")
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal, init_db
+from app.recommendation.index import CatalogIndex, get_catalog_index
+from app.services import chatbot
+from app.services.recommendation import clean_text, get_recommendations
+
+SCHOLARSHIPS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+QUERIES = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+FIELDS = ["Computer Science", "Data Science", "Mechanical Engineering", "Public Health", "Economics",
+          "Law", "Psychology", "Architecture", "Biotechnology", "Artificial Intelligence", "Finance", "Education"]
+COUNTRIES = ["United Kingdom", "Germany", "Australia", "Canada", "United States", "Netherlands", "Sweden"]
+DEGREES = ["Bachelor", "Master", "PhD"]
+FUNDING = ["Fully Funded", "Partial", "Tuition Waiver"]
+QUESTIONS = [
+    "fully funded masters in Germany for computer science",
+    "phd scholarships in public health in the UK",
+    "what scholarships are there for economics in Canada",
+    "data science master scholarship Australia",
+    "law scholarships for international students in the Netherlands",
+    "artificial intelligence phd funding Sweden",
+]
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000
+
+
+def seed():
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        universities = [models.University(name=f"University of {c} {i}", country=c, city=f"City {i}")
+                        for i in range(40) for c in COUNTRIES[:1 + i % len(COUNTRIES)]]
+        db.add_all(universities)
+        db.flush()
+        rows = []
+        for i in range(SCHOLARSHIPS):
+            uni = rng.choice(universities)
+            field, degree, funding = rng.choice(FIELDS), rng.choice(DEGREES), rng.choice(FUNDING)
+            rows.append({
+                "title": f"{funding} {degree} Scholarship in {field} #{i}",
+                "university_id": uni.id,
+                "country": uni.country,
+                "city": uni.city,
+                "degree_level": degree,
+                "field_of_study": field,
+                "funding_type": funding,
+                "description": f"Support for {degree.lower()} students in {field.lower()} at {uni.name}. "
+                               f"Covers tuition and living costs for outstanding international applicants.",
+                "is_suspicious": False,
+            })
+        db.execute(models.Scholarship.__table__.insert(), rows)
+        user = models.User(email="bench@example.com", hashed_password="x", degree_level="Bachelor",
+                           field_of_interest="Data Science", specialization="machine learning")
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def old_content_scores(db, user, scholarships):
+    """The pre-index recommender step: fit TF-IDF on the candidate set for every request."""
+    user_tag = clean_text(f"{user.field_of_interest or ''} {user.specialization or ''} {user.field_of_interest or ''}")
+    tags = [clean_text(f"{s.title} {s.description or ''} {s.field_of_study or ''}") for s in scholarships]
+    matrix = TfidfVectorizer(stop_words="english").fit_transform([user_tag] + tags)
+    return cosine_similarity(matrix[0:1], matrix[1:])[0]
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def first_token_latency(question):
+    started = time.perf_counter()
+    async for _ in chatbot.stream_ai_response(question):
+        return time.perf_counter() - started
+
+
+async def chat_samples(runs):
+    return [await first_token_latency(QUESTIONS[i % len(QUESTIONS)]) for i in range(runs)]
+
+
+def main():
+    init_db()
+    print(f"🌱 Seeding {SCHOLARSHIPS} scholarships...")
+    user_id = seed()
+    db = SessionLocal()
+
+    build = timed(lambda: CatalogIndex.build(db), 3)
+    index = get_catalog_index(db)
+    print(f"✅ Index: {len(index)} scholarships, {index.matrix.shape[1]} terms")
+
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(QUERIES)]
+    retrieval = timed(lambda: chatbot.retrieve_catalog_context(random.choice(questions)), QUERIES)
+    print("\nSample context:\n" + chatbot.retrieve_catalog_context(QUESTIONS[0]) + "\n")
+
+    user = db.get(models.User, user_id)
+    candidates = db.query(models.Scholarship).filter(models.Scholarship.degree_level.ilike("%master%")).all()
+    runs = max(5, QUERIES // 20)
+    old_scoring = timed(lambda: old_content_scores(db, user, candidates), runs)
+    new_scoring = timed(lambda: index.similarity("data science machine learning", [s.id for s in candidates]), runs)
+    recommend = timed(lambda: get_recommendations(db, user_id), runs)
+
+    chatbot.set_chat_backend(chatbot.FakeChatBackend(first_token_ms=0, token_ms=0, tokens=1))
+    settings.CHAT_RETRIEVAL_ENABLED = False
+    ttft_plain = asyncio.run(chat_samples(QUERIES))
+    settings.CHAT_RETRIEVAL_ENABLED = True
+    ttft_retrieval = asyncio.run(chat_samples(QUERIES))
+    db.close()
+
+    print(f"{'step':<42}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, samples in [
+        ("index build (whole catalog)", build),
+        ("retrieval: search + format", retrieval),
+        (f"recommender scoring, old ({len(candidates)} candidates)", old_scoring),
+        ("recommender scoring, shared index", new_scoring),
+        ("get_recommendations() end to end", recommend),
+        ("chat first token, retrieval off (fake LLM)", ttft_plain),
+        ("chat first token, retrieval on (fake LLM)", ttft_retrieval),
+    ]:
+        print(f"{label:<42}{pct(samples, 50):>10.2f}{pct(samples, 95):>10.2f}")
+    print(f"\nRetrieval adds ~{statistics.median(ttft_retrieval) * 1000 - statistics.median(ttft_plain) * 1000:.2f} ms "
+          f"before the LLM call; LLM time itself is not included above.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Offline ranking evaluation for recommender changes.
+
+Replays logged data with a temporal split: positives (saves, applies, tracked applications)
+before the cutoff are history, positives after it are the ground truth. Every strategy
+ranks the catalog for each user (history excluded) and we report precision@k, recall@k,
+NDCG@k and per-request latency percentiles side by side.
+
+Strategies:
+    rules        recommendation.engine.score_scholarship with the popularity feature
+                 (rule engine, /recommendations/profile)
+    match_score  utils.scoring.calculate_match_score (search listing score)
+    tfidf        catalog index similarity blended with popularity, as in
+                 services.recommendation.get_recommendations (/recommendations/), but over
+                 the whole snapshot instead of its degree filter and top 10
+    cf           recommendation.cf ALS, trained here on interactions before the cutoff
+    trending     recommendation.popularity decayed score (baseline)
+
+Nothing a strategy sees may come from after the cutoff: popularity is recomputed from
+interactions logged before it (decayed to the cutoff) instead of read from the live
+trending table, and the published CF model is not used because it was trained on all
+interactions, held-out ones included.
+
+Usage (run from the backend folder):
+    python scripts/evaluate_rankers.py [--k 10] [--cutoff 2026-01-01] [--max-users 500] [--strategies rules,tfidf]
+"""
+import argparse
+import datetime
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy.orm import joinedload
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.recommendation.cf import CFModel, build_matrix, stream_interactions, train_als
+from app.recommendation.engine import score_scholarship
+from app.recommendation.features import build_user_profile
+from app.recommendation.index import get_catalog_index
+from app.recommendation.popularity import DECAY_RATE, EVENT_WEIGHTS, POPULARITY_SATURATION
+from app.services.recommendation import POPULARITY_WEIGHT, build_user_tag
+from app.utils.scoring import calculate_match_score
+
+
+# --- Ground truth ---
+
+def load_positive_events(db):
+    """[(user_id, scholarship_id, timestamp)] for every save/apply/application."""
+    events = [
+        (u, s, t) for u, s, t in db.query(
+            models.UserScholarshipInteraction.user_id,
+            models.UserScholarshipInteraction.scholarship_id,
+            models.UserScholarshipInteraction.created_at,
+        ).filter(models.UserScholarshipInteraction.interaction_type.in_(["save", "apply"]))
+        if u is not None and s is not None and t is not None
+    ]
+    events += [
+        (u, s, t) for u, s, t in db.query(
+            models.Application.user_id, models.Application.scholarship_id, models.Application.applied_date
+        )
+        if u is not None and s is not None and t is not None
+    ]
+    return events
+
+
+def temporal_split(events, cutoff):
+    history, truth = defaultdict(set), defaultdict(set)
+    for user_id, sch_id, ts in events:
+        (history if ts < cutoff else truth)[user_id].add(sch_id)
+    # Something seen before the cutoff is not a new discovery
+    for user_id in truth:
+        truth[user_id] -= history[user_id]
+    return history, {u: items for u, items in truth.items() if items}
+
+
+# --- State as of the cutoff ---
+
+def trending_at(db, cutoff):
+    """Decayed trending score per scholarship at the cutoff, from events logged before it."""
+    scores = defaultdict(float)
+    rows = db.query(
+        models.UserScholarshipInteraction.scholarship_id,
+        models.UserScholarshipInteraction.interaction_type,
+        models.UserScholarshipInteraction.created_at,
+    ).filter(models.UserScholarshipInteraction.created_at < cutoff).yield_per(50000)
+    for sid, interaction_type, ts in rows:
+        weight = EVENT_WEIGHTS.get(interaction_type, 0.0)
+        if sid is not None and weight:
+            scores[sid] += weight * math.exp(-DECAY_RATE * (cutoff - ts).total_seconds())
+    return dict(scores)
+
+
+def train_cf_at(db, cutoff):
+    """CF model fitted on interactions before the cutoff, or None if there are none."""
+    matrix, user_ids, item_ids = build_matrix(stream_interactions(db, before=cutoff))
+    if matrix.nnz == 0:
+        return None
+    user_factors, item_factors = train_als(matrix)
+    return CFModel.from_factors(user_factors, item_factors, user_ids, item_ids)
+
+
+# --- Strategies: (db, user, catalog, context) -> ranked scholarship ids ---
+# context: "trending" and "popularity" per scholarship id, "cf" model (see main)
+
+def rank_rules(db, user, catalog, context):
+    profile = build_user_profile(user)
+    popularity = context["popularity"]
+    scored = [(score_scholarship(profile, s, popularity.get(s.id, 0.0))["fit_score"], s.id) for s in catalog]
+    return [sid for _, sid in sorted(scored, key=lambda x: (-x[0], x[1]))]
+
+
+def rank_match_score(db, user, catalog, context):
+    scored = [(calculate_match_score(user, s), s.id) for s in catalog]
+    return [sid for _, sid in sorted(scored, key=lambda x: (-x[0], x[1]))]
+
+
+def rank_tfidf(db, user, catalog, context):
+    ids = [s.id for s in catalog]
+    similarity = get_catalog_index(db).similarity(build_user_tag(user), ids)
+    popularity = context["popularity"]
+    scored = [
+        (float(sim) * (1 - POPULARITY_WEIGHT) + popularity.get(sid, 0.0) * POPULARITY_WEIGHT, sid)
+        for sid, sim in zip(ids, similarity)
+    ]
+    return [sid for _, sid in sorted(scored, key=lambda x: (-x[0], x[1]))]
+
+
+def rank_cf(db, user, catalog, context):
+    scores = context["cf"].score(user.id, [s.id for s in catalog])
+    return [sid for sid, _ in sorted(scores.items(), key=lambda x: (-x[1], x[0]))]
+
+
+def rank_trending(db, user, catalog, context):
+    scores = context["trending"]
+    ranked = [(scores[s.id], s.id) for s in catalog if s.id in scores]
+    return [sid for _, sid in sorted(ranked, key=lambda x: (-x[0], x[1]))]
+
+
+STRATEGIES = {
+    "rules": rank_rules,
+    "match_score": rank_match_score,
+    "tfidf": rank_tfidf,
+    "cf": rank_cf,
+    "trending": rank_trending,
+}
+
+
+# --- Metrics ---
+
+def precision_recall_ndcg(ranked, relevant, k):
+    top = ranked[:k]
+    hits = [1 if sid in relevant else 0 for sid in top]
+    precision = sum(hits) / k
+    recall = sum(hits) / len(relevant)
+    dcg = sum(h / math.log2(i + 2) for i, h in enumerate(hits))
+    idcg = sum(1 / math.log2(i + 2) for i in range(min(len(relevant), k)))
+    return precision, recall, (dcg / idcg if idcg else 0.0)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def evaluate(db, strategy, users, catalog, context, history, truth, k):
+    precisions, recalls, ndcgs, latencies = [], [], [], []
+    for user in users:
+        start = time.perf_counter()
+        ranked = strategy(db, user, catalog, context)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        seen = history.get(user.id, set())
+        ranked = [sid for sid in ranked if sid not in seen]
+        p, r, n = precision_recall_ndcg(ranked, truth[user.id], k)
+        precisions.append(p)
+        recalls.append(r)
+        ndcgs.append(n)
+
+    count = len(users)
+    return {
+        "precision": sum(precisions) / count,
+        "recall": sum(recalls) / count,
+        "ndcg": sum(ndcgs) / count,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ranking strategies on logged data")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--cutoff", help="YYYY-MM-DD; default splits at the 80th percentile of event time")
+    parser.add_argument("--max-users", type=int, default=500)
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        events = load_positive_events(db)
+        if not events:
+            print("⚠️ No saves/applies logged yet. Nothing to evaluate.")
+            return
+
+        if args.cutoff:
+            cutoff = datetime.datetime.strptime(args.cutoff, "%Y-%m-%d")
+        else:
+            cutoff = sorted(ts for _, _, ts in events)[int(len(events) * 0.8)]
+        history, truth = temporal_split(events, cutoff)
+
+        user_ids = sorted(truth)
+        if len(user_ids) > args.max_users:
+            user_ids = sorted(random.Random(args.seed).sample(user_ids, args.max_users))
+        users = db.query(models.User).filter(models.User.id.in_(user_ids)).all()
+        truth = {u.id: truth[u.id] for u in users}
+
+        # Snapshot of the catalog shared by all strategies
+        catalog = db.query(models.Scholarship).options(joinedload(models.Scholarship.university)).all()
+        print(f"Snapshot: {len(catalog)} scholarships, {len(users)} users with held-out positives, cutoff {cutoff:%Y-%m-%d %H:%M}")
+
+        names = [name.strip() for name in args.strategies.split(",")]
+        trending = trending_at(db, cutoff)
+        context = {
+            "trending": trending,
+            "popularity": {sid: score / (score + POPULARITY_SATURATION) for sid, score in trending.items()},
+            "cf": train_cf_at(db, cutoff) if "cf" in names else None,
+        }
+        results = {}
+        for name in names:
+            if name not in STRATEGIES:
+                print(f"Unknown strategy '{name}', skipping.")
+                continue
+            if name == "cf" and context["cf"] is None:
+                print("Skipping cf (no interactions before the cutoff to train on).")
+                continue
+            results[name] = evaluate(db, STRATEGIES[name], users, catalog, context, history, truth, args.k)
+    finally:
+        db.close()
+
+    k = args.k
+    header = f"{'strategy':<12} {'P@' + str(k):>8} {'R@' + str(k):>8} {'NDCG@' + str(k):>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print()
+    print(header)
+    print("-" * len(header))
+    for name, m in sorted(results.items(), key=lambda x: -x[1]["ndcg"]):
+        print(f"{name:<12} {m['precision']:>8.4f} {m['recall']:>8.4f} {m['ndcg']:>9.4f} "
+              f"{m['p50']:>9.2f} {m['p95']:>9.2f} {m['p99']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
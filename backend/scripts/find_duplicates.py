@@ -0,0 +1,49 @@
+"""
+Finds near-duplicate scholarships (MinHash + LSH) and queues them for admin review
+(GET /admin/duplicates, then merge or dismiss each cluster).
+
+The scheduled duplicate_scan job runs this every DEDUP_INTERVAL_SECONDS; new and
+changed rows get their signatures recomputed, then all LSH buckets are re-clustered.
+
+Usage (run from the backend folder):
+    python scripts/find_duplicates.py           # refresh new / changed signatures, cluster
+    python scripts/find_duplicates.py --full    # recompute every signature first
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal, init_db
+from app.services.dedup import find_duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="recompute every signature")
+    parser.add_argument("--chunk", type=int, default=settings.DEDUP_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        summary = find_duplicates(db, full=args.full, chunk_size=args.chunk)
+        print(f"✅ {summary['signatures_refreshed']} signatures refreshed in {summary['signature_seconds']}s; "
+              f"{summary['candidates']} candidates in {summary['candidate_buckets']} shared buckets -> "
+              f"{summary['duplicate_groups']} duplicate groups, {summary['clusters_updated']} clusters opened or extended "
+              f"({summary['seconds']}s total)")
+        open_clusters = db.query(models.DuplicateCluster).filter(models.DuplicateCluster.status == "open").count()
+        print(f"📋 {open_clusters} clusters waiting for review")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Duplicate scan failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ except ImportError:
     MongoClient = None
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
 # Load environment variables
 load_dotenv()
 
@@ -94,6 +96,7 @@ def import_csv(csv_path):
         cursor = conn.cursor()
         
         imported_count = 0
+        new_ids = []
         for _, row in df.iterrows():
             country = row['uni_country']
             
@@ -155,11 +158,20 @@ def import_csv(csv_path):
                 "AUD",
                 0
             ))
+            new_ids.append(cursor.lastrowid)
             imported_count += 1
             
         conn.commit()
         conn.close()
         print(f"✅ SQLite: Imported/Updated {imported_count} records.")
+
+        # Raw SQL skips the ORM events that normally invalidate cached catalog pages
+        from app.services.catalog_cache import invalidate_catalog
+        invalidate_catalog()
+
+        # Alert users whose profile matches the imported scholarships
+        from app.recommendation.percolator import percolate_scholarships
+        percolate_scholarships(new_ids)
         
     except Exception as e:
         print(f"❌ SQL Import Error: {e}")
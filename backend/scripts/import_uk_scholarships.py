@@ -1,17 +1,175 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 import sqlite3
 from datetime import datetime
-from pymongo import MongoClient
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
 # Load environment variables
 load_dotenv()
 
 # Database path for SQLite
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "scholariq.db")
 
+# CSV rows read, transformed and written per step; all steps share one transaction
+CHUNK_ROWS = 50000
+# Page cache for the import connection. SQLite's default (2 MB) is far smaller than the
+# scholarship indexes of a large catalog, and every upsert probes and updates them
+CACHE_MB = 512
+
+UNIVERSITY_COLUMNS = ["city", "country", "latitude", "longitude", "website_url", "address", "min_cgpa"]
+SCHOLARSHIP_COLUMNS = [
+    "country", "city", "funding_type", "amount", "deadline", "degree_level", "field_of_study",
+    "scholarship_url", "website_url", "has_separate_form", "application_type", "button_label", "user_note",
+    "tuition_fee_numeric", "tuition_fee_per_year", "scholarship_amount_numeric", "scholarship_amount_value",
+    "net_cost_numeric", "net_cost_per_year", "tuition_verified", "scholarship_verified",
+    "latitude", "longitude", "description", "verified_at", "currency", "is_suspicious",
+]
+# Set on INSERT only: a re-import must not clear a fraud flag or reset when an admin verified the row
+INSERT_ONLY_COLUMNS = ["verified_at", "is_suspicious"]
+UPDATE_COLUMNS = [c for c in SCHOLARSHIP_COLUMNS if c not in INSERT_ONLY_COLUMNS]
+
+
+def _column(df, name, default):
+    return df[name] if name in df.columns else pd.Series(default, index=df.index)
+
+
+def _rows(frame):
+    """Parameter tuples for executemany; NaN becomes NULL, numpy scalars become Python ones."""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+def transform(df, verified_at):
+    """
+    CSV rows -> (universities, scholarships) frames in the column layout of the SQL below,
+    computed column-wise. Universities keep the last row per name, scholarships the last
+    row per (title, university), the same result the old row-by-row loader left behind.
+    """
+    country = df["uni_country"].replace({"UK": "United Kingdom"})
+    universities = pd.DataFrame({
+        "name": df["uni_name"], "city": df["uni_city"], "country": country,
+        "latitude": df["lat"], "longitude": df["lng"], "website_url": df["uni_link"],
+        "address": df["map_address"], "min_cgpa": df["cgpa_min"],
+    }).drop_duplicates("name", keep="last")
+
+    original = df["original_fee_gbp"]
+    award = df["scholarship_amount_gbp"]
+    net = df["after_scholarship_fee_gbp"]
+    scholarships = pd.DataFrame({
+        "title": df["scholarship_name"], "uni_name": df["uni_name"],
+        "country": country, "city": df["uni_city"],
+        "funding_type": np.where(award >= original, "Fully Funded", "Partial"),
+        "amount": "£" + award.astype(str),
+        "deadline": df["deadline"],
+        "degree_level": df["degree_level"], "field_of_study": df["field_of_study"],
+        "scholarship_url": df["scholarship_link"], "website_url": df["uni_link"],
+        "has_separate_form": _column(df, "has_separate_form", "true").astype(str).str.lower().eq("true").astype(int),
+        "application_type": _column(df, "application_type", "direct_form"),
+        "button_label": _column(df, "button_label", "Apply Now 🎯"),
+        "user_note": _column(df, "user_note", ""),
+        "tuition_fee_numeric": original.astype(float),
+        "tuition_fee_per_year": "£" + original.astype(str) + " per year",
+        "scholarship_amount_numeric": award.astype(float),
+        "scholarship_amount_value": "£" + award.astype(str) + " award",
+        "net_cost_numeric": net.astype(float),
+        "net_cost_per_year": "£" + net.astype(str) + " net",
+        "tuition_verified": "verified", "scholarship_verified": "verified",
+        "latitude": df["lat"], "longitude": df["lng"],
+        "description": "Documents: " + df["documents_required"].astype(str) + " | Steps: " + df["apply_steps"].astype(str),
+        "verified_at": verified_at, "currency": "GBP", "is_suspicious": 0,
+    })
+    return universities, scholarships
+
+
+def _upsert_universities(cursor, universities, uni_ids):
+    """Updates known universities by id, inserts the rest and adds their ids to uni_ids."""
+    known = universities["name"].isin(uni_ids.keys())
+    existing = universities[known]
+    cursor.executemany(
+        f"UPDATE universities SET {', '.join(c + '=?' for c in UNIVERSITY_COLUMNS)} WHERE id=?",
+        _rows(existing[UNIVERSITY_COLUMNS].assign(id=existing["name"].map(uni_ids))),
+    )
+    new = universities[~known]
+    if new.empty:
+        return
+    cursor.executemany(
+        f"INSERT INTO universities (name, {', '.join(UNIVERSITY_COLUMNS)}) VALUES ({', '.join('?' * (len(UNIVERSITY_COLUMNS) + 1))})",
+        _rows(new[["name"] + UNIVERSITY_COLUMNS]),
+    )
+    names = new["name"].tolist()
+    for start in range(0, len(names), 500):
+        batch = names[start:start + 500]
+        cursor.execute(
+            f"SELECT name, id FROM universities WHERE name IN ({', '.join('?' * len(batch))}) ORDER BY id DESC", batch
+        )
+        uni_ids.update(cursor.fetchall())
+
+
+def load_sqlite(conn, chunks):
+    """
+    Loads DataFrame chunks of the CSV into SQLite in a single transaction and returns
+    (updated, inserted ids). Universities are resolved through one name -> id map;
+    scholarships are upserted on (title, university_id) with two executemany passes per
+    chunk: UPDATE the existing rows in place (their ids, saves, applications and fraud
+    flags survive a re-import) and INSERT the ones that do not exist yet.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA cache_size = -{CACHE_MB * 1024}")
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(scholarships)")}
+    now = datetime.utcnow().isoformat(sep=" ")
+    verified_at = datetime.now().isoformat()
+    # updated_at lets the incremental fraud and duplicate scans pick imported rows up
+    update_stamps = ["updated_at"] if "updated_at" in columns else []
+    insert_stamps = [c for c in ("created_at", "updated_at") if c in columns]
+
+    set_sql = ", ".join(f"{c}=?" for c in UPDATE_COLUMNS + update_stamps)
+    update_sql = f"UPDATE scholarships SET {set_sql} WHERE title=? AND university_id=?"
+    insert_columns = ["title", "university_id"] + SCHOLARSHIP_COLUMNS + insert_stamps
+    insert_sql = (
+        f"INSERT INTO scholarships ({', '.join(insert_columns)}) SELECT {', '.join('?' * len(insert_columns))} "
+        "WHERE NOT EXISTS (SELECT 1 FROM scholarships WHERE title=? AND university_id=?)"
+    )
+
+    cursor.execute("SELECT name, id FROM universities ORDER BY id DESC")
+    uni_ids = dict(cursor.fetchall())  # Lowest id wins for duplicate names, like the old SELECT
+    max_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM scholarships").fetchone()[0]
+    updated = 0
+    try:
+        for df in chunks:
+            universities, scholarships = transform(df, verified_at)
+            _upsert_universities(cursor, universities, uni_ids)
+
+            scholarships = scholarships.assign(university_id=scholarships.pop("uni_name").map(uni_ids))
+            scholarships = scholarships.drop_duplicates(["title", "university_id"], keep="last")
+            key = {"_title": scholarships["title"], "_university_id": scholarships["university_id"]}
+            cursor.executemany(update_sql, _rows(
+                scholarships[UPDATE_COLUMNS].assign(**{c: now for c in update_stamps}).assign(**key)
+            ))
+            updated += cursor.rowcount
+            cursor.executemany(insert_sql, _rows(
+                scholarships[["title", "university_id"] + SCHOLARSHIP_COLUMNS]
+                .assign(**{c: now for c in insert_stamps}).assign(**key)
+            ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    new_ids = [row[0] for row in cursor.execute("SELECT id FROM scholarships WHERE id > ? ORDER BY id", (max_id,))]
+    return updated, new_ids
+
+
+def read_chunks(csv_path):
+    return pd.read_csv(csv_path, chunksize=CHUNK_ROWS)
+
+
 def import_csv(csv_path):
     print(f"--- 🚀 Starting Import: {csv_path} ---")
     
@@ -19,17 +177,16 @@ def import_csv(csv_path):
         print(f"❌ Error: CSV file not found at {csv_path}")
         return
 
-    # 1. Read CSV using pandas
+    # 1. Check the CSV header; rows are read in chunks of CHUNK_ROWS below
     try:
-        df = pd.read_csv(csv_path)
-        print(f"✅ Loaded {len(df)} records from CSV.")
+        pd.read_csv(csv_path, nrows=0)
     except Exception as e:
         print(f"❌ Error reading CSV: {e}")
         return
 
     # --- PART A: MONGODB IMPORT ---
     mongodb_uri = os.getenv("MONGODB_URI")
-    if mongodb_uri:
+    if mongodb_uri and MongoClient:
         try:
             print("🔗 Connecting to MongoDB...")
             client = MongoClient(mongodb_uri)
@@ -37,7 +194,7 @@ def import_csv(csv_path):
             collection = db['scholarships']
             
             mongo_docs = []
-            for _, row in df.iterrows():
+            for _, row in (r for chunk in read_chunks(csv_path) for r in chunk.iterrows()):
                 # Map according to User Requirements
                 country = row['uni_country']
                 if country == "UK": country = "United Kingdom"
@@ -94,81 +251,20 @@ def import_csv(csv_path):
 
     try:
         conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        imported_count = 0
-        for _, row in df.iterrows():
-            # Normalize Country
-            country = row['uni_country']
-            if country == "UK": country = "United Kingdom"
-
-            # 1. Manage University
-            cursor.execute("SELECT id FROM universities WHERE name = ?", (row['uni_name'],))
-            uni_res = cursor.fetchone()
-            
-            if uni_res:
-                uni_id = uni_res[0]
-                # Update info if needed
-                cursor.execute("""
-                    UPDATE universities 
-                    SET city=?, country=?, latitude=?, longitude=?, website_url=?, address=?, min_cgpa=?
-                    WHERE id=?
-                """, (row['uni_city'], country, row['lat'], row['lng'], row['uni_link'], row['map_address'], row['cgpa_min'], uni_id))
-            else:
-                cursor.execute("""
-                    INSERT INTO universities (name, city, country, latitude, longitude, website_url, address, min_cgpa)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (row['uni_name'], row['uni_city'], country, row['lat'], row['lng'], row['uni_link'], row['map_address'], row['cgpa_min']))
-                uni_id = cursor.lastrowid
-            
-            # 2. Manage Scholarship
-            # Delete existing to refresh data
-            cursor.execute("DELETE FROM scholarships WHERE title = ? AND university_id = ?", (row['scholarship_name'], uni_id))
-            
-            # Note: We clear old non-verified data before, so we just insert these as verified
-            deadline_val = row['deadline']
-            
-            cursor.execute("""
-                INSERT INTO scholarships (
-                    title, university_id, country, city, 
-                    funding_type, amount, deadline, 
-                    degree_level, field_of_study, 
-                    scholarship_url, website_url,
-                    has_separate_form,
-                    application_type, button_label, user_note,
-                    tuition_fee_numeric, tuition_fee_per_year,
-                    scholarship_amount_numeric, scholarship_amount_value,
-                    net_cost_numeric, net_cost_per_year,
-                    tuition_verified, scholarship_verified,
-                    latitude, longitude, description, verified_at,
-                    currency, is_suspicious
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                row['scholarship_name'], uni_id, country, row['uni_city'],
-                "Fully Funded" if row['scholarship_amount_gbp'] >= row['original_fee_gbp'] else "Partial",
-                f"£{row['scholarship_amount_gbp']}", deadline_val,
-                row['degree_level'], row['field_of_study'],
-                row['scholarship_link'], row['uni_link'],
-                1 if str(row.get('has_separate_form', 'true')).lower() == 'true' else 0,
-                row.get('application_type', 'direct_form'),
-                row.get('button_label', 'Apply Now 🎯'),
-                row.get('user_note', ''),
-                float(row['original_fee_gbp']), f"£{row['original_fee_gbp']} per year",
-                float(row['scholarship_amount_gbp']), f"£{row['scholarship_amount_gbp']} award",
-                float(row['after_scholarship_fee_gbp']), f"£{row['after_scholarship_fee_gbp']} net",
-                "verified", "verified",
-                row['lat'], row['lng'], 
-                f"Documents: {row['documents_required']} | Steps: {row['apply_steps']}",
-                datetime.now().isoformat(),
-                "GBP",
-                0
-            ))
-            imported_count += 1
-            
-        conn.commit()
-        conn.close()
-        print(f"✅ SQLite: Imported/Updated {imported_count} records.")
-        
+        try:
+            updated, new_ids = load_sqlite(conn, read_chunks(csv_path))
+        finally:
+            conn.close()
+        print(f"✅ SQLite: Updated {updated}, inserted {len(new_ids)} records.")
+
+        # Raw SQL skips the ORM events that normally invalidate cached catalog pages
+        from app.services.catalog_cache import invalidate_catalog
+        invalidate_catalog()
+
+        # Alert users whose profile matches the newly imported scholarships
+        from app.recommendation.percolator import percolate_scholarships
+        percolate_scholarships(new_ids)
+
     except Exception as e:
         print(f"❌ SQL Import Error: {e}")
 
@@ -0,0 +1,186 @@
+"""
+Schema migration command for existing databases.
+
+`Base.metadata.create_all()` only creates missing tables, so columns, indexes and
+constraints added to models.py never reach a database that already exists.
+This script applies them in place (SQLite and PostgreSQL).
+
+Usage (run from the backend folder):
+    python scripts/migrate.py           # apply all migration steps
+    python scripts/migrate.py --check   # EXPLAIN the hot queries and assert they use indexes
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import inspect, text
+from app.db.models import Base
+from app.db.session import engine
+
+# Tables whose indexes are managed by this script
+INDEXED_TABLES = [
+    "scholarships",
+    "applications",
+    "notifications",
+    "chat_messages",
+    "saved_scholarships",
+]
+
+
+def add_missing_columns(conn):
+    """ALTER TABLE ADD COLUMN for model columns the existing tables do not have yet (nullable, no default)."""
+    existing_tables = set(inspect(conn).get_table_names())
+    for table_name in INDEXED_TABLES:
+        if table_name not in existing_tables:
+            continue
+        table = Base.metadata.tables[table_name]
+        present = {c["name"] for c in inspect(conn).get_columns(table_name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN "{column.name}" {column_type}'))
+            print(f"➕ {table_name}.{column.name} ({column_type})")
+
+
+def dedupe_saved_scholarships(conn):
+    """Keeps the oldest row per (user_id, scholarship_id) so the unique index can be built."""
+    row_id = "ctid" if conn.dialect.name == "postgresql" else "rowid"
+    result = conn.execute(text(f"""
+        DELETE FROM saved_scholarships
+        WHERE {row_id} NOT IN (
+            SELECT MIN({row_id}) FROM saved_scholarships
+            GROUP BY user_id, scholarship_id
+        )
+    """))
+    print(f"🧹 saved_scholarships: removed {result.rowcount} duplicate rows.")
+
+
+# Indexes replaced by wider ones in models.py; dropped so writes don't maintain both
+OBSOLETE_INDEXES = {
+    "chat_messages": ["ix_chat_messages_user_id_timestamp"],  # now (user_id, timestamp, id)
+    "scholarships": ["ix_scholarships_university_id"],  # now (university_id, title)
+}
+
+
+def drop_obsolete_indexes(conn):
+    existing_tables = set(inspect(conn).get_table_names())
+    for table_name, names in OBSOLETE_INDEXES.items():
+        if table_name not in existing_tables:
+            continue
+        present = {i["name"] for i in inspect(conn).get_indexes(table_name)}
+        for name in names:
+            if name in present:
+                conn.execute(text(f"DROP INDEX {name}"))
+                print(f"🗑️ {table_name}: dropped {name}")
+
+
+def create_indexes(conn):
+    """Creates every index declared on the hot tables (skips ones that already exist)."""
+    for table_name in INDEXED_TABLES:
+        table = Base.metadata.tables[table_name]
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            index.create(bind=conn, checkfirst=True)
+            print(f"✅ {table_name}: {index.name}")
+
+
+# Ordered list of migration steps. Every step must be safe to re-run.
+STEPS = [
+    add_missing_columns,
+    dedupe_saved_scholarships,
+    create_indexes,
+    drop_obsolete_indexes,
+]
+
+
+def migrate():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for step in STEPS:
+            step(conn)
+    print("Migration complete.")
+
+
+# --- EXPLAIN checks -------------------------------------------------------
+# (description, SQL, params, index that must appear in the plan)
+HOT_QUERIES = [
+    ("Scholarships by university",
+     "SELECT * FROM scholarships WHERE university_id = :v",
+     {"v": 1}, "ix_scholarships_university_id_title"),
+    ("Import upsert of a scholarship",
+     "SELECT id FROM scholarships WHERE title = :t AND university_id = :u",
+     {"t": "Chevening Scholarship", "u": 1}, "ix_scholarships_university_id_title"),
+    ("Scholarships by deadline window",
+     "SELECT * FROM scholarships WHERE deadline >= :a AND deadline < :b",
+     {"a": "2025-01-01", "b": "2025-01-08"}, "ix_scholarships_deadline"),
+    ("Scholarships by country",
+     "SELECT * FROM scholarships WHERE country = :v",
+     {"v": "United Kingdom"}, "ix_scholarships_country"),
+    ("Applications of a user",
+     "SELECT * FROM applications WHERE user_id = :v",
+     {"v": 1}, "ix_applications_user_id_scholarship_id"),
+    ("Existing application check",
+     "SELECT id FROM applications WHERE user_id = :u AND scholarship_id = :s",
+     {"u": 1, "s": 1}, "ix_applications_user_id_scholarship_id"),
+    ("Notifications of a user",
+     "SELECT * FROM notifications WHERE user_id = :v ORDER BY sent_date DESC",
+     {"v": 1}, "ix_notifications_user_id_sent_date"),
+    ("Unread in-app notifications of a user",
+     "SELECT COUNT(*) FROM notifications WHERE user_id = :v AND read_at IS NULL",
+     {"v": 1}, "ix_notifications_user_id_read_at"),
+    ("Outbox: due pending notifications",
+     "SELECT id FROM notifications WHERE status = :s AND next_attempt_at <= :t ORDER BY next_attempt_at",
+     {"s": "pending", "t": "2025-01-01"}, "ix_notifications_status_next_attempt_at"),
+    ("New-match postings for a term",
+     "SELECT user_id FROM profile_match_terms WHERE term IN (:a, :b)",
+     {"a": "field:computer", "b": "field:data"}, "ix_profile_match_terms_term_user_id"),
+    ("Chat history page of a user (keyset)",
+     "SELECT * FROM chat_messages WHERE user_id = :v AND (timestamp, id) < (:t, :i) "
+     "ORDER BY timestamp DESC, id DESC LIMIT 50",
+     {"v": 1, "t": "2025-01-01", "i": 100}, "ix_chat_messages_user_id_timestamp_id"),
+    ("LSH duplicate candidates of a new scholarship",
+     "SELECT scholarship_id FROM scholarship_lsh_buckets WHERE band = :b AND bucket = :k",
+     {"b": 0, "k": 1234567}, "ix_scholarship_lsh_buckets_band_bucket"),
+    ("Saved items of a user",
+     "SELECT scholarship_id FROM saved_scholarships WHERE user_id = :v",
+     {"v": 1}, "uq_saved_scholarships_user_scholarship"),
+    ("Users who saved a scholarship",
+     "SELECT user_id FROM saved_scholarships WHERE scholarship_id = :v",
+     {"v": 1}, "ix_saved_scholarships_scholarship_id"),
+]
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return "\n".join(str(r[-1]) for r in rows)
+    rows = conn.execute(text(f"EXPLAIN {sql}"), params).fetchall()
+    return "\n".join(str(r[0]) for r in rows)
+
+
+def check():
+    """Runs EXPLAIN on every hot query and fails if the expected index is not used."""
+    failures = 0
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Small dev tables make seq scans look cheaper; we only care that an index is usable
+            conn.execute(text("SET enable_seqscan = off"))
+        for description, sql, params, index_name in HOT_QUERIES:
+            plan = explain(conn, sql, params)
+            if index_name in plan:
+                print(f"✅ {description}: uses {index_name}")
+            else:
+                failures += 1
+                print(f"❌ {description}: expected {index_name}\n   plan: {plan}")
+    if failures:
+        print(f"{failures} hot queries are not using an index. Run `python scripts/migrate.py` first.")
+        sys.exit(1)
+    print("All hot queries use indexes.")
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        check()
+    else:
+        migrate()
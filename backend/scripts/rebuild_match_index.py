@@ -0,0 +1,37 @@
+"""
+Rebuilds profile_match_terms (the reverse index behind new-scholarship alerts) for all users.
+
+Register and profile updates keep the index current; this is only needed for a
+backfill (first deploy) or after changing the term rules in recommendation/percolator.py.
+
+Usage (run from the backend folder):
+    python scripts/rebuild_match_index.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db.session import SessionLocal, init_db
+from app.recommendation.percolator import rebuild_index
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        indexed = rebuild_index(db)
+        db.commit()
+        print(f"✅ Indexed {indexed} user profiles in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
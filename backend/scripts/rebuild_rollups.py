@@ -0,0 +1,63 @@
+"""
+Rebuilds interaction rollups and trending scores from the raw interaction log.
+
+Normally these tables are maintained incrementally by the interaction buffer; this
+is only needed for a backfill (first deploy) or after changing TRENDING_HALF_LIFE_HOURS.
+
+Usage (run from the backend folder):
+    python scripts/rebuild_rollups.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.db import models
+from app.db.session import SessionLocal, init_db
+from app.recommendation.popularity import apply_interactions
+
+CHUNK_SIZE = 5000
+
+
+def rebuild():
+    init_db()
+    db = SessionLocal()
+    try:
+        db.query(models.ScholarshipInteractionRollup).delete()
+        db.query(models.ScholarshipTrending).delete()
+
+        # Stream raw events in id order, one rollup batch per chunk
+        last_id, total = 0, 0
+        while True:
+            rows = db.query(
+                models.UserScholarshipInteraction.id,
+                models.UserScholarshipInteraction.scholarship_id,
+                models.UserScholarshipInteraction.interaction_type,
+                models.UserScholarshipInteraction.created_at,
+            ).filter(
+                models.UserScholarshipInteraction.id > last_id,
+                models.UserScholarshipInteraction.scholarship_id.isnot(None),
+                models.UserScholarshipInteraction.created_at.isnot(None),
+            ).order_by(models.UserScholarshipInteraction.id).limit(CHUNK_SIZE).all()
+            if not rows:
+                break
+            apply_interactions(db, [
+                {"scholarship_id": r.scholarship_id, "interaction_type": r.interaction_type, "created_at": r.created_at}
+                for r in rows
+            ])
+            last_id = rows[-1].id
+            total += len(rows)
+            print(f"  ... {total} events")
+
+        db.commit()
+        print(f"✅ Rebuilt rollups from {total} interactions.")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
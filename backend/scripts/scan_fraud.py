@@ -0,0 +1,53 @@
+"""
+Scans the scholarship catalog for fraud keywords and records a result per row
+(fraud_scan_results); HIGH-risk rows are flagged is_suspicious.
+
+The scheduled fraud_scan job runs the incremental mode every FRAUD_SCAN_INTERVAL_SECONDS.
+Run the full scan after a bulk import or to re-check everything.
+
+Usage (run from the backend folder):
+    python scripts/scan_fraud.py                  # incremental: new, changed or rules-changed rows
+    python scripts/scan_fraud.py --full           # every row
+    python scripts/scan_fraud.py --chunk 5000     # rows per query / commit
+    python scripts/scan_fraud.py --rules rules.json
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.db.session import SessionLocal, init_db
+from app.services import fraud_detection
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="rescan every scholarship")
+    parser.add_argument("--chunk", type=int, default=settings.FRAUD_SCAN_CHUNK_SIZE)
+    parser.add_argument("--rules", help="JSON rules file (default: FRAUD_RULES_FILE or built-in rules)")
+    args = parser.parse_args()
+
+    if args.rules:
+        settings.FRAUD_RULES_FILE = args.rules
+    engine = fraud_detection.get_engine()
+    print(f"🛡️ {len(engine.rules)} rules, version {engine.version}")
+
+    init_db()
+    db = SessionLocal()
+    try:
+        summary = fraud_detection.scan_catalog(db, incremental=not args.full, chunk_size=args.chunk)
+        rate = summary["scanned"] / summary["seconds"] if summary["seconds"] else 0
+        print(f"✅ {summary['mode']}: scanned {summary['scanned']} rows in {summary['seconds']}s ({rate:,.0f} rows/s), "
+              f"{summary['high']} high risk, {summary['flagged']} newly flagged")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Scan failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Trains the implicit-feedback collaborative filtering model from interaction logs.
+
+Streams user_scholarship_interactions in chunks, builds a sparse user x item matrix,
+fits ALS factors and publishes them as a new version in CF_MODEL_DIR (memory-mapped at
+serving time; workers switch over when CURRENT changes).
+
+Usage (run from the backend folder):
+    python scripts/train_cf.py [--factors 32] [--iterations 15] [--regularization 0.1] [--alpha 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.recommendation.cf import build_matrix, save_model, stream_interactions, train_als
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the CF model from interaction logs")
+    parser.add_argument("--factors", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=15)
+    parser.add_argument("--regularization", type=float, default=0.1)
+    parser.add_argument("--alpha", type=float, default=20.0)
+    parser.add_argument("--output", default=settings.CF_MODEL_DIR)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        matrix, user_ids, item_ids = build_matrix(stream_interactions(db))
+    finally:
+        db.close()
+    print(f"📥 Loaded {matrix.nnz} user/item pairs ({matrix.shape[0]} users x {matrix.shape[1]} scholarships) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    if matrix.nnz == 0:
+        print("⚠️ No interactions logged yet. Nothing to train.")
+        return
+
+    start = time.perf_counter()
+    user_factors, item_factors = train_als(
+        matrix, factors=args.factors, iterations=args.iterations,
+        regularization=args.regularization, alpha=args.alpha,
+    )
+    print(f"🧠 Trained ALS in {time.perf_counter() - start:.1f}s")
+
+    version = save_model(args.output, user_factors, item_factors, user_ids, item_ids, {
+        "factors": args.factors,
+        "iterations": args.iterations,
+        "regularization": args.regularization,
+        "alpha": args.alpha,
+        "nnz": int(matrix.nnz),
+    })
+    size_mb = (user_factors.nbytes + item_factors.nbytes) / 1e6
+    print(f"✅ Published version {version} in {args.output} ({size_mb:.2f} MB of factors)")
+
+
+if __name__ == "__main__":
+    main()
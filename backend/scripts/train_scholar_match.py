@@ -0,0 +1,153 @@
+"""
+Training pipeline for models/scholar_match.pkl (the ML half of /recommendations/profile).
+
+1. Labels (user, scholarship) pairs from logged data:
+     positive = saved / applied (interactions) or tracked in applications
+     negative = viewed but never saved/applied, plus sampled unseen scholarships
+2. Extracts features with app.recommendation.features (the same code used at serving time)
+3. Trains a logistic regression, evaluates it on a held-out split
+4. Writes a versioned artifact + metadata and installs it as SCHOLAR_MATCH_MODEL_PATH
+
+Usage (run from the backend folder):
+    python scripts/train_scholar_match.py [--negatives-per-user 5] [--min-auc 0.6] [--no-install]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, average_precision_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.recommendation.features import FEATURE_NAMES, build_user_profile, extract_features
+
+
+def load_labels(db, negatives_per_user: int, seed: int):
+    """Returns {(user_id, scholarship_id): label}."""
+    positives, viewed = set(), set()
+    for user_id, sch_id, kind in db.query(
+        models.UserScholarshipInteraction.user_id,
+        models.UserScholarshipInteraction.scholarship_id,
+        models.UserScholarshipInteraction.interaction_type,
+    ).distinct():
+        if user_id is None or sch_id is None:
+            continue
+        (positives if kind in ("save", "apply") else viewed).add((user_id, sch_id))
+    for user_id, sch_id in db.query(models.Application.user_id, models.Application.scholarship_id).distinct():
+        if user_id is not None and sch_id is not None:
+            positives.add((user_id, sch_id))
+
+    labels = {pair: 1 for pair in positives}
+    for pair in viewed - positives:
+        labels[pair] = 0
+
+    # Sampled unseen scholarships give the model examples of "never engaged"
+    rng = random.Random(seed)
+    all_ids = [row[0] for row in db.query(models.Scholarship.id)]
+    seen_by_user = defaultdict(set)
+    for user_id, sch_id in labels:
+        seen_by_user[user_id].add(sch_id)
+    for user_id, seen in seen_by_user.items():
+        pool = [sid for sid in rng.sample(all_ids, min(len(all_ids), negatives_per_user * 3)) if sid not in seen]
+        for sid in pool[:negatives_per_user]:
+            labels[(user_id, sid)] = 0
+    return labels
+
+
+def build_dataset(db, labels):
+    user_ids = {u for u, _ in labels}
+    sch_ids = {s for _, s in labels}
+    profiles = {u.id: build_user_profile(u) for u in db.query(models.User).filter(models.User.id.in_(user_ids))}
+    scholarships = {
+        s.id: s for s in db.query(models.Scholarship)
+        .options(joinedload(models.Scholarship.university))
+        .filter(models.Scholarship.id.in_(sch_ids))
+    }
+
+    pairs = [(u, s, y) for (u, s), y in labels.items() if u in profiles and s in scholarships]
+    X = extract_features([profiles[u] for u, _, _ in pairs], [scholarships[s] for _, s, _ in pairs])
+    y = np.array([label for _, _, label in pairs], dtype=np.int64)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the scholar_match model")
+    parser.add_argument("--negatives-per-user", type=int, default=5)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--min-auc", type=float, default=0.0, help="Do not install the model below this test AUC")
+    parser.add_argument("--no-install", action="store_true", help="Only write the versioned artifact")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        labels = load_labels(db, args.negatives_per_user, args.seed)
+        X, y = build_dataset(db, labels)
+    finally:
+        db.close()
+
+    print(f"📥 {len(y)} labeled pairs ({int(y.sum())} positive, {int(len(y) - y.sum())} negative)")
+    if len(np.unique(y)) < 2 or min(y.sum(), len(y) - y.sum()) < 2:
+        print("⚠️ Need both positive and negative examples to train. Log more interactions first.")
+        sys.exit(1)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=args.seed, stratify=y
+    )
+    model = LogisticRegression(class_weight="balanced", max_iter=1000)
+    model.fit(X_train, y_train)
+
+    probs = model.predict_proba(X_test)[:, 1]
+    metrics = {
+        "roc_auc": round(float(roc_auc_score(y_test, probs)), 4),
+        "average_precision": round(float(average_precision_score(y_test, probs)), 4),
+        "accuracy": round(float(accuracy_score(y_test, probs >= 0.5)), 4),
+    }
+    print(f"📊 Test metrics: {metrics}")
+
+    # Versioned artifact + metadata next to the serving path
+    version = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    model_dir = os.path.dirname(settings.SCHOLAR_MATCH_MODEL_PATH) or "."
+    os.makedirs(model_dir, exist_ok=True)
+    artifact = os.path.join(model_dir, f"scholar_match-{version}.pkl")
+    joblib.dump(model, artifact)
+    with open(os.path.join(model_dir, f"scholar_match-{version}.json"), "w") as f:
+        json.dump({
+            "version": version,
+            "features": FEATURE_NAMES,
+            "model": "LogisticRegression(class_weight=balanced)",
+            "coefficients": dict(zip(FEATURE_NAMES, model.coef_[0].round(4).tolist())),
+            "train_size": int(len(y_train)),
+            "test_size": int(len(y_test)),
+            "metrics": metrics,
+        }, f, indent=2)
+    print(f"💾 Wrote {artifact}")
+
+    if args.no_install:
+        return
+    if metrics["roc_auc"] < args.min_auc:
+        print(f"⛔ AUC {metrics['roc_auc']} is below --min-auc {args.min_auc}. Not installing.")
+        sys.exit(1)
+
+    # Atomic swap so serving never loads a half-written file
+    tmp_path = settings.SCHOLAR_MATCH_MODEL_PATH + ".tmp"
+    shutil.copyfile(artifact, tmp_path)
+    os.replace(tmp_path, settings.SCHOLAR_MATCH_MODEL_PATH)
+    print(f"✅ Installed version {version} as {settings.SCHOLAR_MATCH_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -224,8 +224,52 @@ export const api = {
       }
       return response.json();
     },
-    async getHistory() {
-      return apiBase.request("/api/chat/history");
+    // Streams the answer over SSE; onToken receives each chunk as the model writes it
+    async streamMessage(message: string, file: File | undefined, onToken: (text: string) => void) {
+      const formData = new FormData();
+      formData.append("message", message);
+      if (file) formData.append("file", file);
+
+      const token = localStorage.getItem("token");
+      const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+        method: "POST",
+        headers: {
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: formData,
+      });
+
+      if (!response.ok || !response.body) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || "An error occurred");
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let reply = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop() || "";
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = raw.match(/^data: (.*)$/m)?.[1];
+          if (event === "token" && data) {
+            const text = JSON.parse(data).text;
+            reply += text;
+            onToken(text);
+          }
+        }
+      }
+      return { reply };
+    },
+    // Newest page first; pass next_cursor back to load the messages before it
+    async getHistory(cursor?: string | null) {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+      return apiBase.request(`/api/chat/history${query}`);
     }
   },
 
@@ -309,6 +353,29 @@ export const api = {
     }
   },
 
+  notifications: {
+    async list(limit: number = 30) {
+      return apiBase.request(`/notifications/?limit=${limit}`);
+    },
+    async unreadCount() {
+      return apiBase.request("/notifications/unread-count");
+    },
+    async markRead(ids?: number[]) {
+      return apiBase.request("/notifications/read", {
+        method: "POST",
+        body: JSON.stringify({ ids: ids ?? null })
+      });
+    },
+    // EventSource cannot send an Authorization header, so a short-lived stream token
+    // goes in the query instead of the session token
+    async streamUrl(after?: number | null) {
+      if (!localStorage.getItem("token")) return null;
+      const { token } = await apiBase.request("/notifications/stream-token", { method: "POST" });
+      const query = after != null ? `&after=${after}` : "";
+      return `${API_BASE_URL}/notifications/stream?token=${encodeURIComponent(token)}${query}`;
+    }
+  },
+
   resume: {
     async download() {
       const token = localStorage.getItem("token");
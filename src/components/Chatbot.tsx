@@ -23,20 +23,43 @@ export function Chatbot() {
   const [input, setInput] = useState("");
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
+  const [historyCursor, setHistoryCursor] = useState<string | null>(null);
+  const [isLoadingEarlier, setIsLoadingEarlier] = useState(false);
   const chatbotRef = useRef<HTMLDivElement>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
+  const mapHistory = (items: any[]): Message[] =>
+    items.map((msg: any) => ({
+      role: msg.role === "ai" ? "assistant" : "user",
+      content: msg.content,
+      fileName: msg.file_name
+    }));
+
+  const loadEarlier = async () => {
+    if (!historyCursor) return;
+    setIsLoadingEarlier(true);
+    try {
+      const history = await api.chatbot.getHistory(historyCursor);
+      const earlier = mapHistory(history.messages);
+      setHistoryCursor(history.next_cursor);
+      // Keep the welcome message on top, insert the older page right below it
+      setMessages((prev) => [prev[0], ...earlier, ...prev.slice(1)]);
+    } catch (err) {
+      console.error("Failed to fetch earlier messages:", err);
+    } finally {
+      setIsLoadingEarlier(false);
+    }
+  };
+
   // Load history when chat opens
   useEffect(() => {
     const fetchHistory = async () => {
       if (isOpen) {
         try {
           const history = await api.chatbot.getHistory();
-          const mappedHistory: Message[] = history.map((msg: any) => ({
-            role: msg.role === "ai" ? "assistant" : "user",
-            content: msg.content,
-            fileName: msg.file_name
-          }));
+          const mappedHistory = mapHistory(history.messages);
+          setHistoryCursor(history.next_cursor);
 
           if (mappedHistory.length > 0) {
             setMessages([
@@ -104,12 +127,25 @@ export function Chatbot() {
     setIsLoading(true);
 
     try {
-      const response = await api.chatbot.sendMessage(messageText || "Analyze this file", currentFile || undefined);
-      setMessages((prev: Message[]) => [...prev, { role: "assistant", content: response.reply }]);
+      let started = false;
+      await api.chatbot.streamMessage(messageText || "Analyze this file", currentFile || undefined, (text) => {
+        if (!started) {
+          // First token: swap the "analyzing" indicator for the growing answer
+          started = true;
+          setIsStreaming(true);
+          setMessages((prev: Message[]) => [...prev, { role: "assistant", content: text }]);
+          return;
+        }
+        setMessages((prev: Message[]) => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+        });
+      });
     } catch (err) {
       setMessages((prev: Message[]) => [...prev, { role: "assistant", content: "Sorry, I'm having trouble analyzing the file. Please try again later." }]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -151,6 +187,13 @@ export function Chatbot() {
 
         <CardContent className="flex-1 flex flex-col p-0 overflow-hidden bg-gray-50/50">
           <div className="flex-1 overflow-y-auto p-4 space-y-4">
+            {historyCursor && (
+              <div className="flex justify-center">
+                <Button variant="ghost" size="sm" onClick={loadEarlier} disabled={isLoadingEarlier}>
+                  {isLoadingEarlier ? <Loader2 className="h-4 w-4 animate-spin" /> : "Load earlier messages"}
+                </Button>
+              </div>
+            )}
             {messages.map((message, i) => (
               <div
                 key={i}
@@ -171,7 +214,7 @@ export function Chatbot() {
                 </div>
               </div>
             ))}
-            {isLoading && (
+            {isLoading && !isStreaming && (
               <div className="flex justify-start animate-in fade-in">
                 <div className="bg-white border border-gray-100 rounded-2xl rounded-bl-none px-4 py-2.5 shadow-sm">
                   <div className="flex gap-1 items-center">
@@ -1,29 +1,78 @@
 import { useState, useEffect, useRef } from "react";
-import { Bell, Clock, ChevronRight } from "lucide-react";
+import { Bell, Clock, ChevronRight, Sparkles } from "lucide-react";
 import { api } from "../api";
 import { Button } from "./ui/button";
 
 export function NotificationBell({ onNavigate }: { onNavigate: (page: string, params?: any) => void }) {
     const [notifications, setNotifications] = useState<any[]>([]);
+    const [unreadCount, setUnreadCount] = useState(0);
     const [showDropdown, setShowDropdown] = useState(false);
     const dropdownRef = useRef<HTMLDivElement>(null);
 
     useEffect(() => {
         const fetchNotifs = async () => {
             try {
-                const data = await api.applications.getNotifications();
+                const [data, unread] = await Promise.all([api.notifications.list(), api.notifications.unreadCount()]);
                 setNotifications(data);
+                setUnreadCount(unread.count);
             } catch (err) {
                 console.error("Failed to fetch notifications", err);
             }
         };
         fetchNotifs();
 
-        // Auto-fetch every 5 minutes
-        const interval = setInterval(fetchNotifs, 5 * 60 * 1000);
-        return () => clearInterval(interval);
+        // Server push instead of polling. The stream token is short-lived, so reconnects
+        // fetch a new one instead of letting EventSource retry the old URL
+        let source: EventSource | null = null;
+        let retry: ReturnType<typeof setTimeout> | undefined;
+        let lastId: number | null = null;
+        let closed = false;
+        const connect = async () => {
+            let url: string | null = null;
+            try {
+                url = await api.notifications.streamUrl(lastId);
+            } catch (err) {
+                console.error("Failed to open notification stream", err);
+            }
+            if (closed) return;
+            if (!url) {
+                retry = setTimeout(connect, 5000);
+                return;
+            }
+            source = new EventSource(url);
+            source.addEventListener("unread", (event) => {
+                setUnreadCount(JSON.parse((event as MessageEvent).data).count);
+            });
+            source.addEventListener("notification", (event) => {
+                const notif = JSON.parse((event as MessageEvent).data);
+                lastId = Math.max(lastId ?? 0, notif.id);
+                setNotifications((prev) => prev.some((n) => n.id === notif.id) ? prev : [notif, ...prev].slice(0, 30));
+                if (!notif.read) setUnreadCount((count) => count + 1);
+            });
+            source.onerror = () => {
+                source?.close();
+                if (!closed) retry = setTimeout(connect, 5000);
+            };
+        };
+        if (!localStorage.getItem("token")) return;
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            source?.close();
+        };
     }, []);
 
+    const toggleDropdown = () => {
+        const opening = !showDropdown;
+        setShowDropdown(opening);
+        if (opening && unreadCount > 0) {
+            setUnreadCount(0);
+            setNotifications((prev) => prev.map((n) => ({ ...n, read: true })));
+            api.notifications.markRead().catch((err) => console.error("Failed to mark notifications read", err));
+        }
+    };
+
     useEffect(() => {
         function handleClickOutside(event: MouseEvent) {
             if (dropdownRef.current && !dropdownRef.current.contains(event.target as Node)) {
@@ -37,15 +86,15 @@ export function NotificationBell({ onNavigate }: { onNavigate: (page: string, pa
     return (
         <div className="relative" ref={dropdownRef}>
             <button
-                onClick={() => setShowDropdown(!showDropdown)}
+                onClick={toggleDropdown}
                 className={`relative p-3 rounded-2xl transition-all duration-300 ${showDropdown ? "bg-blue-50 text-[#1e3a8a]" : "text-gray-400 hover:bg-gray-100"
                     }`}
             >
-                <Bell className={`w-6 h-6 ${notifications.length > 0 && !showDropdown ? "animate-[swing_2s_ease-in-out_infinite]" : ""}`} />
+                <Bell className={`w-6 h-6 ${unreadCount > 0 && !showDropdown ? "animate-[swing_2s_ease-in-out_infinite]" : ""}`} />
 
-                {notifications.length > 0 && (
+                {unreadCount > 0 && (
                     <span className="absolute top-2.5 right-2.5 w-5 h-5 bg-red-500 text-white text-[10px] font-black flex items-center justify-center rounded-full border-2 border-white">
-                        {notifications.length}
+                        {unreadCount > 99 ? "99+" : unreadCount}
                     </span>
                 )}
             </button>
@@ -82,12 +131,14 @@ export function NotificationBell({ onNavigate }: { onNavigate: (page: string, pa
                                         }}
                                     >
                                         <div className="w-12 h-12 bg-blue-50 rounded-2xl flex items-center justify-center shrink-0 group-hover:scale-110 transition-transform">
-                                            <Clock className="w-6 h-6 text-[#1e3a8a]" />
+                                            {notif.type === "new_match"
+                                                ? <Sparkles className="w-6 h-6 text-[#1e3a8a]" />
+                                                : <Clock className="w-6 h-6 text-[#1e3a8a]" />}
                                         </div>
                                         <div className="flex-1">
                                             <p className="text-sm font-bold text-gray-800 leading-snug group-hover:text-[#1e3a8a] transition-colors">{notif.message}</p>
                                             <div className="flex items-center gap-2 mt-2">
-                                                <span className="text-[10px] font-black text-red-500 uppercase tracking-widest">Priority High</span>
+                                                <span className="text-[10px] font-black text-red-500 uppercase tracking-widest">{notif.type === "new_match" ? "New Match" : "Priority High"}</span>
                                                 <span className="w-1 h-1 bg-gray-300 rounded-full" />
                                                 <span className="text-[10px] font-black text-gray-400 uppercase tracking-widest">Just Now</span>
                                             </div>